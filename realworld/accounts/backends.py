@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .models import User
+
+
+def user_key(user_id: int) -> str:
+    return f"auth-user:{user_id}"
+
+
+def invalidate_user(*user_ids: int) -> None:
+    cache.delete_many([user_key(user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """Caches the logged-in user for USER_CACHE_TIMEOUT seconds, so
+    request.user is not read from the database on every request.
+
+    The session auth hash is still checked against the cached user, so a
+    password change logs out other sessions once the cached user is
+    invalidated: see accounts.signals.
+    """
+
+    def get_user(self, user_id: int) -> User | None:
+        if not settings.USER_CACHE_ENABLED:
+            return super().get_user(user_id)
+
+        if (user := cache.get(user_key(user_id))) is None:
+            if (user := super().get_user(user_id)) is not None:
+                cache.set(user_key(user_id), user, settings.USER_CACHE_TIMEOUT)
+        return user
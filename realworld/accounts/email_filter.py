@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import User
+
+VERSION_CACHE_KEY = "email-filter-version"
+
+# room for new users before the filter has to be rebuilt larger
+MIN_CAPACITY = 1000
+
+GROWTH_FACTOR = 2
+
+
+def normalize(email: str) -> str:
+    # folds at least the characters the database's lower() does, so emails
+    # matched by UserManager.with_email() are never missed
+    return email.lower()
+
+
+class EmailFilter:
+    """Per-process Bloom filter of user emails, for checking if an email is
+    in use without a query.
+
+    might_contain() may return a false positive (about `error_rate` of
+    emails not in use), which must be checked against the database, but
+    never a false negative.
+
+    The filter is built on the first lookup in each process. Emails added in
+    this process are applied incrementally; other processes are notified
+    through a version number in the shared cache, checked at most every
+    `check_interval` seconds, and rebuild on their next lookup after that.
+    Until then an email registered through another process may be reported
+    as not in use, so registration itself must still check the database.
+    The filter is also rebuilt after `timeout` seconds to drop deleted or
+    changed emails, or when more emails have been added than it was sized
+    for.
+    """
+
+    def __init__(
+        self, timeout: int, check_interval: float = 0, error_rate: float = 0.01
+    ):
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.error_rate = error_rate
+
+        self._lock = threading.Lock()
+        # swapped as a whole on rebuild, so lookups need no lock
+        self._filter: tuple[bytearray, int, int] | None = None
+        self._capacity: int = 0
+        self._count: int = 0
+        self._version: str | None = None
+        self._expires: float = 0
+        self._next_check: float = 0
+
+    def might_contain(self, email: str) -> bool:
+        """Returns False if no user has email (case insensitive)."""
+        self.refresh()
+        bits, num_bits, num_hashes = self._filter
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in _positions(normalize(email), num_bits, num_hashes)
+        )
+
+    def refresh(self) -> None:
+        """Rebuilds filter if expired, full or changed by another process."""
+        now = time.monotonic()
+
+        if now > self._expires or self._count > self._capacity:
+            self.load()
+
+        # a cache lookup on every check would cost as much as the query the
+        # filter saves
+        elif now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if cache.get(VERSION_CACHE_KEY) != self._version:
+                self.load()
+
+    def load(self) -> None:
+        version = cache.get(VERSION_CACHE_KEY)
+
+        emails = [
+            normalize(email)
+            for email in User.objects.values_list("email", flat=True).iterator()
+        ]
+
+        capacity = max(len(emails) * GROWTH_FACTOR, MIN_CAPACITY)
+
+        # optimal size and number of hashes for capacity and error rate
+        num_bits = math.ceil(-capacity * math.log(self.error_rate) / math.log(2) ** 2)
+        num_hashes = max(round(num_bits / capacity * math.log(2)), 1)
+
+        bits = bytearray(math.ceil(num_bits / 8))
+
+        for email in emails:
+            _set_bits(bits, email, num_bits, num_hashes)
+
+        with self._lock:
+            self._filter = (bits, num_bits, num_hashes)
+            self._capacity = capacity
+            self._count = len(emails)
+            self._version = version
+            self._expires = time.monotonic() + self.timeout
+            self._next_check = time.monotonic() + self.check_interval
+
+    def invalidate(self) -> None:
+        """Forces a rebuild on next lookup, in this and other processes, e.g.
+        after users have been bulk created."""
+        self._expires = 0
+        self._changed()
+
+    def add(self, email: str) -> None:
+        with self._lock:
+            # if not built yet, the email is loaded with the others
+            if self._filter:
+                _set_bits(self._filter[0], normalize(email), *self._filter[1:])
+                self._count += 1
+            self._changed()
+
+    def _changed(self) -> None:
+        self._version = uuid.uuid4().hex
+        cache.set(VERSION_CACHE_KEY, self._version, None)
+
+
+def _set_bits(bits: bytearray, email: str, num_bits: int, num_hashes: int) -> None:
+    for position in _positions(email, num_bits, num_hashes):
+        bits[position >> 3] |= 1 << (position & 7)
+
+
+def _positions(email: str, num_bits: int, num_hashes: int) -> list[int]:
+    # double hashing: positions derived from two halves of a single digest
+    digest = hashlib.blake2b(email.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+email_filter = EmailFilter(
+    timeout=settings.EMAIL_FILTER_TIMEOUT,
+    check_interval=settings.EMAIL_FILTER_CHECK_INTERVAL,
+)
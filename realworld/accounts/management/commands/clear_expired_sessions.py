@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = """Deletes expired sessions from the database in batches. Unlike
+    clearsessions, no single DELETE holds the write lock for long, so it can
+    be run alongside the site."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of sessions to delete per DELETE",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Delete again every interval seconds until interrupted",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            num_deleted = self.delete_expired(options["batch_size"])
+
+            self.stdout.write(f"{num_deleted} expired session(s) deleted")
+
+            if not options["interval"]:
+                break
+
+            time.sleep(options["interval"])
+
+    def delete_expired(self, batch_size: int) -> int:
+        # read from the expire_date index
+        expired = Session.objects.filter(expire_date__lt=timezone.now()).values_list(
+            "pk", flat=True
+        )
+
+        num_deleted = 0
+
+        while keys := list(expired[:batch_size]):
+            deleted, _ = Session.objects.filter(pk__in=keys).delete()
+            num_deleted += deleted
+
+        return num_deleted
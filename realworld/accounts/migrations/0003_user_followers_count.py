@@ -0,0 +1,38 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:13
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_followers_count(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+
+    followers = (
+        User.followers.through.objects.filter(from_user=models.OuterRef("pk"))
+        .order_by()
+        .values("from_user")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+
+    User.objects.update(
+        followers_count=Coalesce(
+            models.Subquery(followers, output_field=models.IntegerField()), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_managers_user_followers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_followers_count, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.urls import reverse
 
 
@@ -20,6 +21,13 @@ class UserManager(BaseUserManager):
         user.save(using=self.db)
         return user
 
+    def with_email(self, email: str) -> models.QuerySet:
+        """Returns users with email, ignoring case. Unlike email__iexact, this
+        can use the user_email_lower_idx index."""
+        return self.alias(email_lower=Lower("email")).filter(
+            email_lower=Lower(models.Value(email))
+        )
+
 
 class User(AbstractUser):
 
@@ -33,7 +41,12 @@ class User(AbstractUser):
     bio: str = models.TextField(blank=True)
     image: str | None = models.URLField(null=True, blank=True)
 
-    followers = models.ManyToManyField("self", blank=True)
+    followers = models.ManyToManyField(
+        "self", blank=True, symmetrical=False, related_name="following"
+    )
+
+    # denormalized: maintained by add_follower() and remove_follower()
+    followers_count: int = models.PositiveIntegerField(default=0)
 
     EMAIL_FIELD = "email"
     USERNAME_FIELD = "email"
@@ -41,6 +54,12 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # case-insensitive lookups: see UserManager.with_email()
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
+
     def get_absolute_url(self) -> str:
         return reverse("profile", args=[self.id])
 
@@ -49,3 +68,46 @@ class User(AbstractUser):
 
     def get_short_name(self) -> str:
         return self.name
+
+    def add_follower(self, user: User) -> bool:
+        """Adds follower and increments followers count. Returns False if
+        user is already following."""
+        with transaction.atomic():
+            _, created = User.followers.through.objects.get_or_create(
+                from_user=self, to_user=user
+            )
+            if created:
+                self.update_followers_count(1)
+                self.followers_changed("post_add", user)
+        return created
+
+    def remove_follower(self, user: User) -> bool:
+        """Removes follower and decrements followers count. Returns False if
+        user was not following."""
+        with transaction.atomic():
+            deleted, _ = User.followers.through.objects.filter(
+                from_user=self, to_user=user
+            ).delete()
+            if deleted:
+                self.update_followers_count(-deleted)
+                self.followers_changed("post_remove", user)
+        return bool(deleted)
+
+    def followers_changed(self, action: str, user: User) -> None:
+        # writes to the through table bypass the related manager, so send
+        # the signal followers.add() or followers.remove() would have sent
+        models.signals.m2m_changed.send(
+            sender=User.followers.through,
+            action=action,
+            instance=self,
+            reverse=False,
+            model=User,
+            pk_set={user.pk},
+            using=self._state.db,
+        )
+
+    def update_followers_count(self, delta: int) -> None:
+        User.objects.filter(pk=self.pk).update(
+            followers_count=models.F("followers_count") + delta
+        )
+        self.refresh_from_db(fields=["followers_count"])
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from realworld import relationships
+from realworld.response_cache import invalidate_cache_tags
+
+from . import backends
+from .email_filter import email_filter
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_responses(
+    sender, instance: User, update_fields: frozenset[str] | None, **kwargs
+) -> None:
+    # ignore e.g. last_login updates
+    if update_fields is None or {"name", "bio", "image"} & update_fields:
+        invalidate_cache_tags(f"user:{instance.id}")
+
+
+@receiver(post_save, sender=User)
+def add_to_email_filter(
+    sender, instance: User, update_fields: frozenset[str] | None, **kwargs
+) -> None:
+    # other processes rebuild their filter when notified: they must not do
+    # so before the new email is committed
+    if update_fields is None or "email" in update_fields:
+        transaction.on_commit(lambda: email_filter.add(instance.email))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance: User, **kwargs) -> None:
+    # includes password changes, so other sessions are logged out
+    backends.invalidate_user(instance.id)
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def invalidate_follow_responses(
+    sender, instance: User, action: str, pk_set: set[int] | None, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    # pk_set is None on clear: invalidate only the instance side
+    invalidate_cache_tags(
+        f"user:{instance.id}",
+        *(f"user:{user_id}" for user_id in pk_set or set()),
+    )
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def invalidate_follow_relationships(
+    sender,
+    instance: User,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs,
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    # instance is the followed user, unless changed from the following side.
+    # pk_set is None on clear: invalidate only the instance side
+    relationships.invalidate_following(
+        *({instance.id} if reverse else pk_set or set())
+    )
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def invalidate_follow_cached_users(
+    sender,
+    instance: User,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **kwargs,
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    # followers count of the followed user is cached with the user: instance
+    # is the followed user, unless changed from the following side
+    backends.invalidate_user(*(pk_set or set() if reverse else {instance.id}))
@@ -1,10 +1,25 @@
 import http
+import io
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.http import http_date
+from realworld.articles.models import Article, Favorite, TimelineEntry
+from realworld.comments.models import Comment
 
-from .forms import UserCreationForm
+from .email_filter import EmailFilter, email_filter
+from .forms import SettingsForm, UserCreationForm
 
 User = get_user_model()
 
@@ -47,6 +62,201 @@ class TestUserCreationForm(TestCase):
         self.assertTrue(user.check_password("testpass1"))
 
 
+class TestProfileView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.url = reverse("profile", args=[cls.user.id])
+
+    def test_get(self):
+        Article.objects.create(title="test", author=self.user)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(len(response.context["page"]), 1)
+
+    def test_get_next_page(self):
+        Article.objects.bulk_create(
+            [Article(title=f"test {i}", author=self.user) for i in range(21)]
+        )
+
+        response = self.client.get(self.url)
+        page = response.context["page"]
+        self.assertTrue(page.has_next)
+
+        response = self.client.get(
+            page.next_page_url, HTTP_HX_REQUEST="true", HTTP_HX_TARGET="next-page"
+        )
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertTemplateUsed(response, "articles/_articles.html")
+        self.assertEqual(len(response.context["page"]), 1)
+        self.assertFalse(response.context["page"].has_next)
+
+    def test_get_favorites(self):
+        author = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        first, second = Article.objects.bulk_create(
+            [Article(title=f"test {i}", author=author) for i in range(2)]
+        )
+        Article.objects.create(title="own", author=self.user)
+
+        # most recently favorited first, regardless of when published
+        second.add_favorite(self.user)
+        first.add_favorite(self.user)
+        first.add_favorite(author)
+
+        response = self.client.get(self.url, {"favorites": ""})
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(list(response.context["page"]), [first, second])
+
+    def test_get_favorites_next_page(self):
+        author = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        articles = Article.objects.bulk_create(
+            [Article(title=f"test {i}", author=author) for i in range(21)]
+        )
+
+        # all made at once, e.g. on import: ordered by article
+        Favorite.objects.bulk_create(
+            [Favorite(user=self.user, article=article) for article in articles]
+        )
+
+        response = self.client.get(self.url, {"favorites": ""})
+        page = response.context["page"]
+        self.assertTrue(page.has_next)
+
+        response = self.client.get(
+            page.next_page_url, HTTP_HX_REQUEST="true", HTTP_HX_TARGET="next-page"
+        )
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(list(response.context["page"]), [articles[0]])
+        self.assertFalse(response.context["page"].has_next)
+
+    def test_not_modified(self):
+        Article.objects.create(title="test", author=self.user)
+
+        response = self.client.get(self.url)
+        self.assertNotIn("Last-Modified", response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+    def test_not_modified_older_page(self):
+        articles = Article.objects.bulk_create(
+            [Article(title=f"test {i}", author=self.user) for i in range(22)]
+        )
+
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        next_page_url = response.context["page"].next_page_url
+        next_etag = self.client.get(next_page_url)["ETag"]
+
+        # not on the first page, nor deciding if it has a next page
+        articles[0].add_favorite(User.objects.create(email="tester2@gmail.com"))
+
+        # the profile, then the articles on the page
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+        response = self.client.get(next_page_url, HTTP_IF_NONE_MATCH=next_etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_since_favorite(self):
+        article = Article.objects.create(title="test", author=self.user)
+        last_modified = http_date(time.time() + 60)
+
+        article.add_favorite(User.objects.create(email="tester2@gmail.com"))
+
+        # only the ETag validates the page
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_new_article(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        Article.objects.create(title="test", author=self.user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_new_comment(self):
+        article = Article.objects.create(title="test", author=self.user)
+
+        etag = self.client.get(self.url)["ETag"]
+
+        Comment.objects.create(article=article, author=self.user, content="test")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_modified_new_tag(self):
+        article = Article.objects.create(title="test", author=self.user)
+
+        etag = self.client.get(self.url)["ETag"]
+
+        article.tags.add("python")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_follower(self):
+        follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        etag = self.client.get(self.url)["ETag"]
+
+        self.user.add_follower(follower)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+
+@override_settings(ANONYMOUS_CACHE_ENABLED=True)
+class TestProfileViewCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.url = reverse("profile", args=[cls.user.id])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.url), "tester1")
+
+    def test_invalidated_settings(self):
+        self.client.get(self.url)
+
+        self.user.bio = "new bio"
+        self.user.save()
+
+        self.assertContains(self.client.get(self.url), "new bio")
+
+    def test_invalidated_new_article(self):
+        self.client.get(self.url)
+
+        Article.objects.create(title="new article", author=self.user)
+
+        self.assertContains(self.client.get(self.url), "new article")
+
+    def test_invalidated_new_favorite(self):
+        author = User.objects.create(email="tester2@gmail.com", name="tester2")
+        article = Article.objects.create(title="new favorite", author=author)
+
+        self.client.get(self.url, {"favorites": ""})
+
+        article.add_favorite(self.user)
+
+        self.assertContains(
+            self.client.get(self.url, {"favorites": ""}), "new favorite"
+        )
+
+
 class TestFollowView(TestCase):
     password = "testpass"
 
@@ -70,11 +280,19 @@ class TestFollowView(TestCase):
         cls.url = reverse("follow", args=[cls.user.id])
 
     def test_follow(self):
+        Article.objects.create(title="test", author=self.user)
+
         self.client.force_login(self.other_user)
         response = self.client.post(self.url)
 
         self.assertEqual(response.status_code, http.HTTPStatus.OK)
         self.assertTrue(self.user.followers.filter(pk=self.other_user.id).exists())
+        self.assertFalse(self.other_user.followers.filter(pk=self.user.id).exists())
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.followers_count, 1)
+
+        self.assertTrue(TimelineEntry.objects.filter(user=self.other_user).exists())
 
     def test_same_user(self):
         self.client.force_login(self.user)
@@ -85,13 +303,180 @@ class TestFollowView(TestCase):
 
     def test_unfollow(self):
         self.client.force_login(self.other_user)
-        self.user.followers.add(self.other_user)
+        self.user.add_follower(self.other_user)
+
+        article = Article.objects.create(title="test", author=self.user)
+        TimelineEntry.objects.fan_out(article)
 
         response = self.client.delete(self.url)
 
         self.assertEqual(response.status_code, http.HTTPStatus.OK)
         self.assertFalse(self.user.followers.filter(pk=self.other_user.id).exists())
 
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.followers_count, 0)
+
+        self.assertFalse(TimelineEntry.objects.filter(user=self.other_user).exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_unfollow_fan_out_resumed(self):
+        follower = User.objects.create(email="tester3@gmail.com", name="tester3")
+        self.user.add_follower(follower)
+        self.user.add_follower(self.other_user)
+
+        # written above the limit: merged in on read
+        article = Article.objects.create(title="test", author=self.user)
+        TimelineEntry.objects.fan_out(article)
+
+        self.client.force_login(self.other_user)
+        self.client.delete(self.url)
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=follower, article=article).exists()
+        )
+
+    def test_following_cache_updated(self):
+        cache.clear()
+
+        self.client.force_login(self.other_user)
+
+        profile_url = reverse("profile", args=[self.user.id])
+
+        self.assertFalse(self.client.get(profile_url).context["is_following"])
+
+        self.client.post(self.url)
+        self.assertTrue(self.client.get(profile_url).context["is_following"])
+
+        self.client.delete(self.url)
+        self.assertFalse(self.client.get(profile_url).context["is_following"])
+
+    def test_follow_buffered(self):
+        cache.clear()
+
+        self.client.force_login(self.other_user)
+
+        with tempfile.TemporaryDirectory() as tmpdir, override_settings(
+            TOGGLE_BUFFER_ENABLED=True,
+            TOGGLE_BUFFER_PATH=Path(tmpdir) / "toggles.spool",
+        ):
+            response = self.client.post(self.url)
+            self.assertTrue(response.context["is_following"])
+            self.assertFalse(self.user.followers.exists())
+
+            call_command("flush_toggles", stdout=io.StringIO())
+
+        self.assertTrue(self.user.followers.filter(pk=self.other_user.id).exists())
+
+
+class TestSettingsView(TestCase):
+    url = reverse_lazy("settings")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="tester1@gmail.com", name="tester1")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_post_valid(self):
+        response = self.client.post(
+            self.url,
+            {"name": "new name", "email": "tester1@gmail.com", "bio": "new bio"},
+        )
+        self.assertEqual(response.headers["HX-Redirect"], self.user.get_absolute_url())
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.bio, "new bio")
+
+
+@override_settings(
+    USER_CACHE_ENABLED=True,
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+)
+class TestCachedUser(TestCase):
+    url = reverse_lazy("settings")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "tester1@gmail.com", name="tester1", password="testpass1"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+
+    def get_user(self) -> User:
+        return self.client.get(self.url).wsgi_request.user
+
+    def test_cached(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_user(), self.user)
+
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if "accounts_user" in query["sql"] or "django_session" in query["sql"]
+            ]
+        )
+
+    def test_invalidated_settings(self):
+        form = SettingsForm(
+            {"name": "new name", "email": "tester1@gmail.com"}, instance=self.user
+        )
+        self.assertTrue(form.is_valid())
+        form.save()
+
+        self.assertEqual(self.get_user().name, "new name")
+
+    def test_invalidated_password(self):
+        self.user.set_password("testpass2")
+        self.user.save()
+
+        self.assertFalse(self.get_user().is_authenticated)
+
+    def test_invalidated_new_follower(self):
+        self.user.add_follower(User.objects.create(email="tester2@gmail.com"))
+
+        self.assertEqual(self.get_user().followers_count, 1)
+
+
+class TestClearExpiredSessions(TestCase):
+    def test_command(self):
+        now = timezone.now()
+
+        Session.objects.bulk_create(
+            [
+                Session(
+                    session_key=f"expired{i}",
+                    session_data="",
+                    expire_date=now - timedelta(days=1),
+                )
+                for i in range(3)
+            ]
+            + [
+                Session(
+                    session_key="current",
+                    session_data="",
+                    expire_date=now + timedelta(days=1),
+                )
+            ]
+        )
+
+        stdout = io.StringIO()
+        call_command("clear_expired_sessions", batch_size=2, stdout=stdout)
+
+        self.assertIn("3 expired session(s) deleted", stdout.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list("pk", flat=True)), ["current"]
+        )
+
 
 class TestRegisterView(TestCase):
     url = reverse_lazy("register")
@@ -117,14 +502,87 @@ class TestRegisterView(TestCase):
         self.assertTrue(User.objects.filter(email="tester@gmail.com").exists())
 
 
+class TestEmailFilter(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(email="Tester1@gmail.com", name="tester1")
+
+    def setUp(self):
+        email_filter.invalidate()
+
+    def test_might_contain(self):
+        self.assertTrue(email_filter.might_contain("tester1@GMAIL.com"))
+
+    def test_might_contain_false(self):
+        self.assertFalse(email_filter.might_contain("tester2@gmail.com"))
+
+    def test_false_positive_rate(self):
+        email_filter.load()
+
+        false_positives = sum(
+            email_filter.might_contain(f"other{i}@gmail.com") for i in range(1000)
+        )
+        self.assertLess(false_positives, 50)
+
+    def test_no_queries(self):
+        email_filter.load()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(email_filter.might_contain("tester2@gmail.com"))
+
+    def test_add_on_register(self):
+        email_filter.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        with self.assertNumQueries(0):
+            self.assertTrue(email_filter.might_contain("tester2@gmail.com"))
+
+    def test_changed_by_other_process(self):
+        other_filter = EmailFilter(timeout=60, check_interval=60)
+        other_filter.load()
+
+        # registered through another process
+        email_filter.add("tester2@gmail.com")
+        User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        with self.assertNumQueries(0):
+            self.assertFalse(other_filter.might_contain("tester2@gmail.com"))
+
+        other_filter._next_check = 0
+
+        with self.assertNumQueries(1):
+            self.assertTrue(other_filter.might_contain("tester2@gmail.com"))
+
+    def test_rebuilt_when_full(self):
+        email_filter.load()
+
+        for i in range(email_filter._capacity + 1):
+            email_filter.add(f"other{i}@gmail.com")
+
+        with self.assertNumQueries(1):
+            self.assertFalse(email_filter.might_contain("other0@gmail.com"))
+
+
 class TestCheckEmailView(TestCase):
     url = reverse_lazy("check_email")
 
+    def setUp(self):
+        email_filter.invalidate()
+
     def test_not_exists(self):
         response = self.client.get(self.url, {"email": "tester@gmail.com"})
         self.assertEqual(response.status_code, http.HTTPStatus.OK)
         self.assertNotContains(response, "Email is in use")
 
+    def test_not_exists_no_queries(self):
+        email_filter.load()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"email": "tester@gmail.com"})
+        self.assertNotContains(response, "Email is in use")
+
     def test_exists(self):
         User.objects.create_user(
             "tester@gmail.com", name="Test User", password="testpass1"
@@ -133,3 +591,56 @@ class TestCheckEmailView(TestCase):
         response = self.client.get(self.url, {"email": "tester@gmail.com"})
         self.assertEqual(response.status_code, http.HTTPStatus.OK)
         self.assertContains(response, "This email is in use")
+
+
+class TestQueryBudgets(TestCase):
+    """Views run within their @query_budget (enforced by the test runner)
+    however many related rows are rendered."""
+
+    # articles, each with its own tag and favorited by the follower
+    data_size = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.user = User.objects.create(email="tester2@gmail.com", name="tester2")
+        cls.author.add_follower(cls.user)
+
+        for i in range(cls.data_size):
+            article = Article.objects.create(
+                title=f"Python {i}", content="test", author=cls.author
+            )
+            article.tags.add("python", "django", f"tag{i}")
+            article.add_favorite(cls.user)
+            TimelineEntry.objects.fan_out(article)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_read_views(self):
+        urls = [
+            reverse("profile", args=[self.author.id]),
+            reverse("profile", args=[self.user.id]) + "?favorites",
+        ]
+
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+
+        self.client.force_login(self.user)
+
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+
+    def test_write_views(self):
+        self.client.force_login(self.user)
+
+        self.client.delete(reverse("follow", args=[self.author.id]))
+        self.client.post(reverse("follow", args=[self.author.id]))
+
+        self.assertTrue(self.author.followers.filter(pk=self.user.id).exists())
+
+
+class TestQueryBudgetsLarger(TestQueryBudgets):
+    """The same budgets hold with ten pages of articles."""
+
+    data_size = 200
@@ -1,6 +1,10 @@
+from __future__ import annotations
+
+from django.conf import settings as django_settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth import login as auth_login
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
@@ -8,41 +12,129 @@ from django.urls import reverse
 from django.utils.html import format_html
 from django.views.decorators.http import require_http_methods
 from django_htmx.http import HttpResponseClientRedirect
-from realworld.articles.models import Article
-
+from realworld import toggles
+from realworld.articles.models import Article, TimelineEntry
+from realworld.conditional import Validators, conditional_page, make_etag
+from realworld.instrumentation import query_budget
+from realworld.pagination import PAGE_SIZE, after_cursor, paginate
+from realworld.relationships import (
+    favorite_ids,
+    following_ids,
+    set_favorites,
+    set_following,
+)
+from realworld.replicas import read_from_replica
+from realworld.response_cache import add_cache_tags, cache_anonymous
+
+from .email_filter import email_filter
 from .forms import SettingsForm, UserCreationForm
 
 User = get_user_model()
 
 
+def profile_validators(request: HttpRequest, user_id: int) -> Validators | None:
+    """ETag for profile page, from the profile and the articles on the
+    requested page only: two small queries, whatever the number of articles
+    the user has written.
+
+    Comment counts and tags of the articles are in the previews, so are
+    included. No Last-Modified: favorites, follows and deletions change the
+    page without changing any timestamp.
+
+    Not used for the Favorited Articles tab, which lists other authors'
+    articles: validating it would take a scan of all the user's favorites.
+    """
+
+    if "favorites" in request.GET:
+        return None
+
+    if not (
+        profile := User.objects.filter(pk=user_id)
+        .values_list("name", "bio", "image", "followers_count")
+        .first()
+    ):
+        return None
+
+    # the page as paginate() reads it, with the first article of the next
+    # page, which decides if there is one: read from article_author_created_idx
+    articles = (
+        after_cursor(request, Article.objects.filter(author=user_id))
+        .with_tag_versions()
+        .values_list(
+            "pk",
+            "updated",
+            "favorites_count",
+            "comments_count",
+            "num_tags",
+            "last_tag",
+        )[: PAGE_SIZE + 1]
+    )
+
+    favorites = favorite_ids(request)
+
+    return (
+        make_etag(
+            request,
+            [
+                *profile,
+                user_id in following_ids(request),
+                *((*article, article[0] in favorites) for article in articles),
+            ],
+        ),
+        None,
+    )
+
+
+@query_budget(8)
+@read_from_replica
 @require_http_methods(["GET"])
+@cache_anonymous
+@conditional_page(profile_validators)
 def profile(request: HttpRequest, user_id: int) -> HttpResponse:
 
     profile = get_object_or_404(User, pk=user_id)
 
-    articles = (
-        Article.objects.select_related("author")
-        .filter(author=profile)
-        .with_favorites(request.user)
-        .prefetch_related("tags")
-        .order_by("-created")
+    articles = Article.objects.select_related("author").defer(
+        "content", "content_html"
     )
 
+    # most recently favorited first, read from favorite_user_created_idx
     if favorites := "favorites" in request.GET:
-        articles = articles.filter(num_favorites__gt=0)
+        page = paginate(
+            request,
+            articles.favorited_by(profile),
+            "favorite_created",
+            pk_field="favorite_article",
+        )
+    else:
+        page = paginate(request, articles.filter(author=profile))
+
+    set_favorites(request, page)
+
+    add_cache_tags(
+        request,
+        f"user:{profile.id}",
+        f"user-articles:{profile.id}",
+        *(f"article:{article.id}" for article in page),
+        *(f"user:{article.author_id}" for article in page),
+    )
+
+    if request.htmx.target == "next-page":
+        return TemplateResponse(request, "articles/_articles.html", {"page": page})
 
     return TemplateResponse(
         request,
         "accounts/profile.html",
         {
             "profile": profile,
-            "articles": articles,
+            "page": page,
             "favorites": favorites,
-            "is_following": profile.followers.filter(pk=request.user.id).exists(),
+            "is_following": profile.id in following_ids(request),
         },
     )
 
 
+@query_budget(5)
 @require_http_methods(["GET", "POST"])
 @login_required
 def settings(request: HttpRequest) -> HttpResponse:
@@ -61,6 +153,7 @@ def settings(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, "accounts/_settings.html", {"form": form})
 
 
+@query_budget(11)
 @require_http_methods(["GET", "POST"])
 def register(request: HttpRequest) -> HttpResponse:
 
@@ -78,20 +171,26 @@ def register(request: HttpRequest) -> HttpResponse:
     return TemplateResponse(request, "registration/_register.html", {"form": form})
 
 
+@query_budget(16)
 @require_http_methods(["POST", "DELETE"])
 @login_required
 def follow(request: HttpRequest, user_id: int) -> HttpResponse:
 
     user = get_object_or_404(User.objects.exclude(pk=request.user.id), pk=user_id)
 
-    is_following: bool
+    is_following = request.method != "DELETE"
 
-    if request.method == "DELETE":
-        user.followers.remove(request.user)
-        is_following = False
+    if django_settings.TOGGLE_BUFFER_ENABLED:
+        toggles.enqueue(toggles.FOLLOW, request.user.id, user.id, is_following)
+        set_following(request, user.id, is_following)
     else:
-        user.followers.add(request.user)
-        is_following = True
+        with transaction.atomic():
+            if is_following:
+                if user.add_follower(request.user):
+                    TimelineEntry.objects.backfill(request.user, user)
+            elif user.remove_follower(request.user):
+                TimelineEntry.objects.prune(request.user, user)
+                TimelineEntry.objects.resume_fan_out(user, 1)
 
     return TemplateResponse(
         request,
@@ -104,11 +203,16 @@ def follow(request: HttpRequest, user_id: int) -> HttpResponse:
     )
 
 
+@query_budget(2)
+@read_from_replica
 @require_http_methods(["GET"])
 def check_email(request: HttpRequest) -> HttpResponse:
-    if (email := request.GET.get("email")) and User.objects.filter(
-        email__iexact=email
-    ).exists():
+    # most emails typed are not in use: answered by the filter without a query
+    if (
+        (email := request.GET.get("email"))
+        and email_filter.might_contain(email)
+        and User.objects.with_email(email).exists()
+    ):
         return HttpResponse(
             format_html(
                 """<ul class="error-messages"><li>This email is in use.</li></ul>"""
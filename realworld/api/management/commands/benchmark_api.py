@@ -0,0 +1,69 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from realworld.articles.models import Article
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compares throughput of JSON API endpoints with equivalent HTML views"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Number of requests per endpoint",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="ID of user to log in as (default anonymous)",
+        )
+
+    def handle(self, *args, **options):
+        if (article := Article.objects.select_related("author").first()) is None:
+            raise CommandError("No articles found: generate some data first")
+
+        client = Client(SERVER_NAME="localhost")
+
+        if options["user"]:
+            client.force_login(User.objects.get(pk=options["user"]))
+
+        pairs = [
+            (reverse("api_articles"), reverse("home")),
+            (
+                reverse("api_article", args=[article.id]),
+                article.get_absolute_url(),
+            ),
+            (
+                reverse("api_profile", args=[article.author_id]),
+                reverse("profile", args=[article.author_id]),
+            ),
+        ]
+
+        for api_url, html_url in pairs:
+            api_rate = self.measure(client, api_url, options["requests"])
+            html_rate = self.measure(client, html_url, options["requests"])
+
+            self.stdout.write(
+                f"{api_url:<30} {api_rate:>9.1f} req/s   "
+                f"{html_url:<30} {html_rate:>9.1f} req/s   "
+                f"x{api_rate / html_rate:.2f}"
+            )
+
+    def measure(self, client: Client, url: str, num_requests: int) -> float:
+        # warm up caches and connection
+        client.get(url)
+
+        start = time.perf_counter()
+
+        for _ in range(num_requests):
+            if (response := client.get(url)).status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+
+        return num_requests / (time.perf_counter() - start)
@@ -0,0 +1,225 @@
+import http
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse, reverse_lazy
+from realworld.articles.models import Article, TimelineEntry
+
+User = get_user_model()
+
+
+class TestArticlesView(TestCase):
+    url = reverse_lazy("api_articles")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.other_user = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        cls.first = Article.objects.create(
+            title="First Post", summary="first", content="test", author=cls.author
+        )
+        cls.first.tags.add("python", "django")
+
+        cls.second = Article.objects.create(
+            title="Second Post", summary="second", content="test", author=cls.author
+        )
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+        data = response.json()
+        self.assertEqual(data["articlesCount"], 2)
+
+        second, first = data["articles"]
+
+        self.assertEqual(first["slug"], f"{self.first.id}-first-post")
+        self.assertEqual(first["title"], "First Post")
+        self.assertEqual(first["description"], "first")
+        self.assertEqual(first["tagList"], ["django", "python"])
+        self.assertEqual(first["favoritesCount"], 0)
+        self.assertFalse(first["favorited"])
+        self.assertEqual(first["author"]["username"], "tester1")
+        self.assertFalse(first["author"]["following"])
+
+        self.assertEqual(second["tagList"], [])
+
+    def test_get_authenticated(self):
+        self.first.add_favorite(self.other_user)
+        self.author.add_follower(self.other_user)
+
+        self.client.force_login(self.other_user)
+
+        data = self.client.get(self.url).json()
+        second, first = data["articles"]
+
+        self.assertTrue(first["favorited"])
+        self.assertEqual(first["favoritesCount"], 1)
+        self.assertTrue(first["author"]["following"])
+        self.assertFalse(second["favorited"])
+
+    def test_get_limit_offset(self):
+        data = self.client.get(self.url, {"limit": 1, "offset": 1}).json()
+        self.assertEqual(data["articlesCount"], 2)
+        self.assertEqual([a["title"] for a in data["articles"]], ["First Post"])
+
+    def test_filter_tag(self):
+        data = self.client.get(self.url, {"tag": "python"}).json()
+        self.assertEqual([a["title"] for a in data["articles"]], ["First Post"])
+
+    def test_filter_author(self):
+        data = self.client.get(self.url, {"author": self.other_user.id}).json()
+        self.assertEqual(data["articles"], [])
+
+    def test_filter_favorited(self):
+        self.second.add_favorite(self.other_user)
+
+        data = self.client.get(self.url, {"favorited": self.other_user.id}).json()
+        self.assertEqual([a["title"] for a in data["articles"]], ["Second Post"])
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+        self.first.add_favorite(self.other_user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_tags(self):
+        etag = self.client.get(self.url).headers["ETag"]
+
+        self.second.tags.add("rust")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_not_modified_queries(self):
+        etag = self.client.get(self.url, {"offset": 1}).headers["ETag"]
+
+        # page rows, their tags and the count: not the whole table
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"offset": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+    def test_empty_page_not_modified(self):
+        etag = self.client.get(self.url, {"offset": 2}).headers["ETag"]
+
+        response = self.client.get(self.url, {"offset": 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+    def test_modified_count(self):
+        etag = self.client.get(self.url, {"limit": 1}).headers["ETag"]
+
+        self.first.delete()
+
+        response = self.client.get(self.url, {"limit": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(response.json()["articlesCount"], 1)
+
+    def test_offset_out_of_range(self):
+        response = self.client.get(self.url, {"offset": "99999999999999999999"})
+        self.assertEqual(response.status_code, http.HTTPStatus.BAD_REQUEST)
+
+    def test_author_out_of_range(self):
+        response = self.client.get(self.url, {"author": "99999999999999999999"})
+        self.assertEqual(response.status_code, http.HTTPStatus.BAD_REQUEST)
+
+
+class TestFeedView(TestCase):
+    url = reverse_lazy("api_feed")
+
+    def test_anonymous(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, http.HTTPStatus.UNAUTHORIZED)
+
+    def test_get(self):
+        author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        author.add_follower(follower)
+
+        article = Article.objects.create(title="test", author=author)
+        TimelineEntry.objects.fan_out(article)
+
+        self.client.force_login(follower)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["articlesCount"], 1)
+        self.assertTrue(data["articles"][0]["author"]["following"])
+
+
+class TestArticleView(TestCase):
+    def test_get(self):
+        author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        article = Article.objects.create(title="test", content="body", author=author)
+
+        response = self.client.get(reverse("api_article", args=[article.id]))
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(response.json()["article"]["body"], "body")
+
+    def test_not_modified(self):
+        author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        article = Article.objects.create(title="test", author=author)
+        url = reverse("api_article", args=[article.id])
+
+        etag = self.client.get(url).headers["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+        author.bio = "new bio"
+        author.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_not_found(self):
+        response = self.client.get(reverse("api_article", args=[1]))
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+
+class TestProfileView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.url = reverse("api_profile", args=[cls.user.id])
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "profile": {
+                    "id": self.user.id,
+                    "username": "tester1",
+                    "bio": "",
+                    "image": None,
+                    "following": False,
+                }
+            },
+        )
+
+    def test_get_following(self):
+        follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+        self.user.add_follower(follower)
+
+        self.client.force_login(follower)
+
+        response = self.client.get(self.url)
+        self.assertTrue(response.json()["profile"]["following"])
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url).headers["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+    def test_not_found(self):
+        response = self.client.get(reverse("api_profile", args=[self.user.id + 1]))
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
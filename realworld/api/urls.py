@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("articles", views.articles, name="api_articles"),
+    path("articles/feed", views.feed, name="api_feed"),
+    path("articles/<int:article_id>", views.article, name="api_article"),
+    path("profiles/<int:user_id>", views.profile, name="api_profile"),
+]
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import BadRequest
+from django.db import models
+from django.db.models import Count, Max
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.utils.text import slugify
+from django.views.decorators.http import require_http_methods
+from realworld.articles.models import Article, TagEntry
+from realworld.conditional import Validators, conditional_page, make_etag
+from realworld.pagination import MAX_PK
+from realworld.relationships import favorite_ids, following_ids
+from taggit.models import TaggedItem
+
+User = get_user_model()
+
+DEFAULT_LIMIT = 20
+
+MAX_LIMIT = 100
+
+ARTICLE_FIELDS = (
+    "id",
+    "title",
+    "summary",
+    "content",
+    "created",
+    "updated",
+    "favorites_count",
+    "author_id",
+    "author__name",
+    "author__bio",
+    "author__image",
+)
+
+
+# fields of an article response that can change, apart from tags and the
+# current user's favorites and follows: id and author_id come first
+VALIDATOR_FIELDS = (
+    "id",
+    "author_id",
+    "updated",
+    "favorites_count",
+    "author__name",
+    "author__bio",
+    "author__image",
+)
+
+
+def articles_validators(request: HttpRequest) -> Validators | None:
+    return _page_validators(request, _filter_articles(request))
+
+
+def feed_validators(request: HttpRequest) -> Validators | None:
+    if not request.user.is_authenticated:
+        return None
+    return _page_validators(request, _feed_articles(request))
+
+
+def article_validators(request: HttpRequest, article_id: int) -> Validators | None:
+    """ETag for an article, computed in a single query."""
+
+    if not (
+        rows := list(
+            Article.objects.filter(pk=article_id)
+            .with_tag_versions()
+            .values_list(*VALIDATOR_FIELDS, "num_tags", "last_tag")
+        )
+    ):
+        return None
+
+    return make_etag(request, _with_relationships(request, rows)), None
+
+
+def profile_validators(request: HttpRequest, user_id: int) -> Validators | None:
+    """ETag for a profile, computed in a single query."""
+
+    if not (
+        row := User.objects.filter(pk=user_id)
+        .values_list("name", "bio", "image")
+        .first()
+    ):
+        return None
+
+    return make_etag(request, [*row, user_id in following_ids(request)]), None
+
+
+@require_http_methods(["GET"])
+@conditional_page(articles_validators)
+def articles(request: HttpRequest) -> HttpResponse:
+    return _articles_response(request, _filter_articles(request))
+
+
+@require_http_methods(["GET"])
+@conditional_page(feed_validators)
+def feed(request: HttpRequest) -> HttpResponse:
+
+    if not request.user.is_authenticated:
+        return _unauthorized()
+
+    return _articles_response(request, _feed_articles(request))
+
+
+@require_http_methods(["GET"])
+@conditional_page(article_validators)
+def article(request: HttpRequest, article_id: int) -> HttpResponse:
+
+    rows = list(Article.objects.filter(pk=article_id).values(*ARTICLE_FIELDS))
+
+    if not rows:
+        raise Http404
+
+    [article] = serialize_articles(rows, request)
+
+    return json_response({"article": article})
+
+
+@require_http_methods(["GET"])
+@conditional_page(profile_validators)
+def profile(request: HttpRequest, user_id: int) -> HttpResponse:
+
+    try:
+        profile = User.objects.values("id", "name", "bio", "image").get(pk=user_id)
+    except User.DoesNotExist:
+        raise Http404
+
+    return json_response(
+        {
+            "profile": serialize_profile(
+                profile,
+                following=user_id in following_ids(request),
+            )
+        },
+    )
+
+
+def serialize_articles(
+    rows: list[dict[str, Any]], request: HttpRequest
+) -> list[dict[str, Any]]:
+    """Serializes rows returned by `values(*ARTICLE_FIELDS)`. Tags for all
+    rows are fetched with one query, favorite and follow state is read from
+    the current user's cached relationships."""
+
+    article_ids = [row["id"] for row in rows]
+
+    tags: dict[int, list[str]] = defaultdict(list)
+
+    for article_id, name in TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Article),
+        object_id__in=article_ids,
+    ).values_list("object_id", "tag__name"):
+        tags[article_id].append(name)
+
+    favorites = favorite_ids(request)
+    following = following_ids(request)
+
+    return [
+        {
+            "slug": f"{row['id']}-{slugify(row['title'])}",
+            "title": row["title"],
+            "description": row["summary"],
+            "body": row["content"],
+            "tagList": sorted(tags[row["id"]]),
+            "createdAt": row["created"],
+            "updatedAt": row["updated"],
+            "favorited": row["id"] in favorites,
+            "favoritesCount": row["favorites_count"],
+            "author": serialize_profile(
+                {
+                    "id": row["author_id"],
+                    "name": row["author__name"],
+                    "bio": row["author__bio"],
+                    "image": row["author__image"],
+                },
+                following=row["author_id"] in following,
+            ),
+        }
+        for row in rows
+    ]
+
+
+def serialize_profile(profile: dict[str, Any], following: bool) -> dict[str, Any]:
+    return {
+        "id": profile["id"],
+        "username": profile["name"],
+        "bio": profile["bio"],
+        "image": profile["image"],
+        "following": following,
+    }
+
+
+def json_response(data: dict) -> HttpResponse:
+    """Returns JSON response to be revalidated on each use: its ETag is set
+    by @conditional_page."""
+    response = JsonResponse(data)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _filter_articles(request: HttpRequest) -> models.QuerySet:
+
+    articles = Article.objects.all()
+
+    if tag := request.GET.get("tag"):
+        articles = articles.filter(tags__name__in=[tag])
+
+    if author := request.GET.get("author"):
+        articles = articles.filter(author=_get_id(author))
+
+    if favorited := request.GET.get("favorited"):
+        articles = articles.filter(favorites=_get_id(favorited))
+
+    return articles.order_by("-created", "-id")
+
+
+def _feed_articles(request: HttpRequest) -> models.QuerySet:
+    return Article.objects.feed(request.user).order_by("-feed_created", "-id")
+
+
+def _page_validators(
+    request: HttpRequest, articles: models.QuerySet
+) -> Validators | None:
+    """ETag for a page of articles and their total count. Only rows of the
+    page are read, then their tag versions; the count is kept for the
+    response."""
+
+    offset, limit = _get_slice(request)
+
+    rows = list(articles.values_list(*VALIDATOR_FIELDS)[offset : offset + limit])
+
+    tag_versions = _tag_versions([row[0] for row in rows])
+
+    rows = [(*row, *tag_versions.get(row[0], (0, None))) for row in rows]
+
+    return (
+        make_etag(
+            request, [*_with_relationships(request, rows), _count(request, articles)]
+        ),
+        None,
+    )
+
+
+def _tag_versions(article_ids: list[int]) -> dict[int, tuple[int, int]]:
+    """Returns number of tags and latest tag entry of each article, as
+    with_tag_versions() does, in one grouped query: a page of articles may be
+    sorted after it is read, and the subqueries would then be run for every
+    article sorted."""
+
+    if not article_ids:
+        return {}
+
+    return {
+        article_id: (num_tags, last_tag)
+        for article_id, num_tags, last_tag in TagEntry.objects.filter(
+            article__in=article_ids
+        )
+        .order_by()
+        .values("article")
+        .annotate(num_tags=Count("pk"), last_tag=Max("pk"))
+        .values_list("article", "num_tags", "last_tag")
+    }
+
+
+def _count(request: HttpRequest, articles: models.QuerySet) -> int:
+    """Counts articles at most once per request: by the validators, then the
+    view."""
+    if not hasattr(request, "_articles_count"):
+        request._articles_count = articles.count()
+    return request._articles_count
+
+
+def _with_relationships(request: HttpRequest, rows: list[tuple]) -> list[tuple]:
+    """Adds the current user's favorite and follow state to validator rows."""
+
+    favorites = favorite_ids(request)
+    following = following_ids(request)
+
+    return [(*row, row[0] in favorites, row[1] in following) for row in rows]
+
+
+def _articles_response(request: HttpRequest, articles: models.QuerySet) -> HttpResponse:
+
+    offset, limit = _get_slice(request)
+
+    rows = list(articles.values(*ARTICLE_FIELDS)[offset : offset + limit])
+
+    return json_response(
+        {
+            "articles": serialize_articles(rows, request),
+            "articlesCount": _count(request, articles),
+        },
+    )
+
+
+def _get_slice(request: HttpRequest) -> tuple[int, int]:
+    return (
+        _get_int(request, "offset", 0),
+        min(_get_int(request, "limit", DEFAULT_LIMIT), MAX_LIMIT),
+    )
+
+
+def _get_int(request: HttpRequest, param: str, default: int) -> int:
+    try:
+        value = max(int(request.GET.get(param, default)), 0)
+    except ValueError:
+        return default
+
+    # larger values overflow the database integer
+    if value > MAX_PK:
+        raise BadRequest(f"Invalid {param}")
+
+    return value
+
+
+def _get_id(value: str) -> int:
+    try:
+        user_id = int(value)
+    except ValueError:
+        raise Http404
+
+    # larger values overflow the database integer
+    if not 0 <= user_id <= MAX_PK:
+        raise BadRequest("Invalid user id")
+
+    return user_id
+
+
+def _unauthorized() -> HttpResponse:
+    return JsonResponse(
+        {"errors": {"body": ["Authentication required"]}},
+        status=401,
+    )
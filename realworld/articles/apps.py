@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ArticlesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "realworld.articles"
+
+    def ready(self) -> None:
+        from . import signals  # noqa
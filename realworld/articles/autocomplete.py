@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from taggit.models import Tag
+
+VERSION_CACHE_KEY = "tag-index-version"
+
+# upper bound for all names starting with a prefix
+MAX_CHAR = "\U0010ffff"
+
+MAX_CACHED_RESULTS = 1000
+
+
+def normalize(name: str) -> str:
+    return name.casefold()
+
+
+class TagIndex:
+    """Per-process sorted index of tag names for prefix lookups, ranked by
+    number of articles.
+
+    Tags created or deleted in this process are applied incrementally. Other
+    processes are notified through a version number in the shared cache,
+    checked at most every `check_interval` seconds, and reload on their next
+    lookup after that; the index is also reloaded after `timeout` seconds to
+    pick up changes in article counts.
+    """
+
+    def __init__(self, timeout: int, check_interval: float = 0):
+        self.timeout = timeout
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._keys: list[tuple[str, str]] = []
+        self._counts: dict[str, int] = {}
+        self._results: dict[str, list[str]] = {}
+        self._version: str | None = None
+        self._expires: float = 0
+        self._next_check: float = 0
+
+    def search(self, prefix: str, limit: int) -> list[str]:
+        """Returns names of the `limit` most used tags starting with prefix
+        (case insensitive)."""
+
+        self.refresh()
+        return self._lookup(prefix, limit)
+
+    async def asearch(self, prefix: str, limit: int) -> list[str]:
+        """Like search(), for async views: only a reload, which queries the
+        database, runs in a thread."""
+
+        # the default local-memory cache does not block
+        if self._is_stale():
+            await sync_to_async(self.load)()
+
+        return self._lookup(prefix, limit)
+
+    def refresh(self) -> None:
+        """Reloads index if expired or changed by another process."""
+        if self._is_stale():
+            self.load()
+
+    def load(self) -> None:
+        version = cache.get(VERSION_CACHE_KEY)
+
+        counts = {
+            name: num_articles or 0
+            for name, num_articles in Tag.objects.values_list(
+                "name", "article_count__num_articles"
+            ).iterator()
+        }
+
+        keys = sorted((normalize(name), name) for name in counts)
+
+        with self._lock:
+            self._keys = keys
+            self._counts = counts
+            self._results = {}
+            self._version = version
+            self._expires = time.monotonic() + self.timeout
+            self._next_check = time.monotonic() + self.check_interval
+
+    def invalidate(self) -> None:
+        """Forces a reload on next lookup, in this and other processes, e.g.
+        after tags have been bulk created."""
+        self._expires = 0
+        self._changed()
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            if name not in self._counts:
+                bisect.insort(self._keys, (normalize(name), name))
+                self._counts[name] = 0
+                self._changed()
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            if self._counts.pop(name, None) is not None:
+                self._keys.pop(bisect.bisect_left(self._keys, (normalize(name), name)))
+                self._changed()
+
+    def _is_stale(self) -> bool:
+        now = time.monotonic()
+
+        if now > self._expires:
+            return True
+
+        # a cache lookup on every keystroke would cost more than the search
+        if now < self._next_check:
+            return False
+
+        self._next_check = now + self.check_interval
+        return cache.get(VERSION_CACHE_KEY) != self._version
+
+    def _lookup(self, prefix: str, limit: int) -> list[str]:
+        key = f"{limit}:{normalize(prefix)}"
+
+        if (results := self._results.get(key)) is None:
+            results = self._search(normalize(prefix), limit)
+            if len(self._results) >= MAX_CACHED_RESULTS:
+                self._results.clear()
+            self._results[key] = results
+
+        return results
+
+    def _search(self, prefix: str, limit: int) -> list[str]:
+        keys = self._keys
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + MAX_CHAR,))
+
+        return [
+            name
+            for _, name in heapq.nsmallest(
+                limit,
+                (keys[i] for i in range(start, end)),
+                key=lambda key: (-self._counts.get(key[1], 0), key),
+            )
+        ]
+
+    def _changed(self) -> None:
+        self._results = {}
+        self._version = uuid.uuid4().hex
+        cache.set(VERSION_CACHE_KEY, self._version, None)
+
+
+tag_index = TagIndex(
+    timeout=settings.TAGS_AUTOCOMPLETE_INDEX_TIMEOUT,
+    check_interval=settings.TAGS_AUTOCOMPLETE_CHECK_INTERVAL,
+)
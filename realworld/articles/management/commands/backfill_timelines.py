@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from realworld.articles.models import TimelineEntry
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Populates timelines of all users from existing follows"
+
+    def handle(self, *args, **options):
+        num_created: int = 0
+
+        follows = (
+            User.followers.through.objects.select_related("from_user", "to_user")
+            .order_by("pk")
+            .iterator()
+        )
+
+        for follow in follows:
+            num_created += TimelineEntry.objects.backfill(
+                follow.to_user, follow.from_user
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{num_created} timeline entries added"))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from realworld import toggles
+
+
+class Command(BaseCommand):
+    help = "Applies favorite and follow toggles buffered by TOGGLE_BUFFER_ENABLED"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of coalesced toggles to apply per transaction",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep running, flushing every INTERVAL seconds",
+        )
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        interval: float = options["interval"]
+
+        while True:
+            started = time.perf_counter()
+            num_applied = toggles.flush(batch_size)
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{num_applied} toggle(s) applied in {elapsed:.3f}s"
+                )
+            )
+
+            if not interval:
+                break
+
+            time.sleep(interval)
@@ -0,0 +1,327 @@
+import itertools
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Sequence, TypeVar
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import slugify
+from realworld.accounts.email_filter import email_filter
+from realworld.articles.autocomplete import tag_index
+from realworld.articles.models import (
+    POPULAR_TAGS_CACHE_KEY,
+    Article,
+    Favorite,
+    TagCount,
+    TagEntry,
+)
+from realworld.comments.models import Comment
+from taggit.models import Tag, TaggedItem
+
+User = get_user_model()
+
+T = TypeVar("T")
+
+Sampler = Callable[[int], list]
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat duis aute "
+    "irure in reprehenderit voluptate velit esse cillum eu fugiat nulla pariatur"
+).split()
+
+
+class Command(BaseCommand):
+    help = """Bulk-generates users, articles, tags, favorites, follows and
+    comments for benchmarking. Popularity of authors, articles and tags follows
+    a power law. Generated users have the password given by --password."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--articles", type=int, default=10000)
+        parser.add_argument("--tags", type=int, default=500)
+        parser.add_argument("--favorites", type=int, default=100000)
+        parser.add_argument("--follows", type=int, default=20000)
+        parser.add_argument("--comments", type=int, default=50000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Power law exponent: higher values concentrate popularity",
+        )
+        parser.add_argument("--days", type=int, default=365, help="Time span")
+        parser.add_argument("--password", default="password")
+        parser.add_argument("--seed", type=int, help="Random seed")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.skew: float = options["skew"]
+        self.batch_size: int = options["batch_size"]
+        self.now = timezone.now()
+        self.span = timedelta(days=options["days"])
+
+        # unique per run, so data can be generated more than once
+        self.prefix = uuid.uuid4().hex[:6]
+
+        with transaction.atomic():
+            users = self.create_users(options["users"], options["password"])
+            tags = self.create_tags(options["tags"])
+
+            # popular authors write more articles and have more followers
+            popular_users = self.sampler(users)
+
+            articles = self.create_articles(
+                options["articles"], popular_users, self.sampler(tags)
+            )
+
+            popular_articles = self.sampler(articles)
+
+            self.create_favorites(options["favorites"], users, popular_articles)
+            self.create_follows(options["follows"], users, popular_users)
+            self.create_comments(options["comments"], users, popular_articles)
+            self.update_counts()
+
+        call_command("backfill_timelines", stdout=self.stdout)
+
+        cache.delete(POPULAR_TAGS_CACHE_KEY)
+        tag_index.invalidate()
+        email_filter.invalidate()
+
+        self.stdout.write(self.style.SUCCESS("Data generated"))
+
+    def create_users(self, num_users: int, password: str) -> list[User]:
+        # hashing is slow: all users share the same hash
+        password = make_password(password)
+
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f"user-{self.prefix}-{i}@example.com",
+                    name=f"{self.random.choice(WORDS).title()} {self.prefix}{i}",
+                    bio=self.text(5, 20),
+                    password=password,
+                )
+                for i in range(num_users)
+            ],
+            batch_size=self.batch_size,
+        )
+        self.report("users", users)
+        return users
+
+    def create_tags(self, num_tags: int) -> list[Tag]:
+        tags = Tag.objects.bulk_create(
+            [
+                Tag(name=name, slug=slugify(name))
+                for name in (
+                    f"{self.random.choice(WORDS)}-{self.prefix}{i}"
+                    for i in range(num_tags)
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+        self.report("tags", tags)
+        return tags
+
+    def create_articles(
+        self, num_articles: int, popular_users: Sampler, popular_tags: Sampler
+    ) -> list[Article]:
+        articles = []
+
+        for author in popular_users(num_articles):
+            article = Article(
+                author=author,
+                title=self.text(3, 10).capitalize(),
+                summary=self.text(10, 30),
+                content="\n\n".join(
+                    self.text(30, 120) for _ in range(self.random.randint(1, 6))
+                ),
+            )
+            article.render_content()
+            articles.append(article)
+
+        articles = Article.objects.bulk_create(articles, batch_size=self.batch_size)
+
+        # auto_now_add ignores values given to bulk_create
+        for article in articles:
+            article.created = article.updated = self.timestamp()
+
+        Article.objects.bulk_update(
+            articles, ["created", "updated"], batch_size=self.batch_size
+        )
+
+        content_type = ContentType.objects.get_for_model(Article)
+
+        tagged = [
+            (article, tag)
+            for article in articles
+            for tag in set(popular_tags(self.random.randint(0, 5)))
+        ]
+
+        TaggedItem.objects.bulk_create(
+            [
+                TaggedItem(content_type=content_type, object_id=article.id, tag=tag)
+                for article, tag in tagged
+            ],
+            batch_size=self.batch_size,
+        )
+
+        TagEntry.objects.bulk_create(
+            [
+                TagEntry(tag=tag, article=article, created=article.created)
+                for article, tag in tagged
+            ],
+            batch_size=self.batch_size,
+        )
+
+        self.report("articles", articles)
+        return articles
+
+    def create_favorites(
+        self, num_favorites: int, users: list[User], popular_articles: Sampler
+    ) -> None:
+        favorites = Favorite.objects.bulk_create(
+            [
+                Favorite(
+                    user=user,
+                    article=article,
+                    # some time after the article was published
+                    created=article.created
+                    + (self.now - article.created) * self.random.random(),
+                )
+                for user, article in zip(
+                    self.random.choices(users, k=num_favorites),
+                    popular_articles(num_favorites),
+                )
+                if user.id != article.author_id
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.report("favorites", favorites)
+
+    def create_follows(
+        self, num_follows: int, users: list[User], popular_users: Sampler
+    ) -> None:
+        Follow = User.followers.through
+
+        follows = Follow.objects.bulk_create(
+            [
+                Follow(from_user=followed, to_user=follower)
+                for follower, followed in zip(
+                    self.random.choices(users, k=num_follows),
+                    popular_users(num_follows),
+                )
+                if follower != followed
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        self.report("follows", follows)
+
+    def create_comments(
+        self, num_comments: int, users: list[User], popular_articles: Sampler
+    ) -> None:
+        comments = Comment.objects.bulk_create(
+            [
+                Comment(author=author, article=article, content=self.text(5, 60))
+                for author, article in zip(
+                    self.random.choices(users, k=num_comments),
+                    popular_articles(num_comments),
+                )
+            ],
+            batch_size=self.batch_size,
+        )
+
+        for comment in comments:
+            comment.created = comment.updated = self.timestamp()
+
+        Comment.objects.bulk_update(
+            comments, ["created", "updated"], batch_size=self.batch_size
+        )
+
+        self.report("comments", comments)
+
+    def update_counts(self) -> None:
+        """bulk_create() bypasses the methods and signals maintaining
+        denormalized counts: recalculate all of them."""
+
+        Article.objects.sync_favorites_count()
+
+        Article.objects.update(
+            comments_count=self.count_subquery(Comment, "article"),
+        )
+
+        User.objects.update(
+            followers_count=self.count_subquery(User.followers.through, "from_user"),
+        )
+
+        TagCount.objects.all().delete()
+
+        TagCount.objects.bulk_create(
+            [
+                TagCount(tag_id=count["tag"], num_articles=count["num_articles"])
+                for count in TaggedItem.objects.filter(
+                    content_type=ContentType.objects.get_for_model(Article)
+                )
+                .values("tag")
+                .annotate(num_articles=models.Count("pk"))
+                .order_by()
+                .iterator()
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def count_subquery(self, model: type[models.Model], field: str) -> Coalesce:
+        return Coalesce(
+            models.Subquery(
+                model.objects.filter(**{field: models.OuterRef("pk")})
+                .order_by()
+                .values(field)
+                .annotate(count=models.Count("pk"))
+                .values("count"),
+                output_field=models.IntegerField(),
+            ),
+            0,
+        )
+
+    def sampler(self, population: Sequence[T]) -> Sampler:
+        """Returns function picking k items with replacement, where the
+        probability of the nth most popular item is proportional to
+        1 / n ** skew."""
+
+        # popularity is independent of creation order
+        ranked = self.random.sample(population, len(population))
+
+        cum_weights = list(
+            itertools.accumulate(
+                1 / rank**self.skew for rank in range(1, len(ranked) + 1)
+            )
+        )
+
+        def _sample(k: int) -> list[T]:
+            if not ranked:
+                return []
+            return self.random.choices(ranked, cum_weights=cum_weights, k=k)
+
+        return _sample
+
+    def text(self, min_words: int, max_words: int) -> str:
+        return " ".join(
+            self.random.choices(WORDS, k=self.random.randint(min_words, max_words))
+        )
+
+    def timestamp(self) -> datetime:
+        return self.now - self.span * self.random.random()
+
+    def report(self, name: str, objs: list) -> None:
+        self.stdout.write(f"{len(objs)} {name}")
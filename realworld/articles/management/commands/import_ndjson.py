@@ -0,0 +1,81 @@
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from realworld import transfer
+
+
+class Command(BaseCommand):
+    help = """Imports users, articles with tags, comments, favorites and follows
+    from an NDJSON file written by export_ndjson, in batches of one
+    transaction each. Article and comment ids are preserved; users are matched
+    by email. Records already imported are skipped, and the import stops if an
+    id is taken by another article or comment. Progress is checkpointed after
+    each batch, so an interrupted import can be resumed."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", type=Path, help="NDJSON file to read")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of records to import per transaction",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted import from its checkpoint",
+        )
+        parser.add_argument(
+            "--progress",
+            type=float,
+            default=10,
+            help="Report throughput every PROGRESS seconds",
+        )
+
+    def handle(self, *args, **options):
+        input_path: Path = options["input"]
+        batch_size: int = options["batch_size"]
+
+        checkpoint_path = input_path.with_name(f"{input_path.name}.checkpoint")
+
+        offset = 0
+
+        if options["resume"] and (
+            checkpoint := transfer.read_checkpoint(checkpoint_path)
+        ):
+            offset = checkpoint["offset"]
+
+        throughput = transfer.Throughput(options["progress"])
+        skipped: Counter[str] = Counter()
+
+        with open(input_path, "rb") as fp:
+            fp.seek(offset)
+
+            try:
+                for kind, records, end in transfer.read_chunks(fp, batch_size):
+                    num_imported = transfer.import_records(kind, records)
+
+                    transfer.write_checkpoint(checkpoint_path, {"offset": end})
+
+                    throughput.add(kind, len(records), end - offset)
+                    skipped[kind] += len(records) - num_imported
+                    offset = end
+
+                    if report := throughput.progress():
+                        self.stdout.write(report)
+
+            except (KeyError, ValueError) as e:
+                raise CommandError(f"Invalid record after offset {offset}: {e}")
+
+        transfer.finish_import()
+
+        checkpoint_path.unlink(missing_ok=True)
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {throughput.report()}"))
+
+        if skipped := +skipped:
+            self.stdout.write(
+                "Skipped, as already imported or referring to missing rows: "
+                + ", ".join(f"{count} {kind}(s)" for kind, count in skipped.items())
+            )
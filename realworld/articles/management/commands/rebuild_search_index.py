@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the article full-text search index from the articles table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--optimize",
+            action="store_true",
+            help="Merge index b-trees after rebuilding",
+        )
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO articles_article_fts(articles_article_fts) "
+                "VALUES ('rebuild')"
+            )
+            if options["optimize"]:
+                cursor.execute(
+                    "INSERT INTO articles_article_fts(articles_article_fts) "
+                    "VALUES ('optimize')"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from realworld.articles.models import MARKDOWN_RENDERER_VERSION, Article
+
+
+class Command(BaseCommand):
+    help = "Renders and stores article content HTML where missing or stale"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render all articles, even if stored HTML is up to date",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of articles to render per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+
+        articles = Article.objects.only(
+            "content", "content_html", "content_hash", "content_renderer"
+        ).order_by("pk")
+
+        if not options["force"]:
+            articles = articles.exclude(content_renderer=MARKDOWN_RENDERER_VERSION)
+
+        last_id: int = 0
+        num_rendered: int = 0
+
+        while batch := list(articles.filter(pk__gt=last_id)[:batch_size]):
+            rendered = [
+                article
+                for article in batch
+                if article.render_content(force=options["force"])
+            ]
+
+            # bulk_update() does not touch the auto_now "updated" field
+            Article.objects.bulk_update(
+                rendered, ["content_html", "content_hash", "content_renderer"]
+            )
+
+            num_rendered += len(rendered)
+            last_id = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f"{num_rendered} article(s) rendered"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from realworld.articles.models import Article
+
+
+class Command(BaseCommand):
+    help = "Reconciles stored article favorites counts with the favorites table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of articles to check per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+
+        last_id: int = 0
+        num_updated: int = 0
+
+        # walk the primary key range so no single UPDATE holds the write lock
+        # for too long on large tables
+        while ids := list(
+            Article.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        ):
+            num_updated += Article.objects.filter(
+                pk__gte=ids[0], pk__lte=ids[-1]
+            ).sync_favorites_count()
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"{num_updated} article(s) updated"))
@@ -0,0 +1,38 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:11
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_favorites_count(apps, schema_editor):
+    Article = apps.get_model("articles", "Article")
+
+    favorites = (
+        Article.favorites.through.objects.filter(article=models.OuterRef("pk"))
+        .order_by()
+        .values("article")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+
+    Article.objects.update(
+        favorites_count=Coalesce(
+            models.Subquery(favorites, output_field=models.IntegerField()), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0002_article_favorites_alter_article_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_favorites_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_article_favorites_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='content_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='content_renderer',
+            field=models.CharField(blank=True, max_length=60),
+        ),
+    ]
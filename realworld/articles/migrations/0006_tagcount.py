@@ -0,0 +1,60 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_tag_counts(apps, schema_editor):
+    Article = apps.get_model("articles", "Article")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    TagCount = apps.get_model("articles", "TagCount")
+
+    if (
+        content_type := ContentType.objects.filter(
+            app_label="articles", model="article"
+        ).first()
+    ) is None:
+        return
+
+    counts = (
+        TaggedItem.objects.filter(
+            content_type=content_type,
+            object_id__in=Article.objects.values("pk"),
+        )
+        .values("tag")
+        .annotate(num_articles=models.Count("pk"))
+        .order_by()
+    )
+
+    TagCount.objects.bulk_create(
+        [
+            TagCount(tag_id=count["tag"], num_articles=count["num_articles"])
+            for count in counts.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0004_alter_taggeditem_content_type_alter_taggeditem_tag'),
+        ('articles', '0005_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagCount',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='article_count', serialize=False, to='taggit.tag')),
+                ('num_articles', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagcount',
+            index=models.Index(fields=['-num_articles'], name='tag_count_num_articles_idx'),
+        ),
+        migrations.RunPython(populate_tag_counts, migrations.RunPython.noop),
+    ]
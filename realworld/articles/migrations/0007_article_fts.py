@@ -0,0 +1,25 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:17
+
+from django.db import migrations
+from realworld.articles import search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_tagcount'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                search.FTS_TABLE,
+                *search.FTS_TRIGGERS.values(),
+                "INSERT INTO articles_article_fts(articles_article_fts) VALUES ('rebuild')",
+            ],
+            reverse_sql=[
+                *search.DROP_FTS_TRIGGERS,
+                "DROP TABLE articles_article_fts",
+            ],
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.0.1 on 2026-10-18 19:02
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+from realworld.articles import search
+
+
+def populate_comments_count(apps, schema_editor):
+    Article = apps.get_model("articles", "Article")
+    Comment = apps.get_model("comments", "Comment")
+
+    comments = (
+        Comment.objects.filter(article=models.OuterRef("pk"))
+        .order_by()
+        .values("article")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+
+    Article.objects.update(
+        comments_count=Coalesce(
+            models.Subquery(comments, output_field=models.IntegerField()), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_article_fts'),
+        ('comments', '0001_initial'),
+    ]
+
+    operations = [
+        # SQLite adds the column by rebuilding the table, which drops the search
+        # index triggers: created again afterwards, either way
+        migrations.RunSQL(
+            migrations.RunSQL.noop, reverse_sql=list(search.FTS_TRIGGERS.values())
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            search.DROP_FTS_TRIGGERS + list(search.FTS_TRIGGERS.values()),
+            reverse_sql=search.DROP_FTS_TRIGGERS,
+        ),
+        migrations.RunPython(populate_comments_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from realworld.articles import search
+
+
+# tag filter of the API: taggit only indexes (content_type, object_id, tag),
+# which cannot be searched by tag
+TAGGED_ITEM_INDEX = """
+CREATE INDEX taggit_taggeditem_tag_object_idx
+ON taggit_taggeditem (content_type_id, tag_id, object_id)
+"""
+
+DROP_TAGGED_ITEM_INDEX = "DROP INDEX IF EXISTS taggit_taggeditem_tag_object_idx"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('articles', '0008_article_comments_count'),
+        ('taggit', '0004_alter_taggeditem_content_type_alter_taggeditem_tag'),
+    ]
+
+    operations = [
+        # SQLite alters the field by rebuilding the table, which drops the search
+        # index triggers: created again afterwards, either way
+        migrations.RunSQL(
+            migrations.RunSQL.noop, reverse_sql=list(search.FTS_TRIGGERS.values())
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunSQL(
+            search.DROP_FTS_TRIGGERS + list(search.FTS_TRIGGERS.values()),
+            reverse_sql=search.DROP_FTS_TRIGGERS,
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created'], name='article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', 'created'], name='article_author_created_idx'),
+        ),
+        migrations.RunSQL(TAGGED_ITEM_INDEX, reverse_sql=DROP_TAGGED_ITEM_INDEX),
+    ]
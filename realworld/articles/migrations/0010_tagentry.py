@@ -0,0 +1,71 @@
+# Generated by Django 4.0.1 on 2026-10-18 17:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_tag_entries(apps, schema_editor):
+    Article = apps.get_model("articles", "Article")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    TagEntry = apps.get_model("articles", "TagEntry")
+
+    if (
+        content_type := ContentType.objects.filter(
+            app_label="articles", model="article"
+        ).first()
+    ) is None:
+        return
+
+    items = (
+        TaggedItem.objects.filter(
+            content_type=content_type,
+            object_id__in=Article.objects.values("pk"),
+        )
+        .annotate(
+            created=models.Subquery(
+                Article.objects.filter(pk=models.OuterRef("object_id")).values(
+                    "created"
+                )
+            )
+        )
+        .values_list("tag", "object_id", "created")
+    )
+
+    TagEntry.objects.bulk_create(
+        [
+            TagEntry(tag_id=tag_id, article_id=article_id, created=created)
+            for tag_id, article_id, created in items.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0004_alter_taggeditem_content_type_alter_taggeditem_tag'),
+        ('articles', '0009_article_indexes'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_entries', to='articles.article')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='article_entries', to='taggit.tag')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagentry',
+            index=models.Index(fields=['tag', '-created', '-article'], name='tag_entry_listing_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagentry',
+            constraint=models.UniqueConstraint(fields=('tag', 'article'), name='unique_tag_entry'),
+        ),
+        migrations.RunPython(populate_tag_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.0.1 on 2026-10-18 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def stagger_favorites_created(apps, schema_editor):
+    """The time existing favorites were made is unknown: space them a
+    microsecond apart by id, so they are listed in the order they were
+    added. Computed in a single UPDATE."""
+    Favorite = apps.get_model("articles", "Favorite")
+
+    if (max_pk := Favorite.objects.aggregate(models.Max("pk"))["pk__max"]) is None:
+        return
+
+    # durations are stored as microseconds
+    Favorite.objects.update(
+        created=models.ExpressionWrapper(
+            models.Value(timezone.now(), output_field=models.DateTimeField())
+            - models.ExpressionWrapper(
+                max_pk - models.F("pk"), output_field=models.DurationField()
+            ),
+            output_field=models.DateTimeField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("articles", "0010_tagentry"),
+    ]
+
+    operations = [
+        # the auto-created through table becomes the Favorite model: no
+        # changes to the database, so existing favorites are kept
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="Favorite",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "article",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="favorite_entries",
+                                to="articles.article",
+                            ),
+                        ),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="favorite_entries",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "articles_article_favorites",
+                        "unique_together": {("article", "user")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="article",
+                    name="favorites",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="favorites",
+                        through="articles.Favorite",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="favorite",
+            name="created",
+            field=models.DateTimeField(default=timezone.now),
+        ),
+        migrations.RunPython(
+            stagger_favorites_created, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="favorite",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="favorite_entries",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["user", "-created", "-article"],
+                name="favorite_user_created_idx",
+            ),
+        ),
+    ]
@@ -1,32 +1,163 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime
 
 import markdown
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import AnonymousUser
-from django.db import models
+from django.core.cache import cache
+from django.db import connections, models, transaction
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 from taggit.managers import TaggableManager
 from taggit.models import Tag
 
 User = get_user_model()
 
+MARKDOWN_EXTENSIONS = ["extra"]
+
+# bump the revision to invalidate all stored HTML without a library upgrade
+MARKDOWN_RENDERER_VERSION = (
+    f"1:{markdown.__version__}:{','.join(sorted(MARKDOWN_EXTENSIONS))}"
+)
+
+
+POPULAR_TAGS_CACHE_KEY = "popular-tags"
+
+TIMELINE_BACKFILL_SQL = """
+INSERT INTO articles_timelineentry (user_id, article_id, created)
+SELECT %s, id, created
+FROM articles_article
+WHERE author_id = %s
+ORDER BY created DESC
+LIMIT %s
+ON CONFLICT DO NOTHING
+"""
+
+# most recent articles by an author, added to the timelines of all followers
+TIMELINE_RESUME_FAN_OUT_SQL = """
+INSERT INTO articles_timelineentry (user_id, article_id, created)
+SELECT follow.to_user_id, article.id, article.created
+FROM (
+    SELECT id, created
+    FROM articles_article
+    WHERE author_id = %s
+    ORDER BY created DESC
+    LIMIT %s
+) AS article
+CROSS JOIN accounts_user_followers AS follow
+WHERE follow.from_user_id = %s
+ON CONFLICT DO NOTHING
+"""
+
+
+def render_markdown(content: str) -> str:
+    return markdown.markdown(
+        content, safe_mode="escape", extensions=MARKDOWN_EXTENSIONS
+    )
+
 
 class ArticleQuerySet(models.QuerySet):
-    def with_favorites(self, user: AnonymousUser | User) -> models.QuerySet:
+    def feed(self, user: User) -> models.QuerySet:
+        """Articles by authors followed by user, annotated with `feed_created`
+        and `feed_article` for ordering.
 
-        return self.annotate(
-            num_favorites=models.Count("favorites"),
-            is_favorite=models.Exists(
-                get_user_model().objects.filter(
-                    pk=user.id, favorites=models.OuterRef("pk")
-                ),
+        Articles are read from the user's materialized timeline. Authors with
+        more than TIMELINE_FANOUT_LIMIT followers are not fanned out on write,
+        so if the user follows any of them their articles are merged in on
+        read. When such an author drops back to the limit, their articles are
+        fanned out by TimelineEntry.objects.resume_fan_out().
+        """
+
+        if (
+            celebrities := user.following.filter(
+                followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+            ).values("pk")
+        ).exists():
+            return self.filter(
+                models.Q(
+                    pk__in=TimelineEntry.objects.filter(user=user).values("article")
+                )
+                | models.Q(author__in=celebrities)
+            ).annotate(
+                feed_created=models.F("created"), feed_article=models.F("pk")
             )
-            if user.is_authenticated
-            else models.Value(False, output_field=models.BooleanField()),
+
+        # ordering on the timeline's own columns lets the whole ORDER BY be
+        # read from timeline_entry_feed_idx
+        return self.filter(timeline_entries__user=user).annotate(
+            feed_created=models.F("timeline_entries__created"),
+            feed_article=models.F("timeline_entries__article"),
+        )
+
+    def tagged(self, tag: str) -> models.QuerySet:
+        """Articles tagged with tag, annotated with `tag_created` and
+        `tag_article` for ordering.
+
+        Articles are read from the materialized tag entries, so the listing
+        is a single range scan of tag_entry_listing_idx.
+        """
+        return self.filter(tag_entries__tag__name=tag).annotate(
+            tag_created=models.F("tag_entries__created"),
+            tag_article=models.F("tag_entries__article"),
+        )
+
+    def favorited_by(self, user: User) -> models.QuerySet:
+        """Articles favorited by user, annotated with `favorite_created` and
+        `favorite_article` for ordering, so the most recent favorites come
+        first.
+
+        Articles are read from the user's favorites, so the listing is a
+        single range scan of favorite_user_created_idx.
+        """
+        return self.filter(favorite_entries__user=user).annotate(
+            favorite_created=models.F("favorite_entries__created"),
+            favorite_article=models.F("favorite_entries__article"),
+        )
+
+    def with_tag_versions(self) -> models.QuerySet:
+        """Annotates the number of tags of each article and its latest tag
+        entry, which between them change whenever tags are added or removed.
+        """
+
+        tag_entries = (
+            TagEntry.objects.filter(article=models.OuterRef("pk"))
+            .order_by()
+            .values("article")
+        )
+
+        return self.annotate(
+            num_tags=models.Subquery(
+                tag_entries.annotate(count=models.Count("pk")).values("count")
+            ),
+            last_tag=models.Subquery(
+                tag_entries.annotate(last=models.Max("pk")).values("last")
+            ),
+        )
+
+    def sync_favorites_count(self) -> int:
+        """Corrects any drift between the stored favorites count and the actual
+        number of favorites. Returns number of articles updated."""
+
+        favorites = (
+            Favorite.objects.filter(article=models.OuterRef("pk"))
+            .order_by()
+            .values("article")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+
+        num_favorites = Coalesce(
+            models.Subquery(favorites, output_field=models.IntegerField()), 0
+        )
+
+        return (
+            self.alias(num_favorites=num_favorites)
+            .exclude(favorites_count=models.F("num_favorites"))
+            .update(favorites_count=num_favorites)
         )
 
 
@@ -34,7 +165,10 @@ ArticleManager = models.Manager.from_queryset(ArticleQuerySet)
 
 
 class Article(models.Model):
-    author: User = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # covered by article_author_created_idx
+    author: User = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_index=False
+    )
 
     title: str = models.CharField(max_length=120)
     summary: str = models.TextField(blank=True)
@@ -46,14 +180,49 @@ class Article(models.Model):
     tags: list[Tag] = TaggableManager(blank=True)
 
     favorites: list[User] = models.ManyToManyField(
-        settings.AUTH_USER_MODEL, blank=True, related_name="favorites"
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name="favorites",
+        through="Favorite",
     )
 
+    # denormalized: maintained by add_favorite() and remove_favorite()
+    favorites_count: int = models.PositiveIntegerField(default=0)
+
+    # denormalized: maintained by comments signals
+    comments_count: int = models.PositiveIntegerField(default=0)
+
+    # pre-rendered content: maintained by save() and render_markdown command
+    content_html: str = models.TextField(blank=True)
+    content_hash: str = models.CharField(max_length=64, blank=True)
+    content_renderer: str = models.CharField(max_length=60, blank=True)
+
     objects = ArticleManager()
 
+    class Meta:
+        # ascending, so they can be scanned backwards for the (-created, -id)
+        # order of every article list: the id tie-break is the implicit last
+        # column of each index
+        indexes = [
+            models.Index(fields=["created"], name="article_created_idx"),
+            models.Index(
+                fields=["author", "created"], name="article_author_created_idx"
+            ),
+        ]
+
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs) -> None:
+        if self.render_content() and (update_fields := kwargs.get("update_fields")):
+            kwargs["update_fields"] = {
+                *update_fields,
+                "content_html",
+                "content_hash",
+                "content_renderer",
+            }
+        super().save(*args, **kwargs)
+
     @property
     def slug(self) -> str:
         return slugify(self.title)
@@ -67,5 +236,314 @@ class Article(models.Model):
             },
         )
 
+    def delete(self, *args, **kwargs) -> tuple[int, dict[str, int]]:
+        # comments are deleted in a single statement: cascading would send
+        # signals decrementing the comments count and invalidating cached
+        # pages of this article once per comment, both made redundant by
+        # deleting the article itself
+        comments_table = self.comment_set.model._meta.db_table
+
+        with transaction.atomic(using=self._state.db):
+            with connections[self._state.db].cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {comments_table} WHERE article_id = %s", [self.pk]
+                )
+            return super().delete(*args, **kwargs)
+
+    def add_favorite(self, user: User) -> bool:
+        """Adds favorite and increments favorites count. Returns False if
+        user has already favorited this article."""
+        with transaction.atomic():
+            _, created = Favorite.objects.get_or_create(
+                article=self, user=user
+            )
+            if created:
+                self.update_favorites_count(1)
+                self.favorites_changed("post_add", user)
+        return created
+
+    def remove_favorite(self, user: User) -> bool:
+        """Removes favorite and decrements favorites count. Returns False if
+        user had not favorited this article."""
+        with transaction.atomic():
+            deleted, _ = Favorite.objects.filter(
+                article=self, user=user
+            ).delete()
+            if deleted:
+                self.update_favorites_count(-deleted)
+                self.favorites_changed("post_remove", user)
+        return bool(deleted)
+
+    def favorites_changed(self, action: str, user: User) -> None:
+        # writes to the through table bypass the related manager, so send
+        # the signal favorites.add() or favorites.remove() would have sent
+        models.signals.m2m_changed.send(
+            sender=Favorite,
+            action=action,
+            instance=self,
+            reverse=False,
+            model=get_user_model(),
+            pk_set={user.pk},
+            using=self._state.db,
+        )
+
+    def update_favorites_count(self, delta: int) -> None:
+        Article.objects.filter(pk=self.pk).update(
+            favorites_count=models.F("favorites_count") + delta
+        )
+        self.refresh_from_db(fields=["favorites_count"])
+
+    def render_content(self, force: bool = False) -> bool:
+        """Renders content to HTML if content or renderer has changed since
+        last render. Returns True if re-rendered."""
+
+        content_hash = hashlib.sha256(self.content.encode()).hexdigest()
+
+        if (
+            not force
+            and content_hash == self.content_hash
+            and self.content_renderer == MARKDOWN_RENDERER_VERSION
+        ):
+            return False
+
+        self.content_html = render_markdown(self.content)
+        self.content_hash = content_hash
+        self.content_renderer = MARKDOWN_RENDERER_VERSION
+        return True
+
     def as_markdown(self) -> str:
-        return markdown.markdown(self.content, safe_mode="escape", extensions=["extra"])
+        if self.content_renderer == MARKDOWN_RENDERER_VERSION:
+            return self.content_html
+        # stored HTML is stale until render_markdown command has been run
+        return render_markdown(self.content)
+
+
+class Favorite(models.Model):
+    """User's favorite article: the through table of Article.favorites,
+    timestamped so a user's favorites can be listed in the order they were
+    made."""
+
+    # covered by favorite_user_created_idx
+    user: User = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="favorite_entries",
+        db_index=False,
+    )
+    article: Article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="favorite_entries"
+    )
+
+    # not auto_now_add, so imported favorites keep their original time
+    created: datetime = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # the table created for the former auto-created through model
+        db_table = "articles_article_favorites"
+        unique_together = [("article", "user")]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-article"],
+                name="favorite_user_created_idx",
+            ),
+        ]
+
+
+class TimelineEntryQuerySet(models.QuerySet):
+    def fan_out(self, article: Article) -> int:
+        """Adds article to the timelines of all followers of the author.
+        Returns number of entries created.
+
+        Articles by authors with more than TIMELINE_FANOUT_LIMIT followers are
+        skipped, these are instead fetched on read by ArticleQuerySet.feed().
+        """
+        if article.author.followers_count > settings.TIMELINE_FANOUT_LIMIT:
+            return 0
+
+        followers = article.author.followers.values_list("pk", flat=True)
+
+        return len(
+            self.bulk_create(
+                [
+                    TimelineEntry(
+                        user_id=follower_id,
+                        article=article,
+                        created=article.created,
+                    )
+                    for follower_id in followers.iterator()
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+        )
+
+    def backfill(self, user: User, author: User) -> int:
+        """Adds most recent articles by author to user's timeline, after user
+        follows author. Returns number of entries created.
+
+        Entries are copied in a single INSERT ... SELECT, as authors may have
+        up to TIMELINE_BACKFILL_LIMIT articles to copy.
+        """
+        if author.followers_count > settings.TIMELINE_FANOUT_LIMIT:
+            return 0
+
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                TIMELINE_BACKFILL_SQL,
+                [user.pk, author.pk, settings.TIMELINE_BACKFILL_LIMIT],
+            )
+            return cursor.rowcount
+
+    def resume_fan_out(self, author: User, num_removed: int) -> int:
+        """Adds most recent articles by author to the timelines of all their
+        followers, if losing `num_removed` followers has just brought author
+        down to TIMELINE_FANOUT_LIMIT: articles written above the limit were
+        not fanned out, and feed() no longer merges them in on read. Returns
+        number of entries created.
+
+        `author.followers_count` must be the count after the followers were
+        removed. Nothing is needed going up: feed() merges in all articles by
+        the author, whether fanned out or not.
+        """
+        if not (
+            author.followers_count
+            <= settings.TIMELINE_FANOUT_LIMIT
+            < author.followers_count + num_removed
+        ):
+            return 0
+
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                TIMELINE_RESUME_FAN_OUT_SQL,
+                [author.pk, settings.TIMELINE_BACKFILL_LIMIT, author.pk],
+            )
+            return cursor.rowcount
+
+    def prune(self, user: User, author: User) -> int:
+        """Removes all articles by author from user's timeline, after user
+        unfollows author. Returns number of entries deleted."""
+        deleted, _ = self.filter(user=user, article__author=author).delete()
+        return deleted
+
+
+TimelineEntryManager = models.Manager.from_queryset(TimelineEntryQuerySet)
+
+
+class TimelineEntry(models.Model):
+    """Materialized "Your Feed" entry: an article by an author followed by
+    the user."""
+
+    # covered by timeline_entry_feed_idx
+    user: User = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        db_index=False,
+    )
+    article: Article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+
+    # copied from article, so feed can be read in a single index range scan
+    created: datetime = models.DateTimeField()
+
+    objects = TimelineEntryManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "article"], name="unique_timeline_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created", "-article"],
+                name="timeline_entry_feed_idx",
+            ),
+        ]
+
+
+class TagEntry(models.Model):
+    """Materialized tag listing entry: an article tagged with the tag.
+
+    Tags are attached through taggit's generic relation, which cannot be
+    indexed together with the article's creation time.
+    """
+
+    # covered by tag_entry_listing_idx
+    tag: Tag = models.ForeignKey(
+        Tag, on_delete=models.CASCADE, related_name="article_entries", db_index=False
+    )
+    article: Article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="tag_entries"
+    )
+
+    # copied from article, so tag listing can be read in a single index range
+    # scan
+    created: datetime = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "article"], name="unique_tag_entry"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["tag", "-created", "-article"],
+                name="tag_entry_listing_idx",
+            ),
+        ]
+
+
+class TagCountQuerySet(models.QuerySet):
+    def update_counts(self, tag_ids: set[int], delta: int) -> None:
+        """Adjusts article counts of tags, creating counts as needed."""
+        if not tag_ids:
+            return
+
+        with transaction.atomic():
+            self.bulk_create(
+                [TagCount(tag_id=tag_id) for tag_id in tag_ids],
+                ignore_conflicts=True,
+            )
+            self.filter(tag__in=tag_ids).update(
+                num_articles=models.F("num_articles") + delta
+            )
+
+        cache.delete(POPULAR_TAGS_CACHE_KEY)
+
+    def popular_tags(self) -> list[Tag]:
+        """Returns the most used tags, ordered by number of articles."""
+
+        def _popular_tags() -> list[Tag]:
+            return list(
+                Tag.objects.filter(article_count__num_articles__gt=0).order_by(
+                    "-article_count__num_articles", "name"
+                )[: settings.POPULAR_TAGS_LIMIT]
+            )
+
+        return cache.get_or_set(
+            POPULAR_TAGS_CACHE_KEY, _popular_tags, settings.POPULAR_TAGS_CACHE_TIMEOUT
+        )
+
+
+TagCountManager = models.Manager.from_queryset(TagCountQuerySet)
+
+
+class TagCount(models.Model):
+    """Number of articles per tag, maintained as article tags change."""
+
+    tag: Tag = models.OneToOneField(
+        Tag,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="article_count",
+    )
+
+    num_articles: int = models.IntegerField(default=0)
+
+    objects = TagCountManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-num_articles"], name="tag_count_num_articles_idx"),
+        ]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+
+from .models import Article
+
+# viewer-specific favorite button is inserted here
+FAVORITE_MARKER = "<!-- favorite -->"
+
+Preview = tuple[SafeString, SafeString]
+
+
+def tags_version_key(article_id: int) -> str:
+    return f"article-preview-tags:{article_id}"
+
+
+def author_version_key(author_id: int) -> str:
+    return f"article-preview-author:{author_id}"
+
+
+def invalidate_tags(article_id: int) -> None:
+    cache.set(tags_version_key(article_id), uuid.uuid4().hex, None)
+
+
+def invalidate_author(author_id: int) -> None:
+    cache.set(author_version_key(author_id), uuid.uuid4().hex, None)
+
+
+def render_previews(articles: list[Article]) -> list[Preview]:
+    """Returns the rendered preview of each article as the HTML before and
+    after the favorite button, which depends on the viewer.
+
+    Previews are cached on article id, last update, comments count, tags
+    version and author version. Versions are random tokens rather than
+    counters, so an evicted version can never match an older cached fragment.
+    """
+
+    versions = _get_versions(articles)
+
+    keys = {
+        article.id: ":".join(
+            [
+                f"article-preview:{article.id}",
+                str(article.updated.timestamp()),
+                str(article.comments_count),
+                versions[tags_version_key(article.id)],
+                versions[author_version_key(article.author_id)],
+            ]
+        )
+        for article in articles
+        # search snippets are specific to the query
+        if not getattr(article, "snippet", None)
+    }
+
+    fragments: dict[str, tuple[str, str]] = cache.get_many(keys.values())
+
+    rendered: dict[int, tuple[str, str]] = {
+        article_id: fragments[key]
+        for article_id, key in keys.items()
+        if key in fragments
+    }
+
+    if missing := [article for article in articles if article.id not in rendered]:
+        prefetch_related_objects(missing, "tags")
+
+        for article in missing:
+            head, tail = render_to_string(
+                "articles/_article_preview.html", {"article": article}
+            ).split(FAVORITE_MARKER)
+            rendered[article.id] = (head, tail)
+
+        cache.set_many(
+            {
+                keys[article.id]: rendered[article.id]
+                for article in missing
+                if article.id in keys
+            },
+            settings.ARTICLE_PREVIEW_CACHE_TIMEOUT,
+        )
+
+    return [_as_preview(rendered[article.id]) for article in articles]
+
+
+def _get_versions(articles: list[Article]) -> dict[str, str]:
+    version_keys = {
+        key
+        for article in articles
+        for key in (
+            tags_version_key(article.id),
+            author_version_key(article.author_id),
+        )
+    }
+
+    versions = cache.get_many(version_keys)
+
+    if missing := {key: uuid.uuid4().hex for key in version_keys - versions.keys()}:
+        cache.set_many(missing, None)
+        versions.update(missing)
+
+    return versions
+
+
+def _as_preview(fragment: tuple[str, str]) -> Preview:
+    head, tail = fragment
+    return mark_safe(head), mark_safe(tail)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import unicodedata
+
+from django.db import connections, models, router
+from django.http import Http404, HttpRequest
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+from realworld.pagination import CURSOR_PARAM, MAX_PK, PAGE_SIZE, Page
+
+from .models import Article
+
+# control characters are used as snippet highlight markers, so the snippet
+# can be HTML-escaped before the markers are replaced with <mark> tags
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+# search index of articles, kept in sync by triggers. SQLite drops triggers
+# when it rebuilds a table, e.g. to add or alter a column: migrations doing
+# so must drop and create FTS_TRIGGERS again afterwards.
+FTS_TABLE = """
+CREATE VIRTUAL TABLE articles_article_fts USING fts5(
+    title,
+    summary,
+    content,
+    content='articles_article',
+    content_rowid='id',
+    tokenize='porter unicode61'
+)
+"""
+
+FTS_TRIGGERS = {
+    "articles_article_fts_insert": """
+    CREATE TRIGGER articles_article_fts_insert
+    AFTER INSERT ON articles_article
+    BEGIN
+        INSERT INTO articles_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    "articles_article_fts_delete": """
+    CREATE TRIGGER articles_article_fts_delete
+    AFTER DELETE ON articles_article
+    BEGIN
+        INSERT INTO articles_article_fts(
+            articles_article_fts, rowid, title, summary, content
+        )
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    "articles_article_fts_update": """
+    CREATE TRIGGER articles_article_fts_update
+    AFTER UPDATE OF title, summary, content ON articles_article
+    BEGIN
+        INSERT INTO articles_article_fts(
+            articles_article_fts, rowid, title, summary, content
+        )
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO articles_article_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+}
+
+DROP_FTS_TRIGGERS = [f"DROP TRIGGER IF EXISTS {name}" for name in FTS_TRIGGERS]
+
+# BM25 column weights: title, summary, content
+SEARCH_SQL = f"""
+SELECT rowid, snippet(articles_article_fts, -1, '{MARK_START}', '{MARK_END}', '…', 24)
+FROM articles_article_fts
+WHERE articles_article_fts MATCH %s
+ORDER BY bm25(articles_article_fts, 10.0, 5.0, 1.0), rowid
+LIMIT %s OFFSET %s
+"""
+
+
+def build_match_query(search: str) -> str:
+    """Quotes each search term so FTS5 query syntax in user input is treated
+    as plain text. The last term is matched as a prefix.
+
+    Control characters are removed: FTS5 rejects some of them, such as NUL,
+    even inside quotes.
+    """
+    search = "".join(
+        char if unicodedata.category(char) != "Cc" else " " for char in search
+    )
+    terms = ['"' + term.replace('"', '""') + '"' for term in search.split()]
+    return " ".join(terms) + "*" if terms else ""
+
+
+def format_snippet(snippet: str) -> SafeString:
+    return mark_safe(
+        escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+    )
+
+
+def search_index(search: str, limit: int, offset: int = 0) -> list[tuple[int, str]]:
+    """Returns (article id, snippet) of matching articles ranked by BM25."""
+    if not (match := build_match_query(search)):
+        return []
+
+    # the index is read from the same database as the articles, which may be
+    # a replica
+    with connections[router.db_for_read(Article)].cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [match, limit, offset])
+        return cursor.fetchall()
+
+
+def search_articles(
+    request: HttpRequest,
+    queryset: models.QuerySet,
+    search: str,
+    page_size: int = PAGE_SIZE,
+) -> Page:
+    """Returns page of articles in queryset matching search, in rank order
+    with `snippet` attribute set.
+
+    Ranked results have no stable keyset, so the cursor is the offset into
+    the ranked matches.
+    """
+
+    try:
+        offset = int(request.GET.get(CURSOR_PARAM, 0))
+    except ValueError:
+        raise Http404("Invalid cursor")
+
+    # OFFSET is a 64-bit integer
+    if not 0 <= offset <= MAX_PK:
+        raise Http404("Invalid cursor")
+
+    results = search_index(search, page_size + 1, offset)
+
+    next_cursor: str | None = None
+
+    if len(results) > page_size:
+        results = results[:page_size]
+        next_cursor = str(offset + page_size)
+
+    articles = queryset.in_bulk([article_id for article_id, _ in results])
+
+    object_list = []
+
+    for article_id, snippet in results:
+        if article := articles.get(article_id):
+            article.snippet = format_snippet(snippet)
+            object_list.append(article)
+
+    return Page(request, object_list, next_cursor)
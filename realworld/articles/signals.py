@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from realworld import relationships
+from realworld.response_cache import invalidate_cache_tags, tag_listing_key
+
+from . import previews
+from .autocomplete import tag_index
+from .models import Article, Favorite, TagCount, TagEntry
+
+User = get_user_model()
+
+# names of the tags last shown in the Popular Tags sidebar
+POPULAR_TAGS_SHOWN_CACHE_KEY = "popular-tags-shown"
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tag_counts(
+    sender, instance, action: str, pk_set: set[int] | None, **kwargs
+) -> None:
+    if not isinstance(instance, Article):
+        return
+
+    if action == "post_add":
+        TagCount.objects.update_counts(pk_set, 1)
+    elif action == "post_remove":
+        TagCount.objects.update_counts(pk_set, -1)
+    elif action == "pre_clear":
+        TagCount.objects.update_counts(
+            set(instance.tags.values_list("pk", flat=True)), -1
+        )
+
+
+@receiver(pre_delete, sender=Article)
+def decrement_deleted_tag_counts(sender, instance: Article, **kwargs) -> None:
+    # tagged items are cascaded without m2m_changed signals, including when
+    # the article is deleted along with its author
+    TagCount.objects.update_counts(
+        set(instance.tags.values_list("pk", flat=True)), -1
+    )
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tag_entries(
+    sender, instance, action: str, pk_set: set[int] | None, **kwargs
+) -> None:
+    if not isinstance(instance, Article):
+        return
+
+    if action == "post_add":
+        TagEntry.objects.bulk_create(
+            [
+                TagEntry(tag_id=tag_id, article=instance, created=instance.created)
+                for tag_id in pk_set
+            ],
+            ignore_conflicts=True,
+        )
+    elif action == "post_remove":
+        TagEntry.objects.filter(article=instance, tag__in=pk_set).delete()
+    elif action == "post_clear":
+        TagEntry.objects.filter(article=instance).delete()
+
+
+@receiver(post_save, sender=Tag)
+def add_to_tag_index(sender, instance: Tag, created: bool, **kwargs) -> None:
+    if created:
+        tag_index.add(instance.name)
+
+
+@receiver(post_delete, sender=Tag)
+def remove_from_tag_index(sender, instance: Tag, **kwargs) -> None:
+    tag_index.remove(instance.name)
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_preview_tags(sender, instance, action: str, **kwargs) -> None:
+    if isinstance(instance, Article) and action in (
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        previews.invalidate_tags(instance.id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_preview_author(
+    sender, instance: User, update_fields: frozenset[str] | None, **kwargs
+) -> None:
+    # ignore e.g. last_login updates
+    if update_fields is None or {"name", "image"} & update_fields:
+        previews.invalidate_author(instance.id)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_responses(
+    sender, instance: Article, created: bool = False, **kwargs
+) -> None:
+    # edits only change pages listing the article: a new or deleted article
+    # changes every listing
+    invalidate_cache_tags(
+        *(["articles"] if created or kwargs["signal"] is post_delete else []),
+        f"article:{instance.id}",
+        f"user-articles:{instance.author_id}",
+    )
+
+
+@receiver(m2m_changed, sender=Favorite)
+def invalidate_favorites_changed_responses(
+    sender, instance, action: str, reverse: bool, pk_set: set[int] | None, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    # pk_set is None on clear: invalidate only the instance side
+    if reverse:
+        article_ids, user_ids = pk_set or set(), {instance.id}
+    else:
+        article_ids, user_ids = {instance.id}, pk_set or set()
+
+    invalidate_cache_tags(
+        *(f"article:{article_id}" for article_id in article_ids),
+        *(f"user-articles:{user_id}" for user_id in user_ids),
+    )
+
+
+@receiver(m2m_changed, sender=Favorite)
+def invalidate_favorites_changed_relationships(
+    sender, instance, action: str, reverse: bool, pk_set: set[int] | None, **kwargs
+) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    # pk_set is None on clear: invalidate only the instance side
+    relationships.invalidate_favorites(
+        *({instance.id} if reverse else pk_set or set())
+    )
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_tags_responses(
+    sender, instance, action: str, pk_set: set[int] | None, **kwargs
+) -> None:
+    if not isinstance(instance, Article):
+        return
+
+    # tag names are not known after a clear
+    if action == "pre_clear":
+        instance._cleared_tags = instance.tags.names()
+        return
+
+    if action == "post_clear":
+        names = getattr(instance, "_cleared_tags", [])
+    elif action in ("post_add", "post_remove"):
+        names = Tag.objects.filter(pk__in=pk_set).values_list("name", flat=True)
+    else:
+        return
+
+    # the article is added to or removed from the listings of its tags
+    invalidate_cache_tags(
+        f"article:{instance.id}", *(tag_listing_key(name) for name in names)
+    )
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_popular_tags_responses(sender, instance, action: str, **kwargs) -> None:
+    if not isinstance(instance, Article) or action not in (
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        return
+
+    # most changes in counts do not change the tags in the sidebar
+    names = [tag.name for tag in TagCount.objects.popular_tags()]
+
+    if cache.get(POPULAR_TAGS_SHOWN_CACHE_KEY) != names:
+        cache.set(POPULAR_TAGS_SHOWN_CACHE_KEY, names, None)
+        invalidate_cache_tags("popular-tags")
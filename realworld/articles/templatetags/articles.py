@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from django import template
+from realworld.articles.models import Article
+from realworld.articles.previews import Preview, render_previews
+
+register = template.Library()
+
+
+@register.filter
+def with_previews(articles: Iterable[Article]) -> list[tuple[Article, Preview]]:
+    """Pairs each article with its cached preview fragment."""
+    articles = list(articles)
+    return list(zip(articles, render_previews(articles)))
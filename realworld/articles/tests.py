@@ -1,12 +1,31 @@
 import http
+import io
+import re
+import time
+from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import AnonymousUser
-from django.test import TestCase
-from django.urls import reverse, reverse_lazy
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import ConnectionDoesNotExist
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse, reverse_lazy
+from django.utils.http import http_date
+from realworld import replicas
+from realworld.accounts.email_filter import email_filter
+from realworld.comments.models import Comment
+from realworld.instrumentation import QueryBudgetExceeded
+from realworld.pagination import PAGE_SIZE
 from taggit.models import Tag
 
-from .models import Article
+from . import autocomplete, views
+from .autocomplete import TagIndex, tag_index
+from .models import MARKDOWN_RENDERER_VERSION, Article, TagCount, TimelineEntry
+from .previews import render_previews
+from .search import FTS_TRIGGERS, search_index
 
 User = get_user_model()
 
@@ -30,50 +49,650 @@ class TestArticleModel(TestCase):
             author=cls.author,
         )
 
-    def test_with_favorites_anonymous_false(self):
-        article = Article.objects.with_favorites(AnonymousUser()).first()
-        self.assertEqual(article.num_favorites, 0)
-        self.assertFalse(article.is_favorite)
+    def test_add_favorite(self):
+        self.assertTrue(self.article.add_favorite(self.other_user))
+        self.assertEqual(self.article.favorites_count, 1)
 
-    def test_with_favorites_anonymous_true(self):
-        self.article.favorites.add(self.other_user)
+        self.assertFalse(self.article.add_favorite(self.other_user))
+        self.assertEqual(self.article.favorites_count, 1)
+
+    def test_remove_favorite(self):
+        self.article.add_favorite(self.other_user)
 
-        article = Article.objects.with_favorites(AnonymousUser()).first()
-        self.assertEqual(article.num_favorites, 1)
-        self.assertFalse(article.is_favorite)
+        self.assertTrue(self.article.remove_favorite(self.other_user))
+        self.assertEqual(self.article.favorites_count, 0)
 
-    def test_with_favorites_same_user_false(self):
-        article = Article.objects.with_favorites(self.author).first()
-        self.assertEqual(article.num_favorites, 0)
-        self.assertFalse(article.is_favorite)
+        self.assertFalse(self.article.remove_favorite(self.other_user))
+        self.assertEqual(self.article.favorites_count, 0)
 
-    def test_with_favorites_same_user_true(self):
+    def test_sync_favorites_count(self):
         self.article.favorites.add(self.other_user)
 
-        article = Article.objects.with_favorites(self.author).first()
-        self.assertEqual(article.num_favorites, 1)
-        self.assertFalse(article.is_favorite)
+        Article.objects.create(title="test", author=self.author, favorites_count=3)
 
-    def test_with_favorites_other_user_false(self):
-        article = Article.objects.with_favorites(self.other_user).first()
-        self.assertEqual(article.num_favorites, 0)
-        self.assertFalse(article.is_favorite)
+        self.assertEqual(Article.objects.sync_favorites_count(), 2)
+        self.assertEqual(
+            set(Article.objects.values_list("favorites_count", flat=True)), {0, 1}
+        )
+        self.assertEqual(Article.objects.sync_favorites_count(), 0)
 
-    def test_with_favorites_other_user_true(self):
+    def test_sync_favorites_count_command(self):
         self.article.favorites.add(self.other_user)
 
-        article = Article.objects.with_favorites(self.other_user).first()
-        self.assertEqual(article.num_favorites, 1)
-        self.assertTrue(article.is_favorite)
+        call_command("sync_favorites_count", batch_size=1, stdout=io.StringIO())
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.favorites_count, 1)
+
+    def test_delete_comments(self):
+        Comment.objects.bulk_create(
+            Comment(article=self.article, author=self.other_user, content="test")
+            for _ in range(3)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.article.delete()
+
+        # comments are deleted in one statement, without updating the article
+        # once per comment
+        self.assertFalse(
+            [query for query in queries if query["sql"].startswith("UPDATE")]
+        )
+        self.assertFalse(Comment.objects.exists())
+
+    def test_render_content_on_save(self):
+        self.article.content = "*test*"
+        self.article.save()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.content_html, "<p><em>test</em></p>")
+        self.assertEqual(self.article.content_renderer, MARKDOWN_RENDERER_VERSION)
+        self.assertEqual(self.article.as_markdown(), "<p><em>test</em></p>")
+
+    def test_render_content_unchanged(self):
+        self.assertFalse(self.article.render_content())
+        self.assertTrue(self.article.render_content(force=True))
+
+    def test_as_markdown_stale_renderer(self):
+        Article.objects.filter(pk=self.article.pk).update(
+            content="*test*", content_renderer="0"
+        )
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.as_markdown(), "<p><em>test</em></p>")
+
+    def test_render_markdown_command(self):
+        Article.objects.filter(pk=self.article.pk).update(
+            content="*test*", content_renderer="0"
+        )
+        updated = Article.objects.get(pk=self.article.pk).updated
+
+        call_command("render_markdown", stdout=io.StringIO())
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.content_html, "<p><em>test</em></p>")
+        self.assertEqual(self.article.content_renderer, MARKDOWN_RENDERER_VERSION)
+        self.assertEqual(self.article.updated, updated)
+
+
+class TestTimeline(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+        cls.other_user = User.objects.create(email="tester3@gmail.com", name="tester3")
+
+        cls.author.add_follower(cls.follower)
+
+    def test_fan_out(self):
+        article = Article.objects.create(title="test", author=self.author)
+
+        self.assertEqual(TimelineEntry.objects.fan_out(article), 1)
+        self.assertEqual(list(Article.objects.feed(self.follower)), [article])
+        self.assertEqual(list(Article.objects.feed(self.other_user)), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_fan_out_on_read(self):
+        article = Article.objects.create(title="test", author=self.author)
+
+        self.assertEqual(TimelineEntry.objects.fan_out(article), 0)
+        self.assertEqual(list(Article.objects.feed(self.follower)), [article])
+        self.assertEqual(list(Article.objects.feed(self.other_user)), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_fan_out_limit_crossed(self):
+        fanned_out = Article.objects.create(title="fanned out", author=self.author)
+        TimelineEntry.objects.fan_out(fanned_out)
+
+        # up: no longer fanned out, all articles are merged in on read
+        self.author.add_follower(self.other_user)
+        self.assertEqual(
+            TimelineEntry.objects.backfill(self.other_user, self.author), 0
+        )
+
+        merged = Article.objects.create(title="merged", author=self.author)
+        self.assertEqual(TimelineEntry.objects.fan_out(merged), 0)
+
+        self.assertCountEqual(Article.objects.feed(self.follower), [merged, fanned_out])
+        self.assertCountEqual(
+            Article.objects.feed(self.other_user), [merged, fanned_out]
+        )
+
+        # down: articles merged in on read are fanned out
+        self.author.remove_follower(self.other_user)
+        TimelineEntry.objects.prune(self.other_user, self.author)
+
+        self.assertEqual(TimelineEntry.objects.resume_fan_out(self.author, 1), 1)
+        self.assertCountEqual(Article.objects.feed(self.follower), [merged, fanned_out])
+        self.assertEqual(list(Article.objects.feed(self.other_user)), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_fan_out_limit_not_crossed(self):
+        self.author.add_follower(self.other_user)
+        Article.objects.create(title="test", author=self.author)
+
+        # still above the limit
+        self.assertEqual(TimelineEntry.objects.resume_fan_out(self.author, 0), 0)
+
+    def test_backfill(self):
+        article = Article.objects.create(title="test", author=self.author)
+
+        self.author.add_follower(self.other_user)
+
+        self.assertEqual(
+            TimelineEntry.objects.backfill(self.other_user, self.author), 1
+        )
+        self.assertEqual(list(Article.objects.feed(self.other_user)), [article])
+
+    def test_prune(self):
+        article = Article.objects.create(title="test", author=self.author)
+        TimelineEntry.objects.fan_out(article)
+
+        self.author.remove_follower(self.follower)
+
+        self.assertEqual(TimelineEntry.objects.prune(self.follower, self.author), 1)
+        self.assertEqual(list(Article.objects.feed(self.follower)), [])
+
+    def test_backfill_timelines_command(self):
+        Article.objects.create(title="test", author=self.author)
+
+        call_command("backfill_timelines", stdout=io.StringIO())
+
+        self.assertTrue(TimelineEntry.objects.filter(user=self.follower).exists())
+
+
+class TestTagCount(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester@gmail.com", name="tester")
+
+    def setUp(self):
+        cache.clear()
+
+    def get_counts(self) -> dict[str, int]:
+        return dict(TagCount.objects.values_list("tag__name", "num_articles"))
+
+    def test_add_tags(self):
+        first = Article.objects.create(title="first", author=self.author)
+        first.tags.add("python", "django")
+
+        second = Article.objects.create(title="second", author=self.author)
+        second.tags.add("python")
+
+        self.assertEqual(self.get_counts(), {"python": 2, "django": 1})
+
+        self.assertEqual(
+            [tag.name for tag in TagCount.objects.popular_tags()],
+            ["python", "django"],
+        )
+
+    def test_set_tags(self):
+        article = Article.objects.create(title="test", author=self.author)
+        article.tags.set(["python", "django"])
+        article.tags.set(["python", "html"])
+
+        self.assertEqual(self.get_counts(), {"python": 1, "django": 0, "html": 1})
+        self.assertEqual(
+            {tag.name for tag in TagCount.objects.popular_tags()}, {"python", "html"}
+        )
+
+    def test_remove_tags(self):
+        article = Article.objects.create(title="test", author=self.author)
+        article.tags.add("python", "django")
+        article.tags.remove("django", "html")
+
+        self.assertEqual(self.get_counts(), {"python": 1, "django": 0})
+
+    def test_delete_article(self):
+        article = Article.objects.create(title="test", author=self.author)
+        article.tags.add("python")
+
+        self.assertEqual(len(TagCount.objects.popular_tags()), 1)
+
+        article.delete()
+
+        self.assertEqual(self.get_counts(), {"python": 0})
+        self.assertEqual(TagCount.objects.popular_tags(), [])
+
+    def test_delete_author(self):
+        article = Article.objects.create(title="test", author=self.author)
+        article.tags.add("python")
+
+        self.assertEqual(len(TagCount.objects.popular_tags()), 1)
+
+        self.author.delete()
+
+        self.assertEqual(self.get_counts(), {"python": 0})
+        self.assertEqual(TagCount.objects.popular_tags(), [])
+
+
+class TestArticlePreviews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.other_user = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        cls.article = Article.objects.create(title="test", author=cls.author)
+        cls.article.tags.add("python")
+
+    def setUp(self):
+        cache.clear()
+
+    def get_preview(self) -> str:
+        [(head, tail)] = render_previews(list(Article.objects.select_related("author")))
+        return head + tail
+
+    def test_render(self):
+        preview = self.get_preview()
+        self.assertIn("tester1", preview)
+        self.assertIn("python", preview)
+        self.assertIn(self.article.get_absolute_url(), preview)
+
+    def test_cached(self):
+        self.get_preview()
+
+        # no tags prefetch
+        with self.assertNumQueries(1):
+            self.get_preview()
+
+    def test_invalidate_article_edit(self):
+        self.get_preview()
+
+        self.article.title = "new title"
+        self.article.save()
+
+        self.assertIn("new title", self.get_preview())
+
+    def test_invalidate_tags(self):
+        self.get_preview()
+
+        self.article.tags.add("django")
+
+        self.assertIn("django", self.get_preview())
+
+    def test_invalidate_author(self):
+        self.get_preview()
+
+        self.author.name = "new name"
+        self.author.save()
+
+        self.assertIn("new name", self.get_preview())
+
+    def test_search_snippet_not_cached(self):
+        [article] = Article.objects.select_related("author")
+        article.snippet = "snippet"
+
+        [(head, tail)] = render_previews([article])
+        self.assertIn("snippet", tail)
+
+        self.assertNotIn("snippet", self.get_preview())
+
+    def test_viewer_overlay(self):
+        self.article.add_favorite(self.other_user)
+
+        self.client.get(reverse("home"))
+
+        self.client.force_login(self.other_user)
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "Remove from Favorites")
+
+        self.client.force_login(self.author)
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "Add to Favorites")
 
 
 class TestHomeView(TestCase):
     url = reverse_lazy("home")
 
+    def setUp(self):
+        cache.clear()
+
     def test_get(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, http.HTTPStatus.OK)
 
+    def test_get_paginated(self):
+        author = User.objects.create(email="tester@gmail.com", name="tester")
+
+        Article.objects.bulk_create(
+            [Article(title=f"test {i}", author=author) for i in range(25)]
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+        page = response.context["page"]
+        self.assertEqual(len(page), 20)
+        self.assertTrue(page.has_next)
+
+        response = self.client.get(
+            self.url,
+            {"cursor": page.next_cursor},
+            HTTP_HX_REQUEST="true",
+            HTTP_HX_TARGET="next-page",
+        )
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertTemplateUsed(response, "articles/_articles.html")
+        self.assertTemplateNotUsed(response, "articles/home.html")
+
+        next_page = response.context["page"]
+        self.assertEqual(len(next_page), 5)
+        self.assertFalse(next_page.has_next)
+
+        self.assertFalse(
+            {article.id for article in page} & {article.id for article in next_page}
+        )
+
+    def test_get_own_feed(self):
+        author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        author.add_follower(follower)
+
+        article = Article.objects.create(title="test", author=author)
+        TimelineEntry.objects.fan_out(article)
+
+        Article.objects.create(title="test", author=follower)
+
+        self.client.force_login(follower)
+
+        response = self.client.get(self.url, {"own": ""})
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertTrue(response.context["own_feed"])
+        self.assertEqual(list(response.context["page"]), [article])
+
+    def test_get_popular_tags(self):
+        author = User.objects.create(email="tester@gmail.com", name="tester")
+        article = Article.objects.create(title="test", author=author)
+        article.tags.add("python")
+
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [tag.name for tag in response.context["tags"]],
+            ["python"],
+        )
+
+    def test_get_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+    def test_get_cursor_datetime_out_of_range(self):
+        response = self.client.get(self.url, {"cursor": "99999999999999999999_1"})
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+    def test_get_cursor_pk_out_of_range(self):
+        response = self.client.get(self.url, {"cursor": "1_99999999999999999999999"})
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+
+class TestSearchView(TestCase):
+    url = reverse_lazy("search")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester@gmail.com", name="tester")
+
+        cls.title_match = Article.objects.create(
+            title="Learning Django", content="a web framework", author=cls.author
+        )
+        cls.content_match = Article.objects.create(
+            title="Web frameworks",
+            content="Comparing <b>django</b> and flask",
+            author=cls.author,
+        )
+        cls.no_match = Article.objects.create(
+            title="Python", content="a programming language", author=cls.author
+        )
+
+    def test_search(self):
+        response = self.client.get(self.url, {"search": "django"})
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertTemplateUsed(response, "articles/search.html")
+        self.assertEqual(
+            list(response.context["page"]), [self.title_match, self.content_match]
+        )
+
+    def test_search_snippet(self):
+        response = self.client.get(self.url, {"search": "flask"})
+        [article] = response.context["page"]
+        self.assertEqual(
+            article.snippet,
+            "Comparing &lt;b&gt;django&lt;/b&gt; and <mark>flask</mark>",
+        )
+
+    def test_search_prefix(self):
+        response = self.client.get(self.url, {"search": "progr"})
+        self.assertEqual(list(response.context["page"]), [self.no_match])
+
+    def test_search_query_syntax(self):
+        response = self.client.get(self.url, {"search": 'django" OR NOT ('})
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(list(response.context["page"]), [])
+
+    def test_search_updated(self):
+        self.no_match.content = "a django tutorial"
+        self.no_match.save()
+
+        response = self.client.get(self.url, {"search": "tutorial"})
+        self.assertEqual(list(response.context["page"]), [self.no_match])
+
+    def test_search_deleted(self):
+        self.title_match.delete()
+
+        response = self.client.get(self.url, {"search": "django"})
+        self.assertEqual(list(response.context["page"]), [self.content_match])
+
+    def test_search_empty(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context["page"]), 3)
+
+    def test_search_paginated(self):
+        response = self.client.get(
+            self.url,
+            {"search": "django", "cursor": "1"},
+            HTTP_HX_REQUEST="true",
+            HTTP_HX_TARGET="next-page",
+        )
+        self.assertTemplateUsed(response, "articles/_articles.html")
+        self.assertEqual(list(response.context["page"]), [self.content_match])
+
+    def test_search_invalid_cursor(self):
+        response = self.client.get(self.url, {"search": "django", "cursor": "x"})
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+    def test_search_cursor_out_of_range(self):
+        for cursor in ("99999999999999999999999", "-1"):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    self.url, {"search": "django", "cursor": cursor}
+                )
+                self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+    def test_search_control_characters(self):
+        response = self.client.get(self.url, {"search": "django\x00\x02flask"})
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(list(response.context["page"]), [self.content_match])
+
+    def test_search_index_replica(self):
+        # read from the replica used by the request, here an unknown alias
+        with replicas.use_replica("replica"), self.assertRaises(
+            ConnectionDoesNotExist
+        ):
+            search_index("django", 10)
+
+    def test_search_index_triggers(self):
+        # the test database is migrated: triggers must survive any migration
+        # rebuilding the articles table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'trigger' AND tbl_name = 'articles_article'"
+            )
+            self.assertEqual({name for (name,) in cursor.fetchall()}, set(FTS_TRIGGERS))
+
+    def test_rebuild_search_index_command(self):
+        call_command("rebuild_search_index", optimize=True, stdout=io.StringIO())
+
+        response = self.client.get(self.url, {"search": "django"})
+        self.assertEqual(len(response.context["page"]), 2)
+
+
+@override_settings(ANONYMOUS_CACHE_ENABLED=True)
+class TestResponseCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.other_user = User.objects.create(email="tester2@gmail.com", name="tester2")
+        cls.article = Article.objects.create(title="test", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_home_cached(self):
+        self.client.get(reverse("home"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertContains(response, "tester1")
+
+    def test_home_invalidated_new_article(self):
+        self.client.get(reverse("home"))
+
+        Article.objects.create(title="new article", author=self.author)
+
+        self.assertContains(self.client.get(reverse("home")), "new article")
+
+    def test_home_invalidated_author(self):
+        self.client.get(reverse("home"))
+
+        self.author.name = "new name"
+        self.author.save()
+
+        self.assertContains(self.client.get(reverse("home")), "new name")
+
+    def test_home_not_invalidated_other_user(self):
+        self.client.get(reverse("home"))
+
+        self.other_user.name = "new name"
+        self.other_user.save()
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse("home"))
+
+    def test_home_invalidated_favorite(self):
+        self.client.get(reverse("home"))
+
+        self.article.add_favorite(self.other_user)
+
+        response = self.client.get(reverse("home"))
+        self.assertEqual(list(response.context["page"])[0].favorites_count, 1)
+
+    def test_home_not_invalidated_favorite_not_listed(self):
+        self.article.tags.add("python")
+        other = Article.objects.create(title="other", author=self.author)
+
+        self.client.get(reverse("home"), {"tag": "python"})
+
+        other.add_favorite(self.other_user)
+
+        Comment.objects.create(
+            article=other, author=self.other_user, content="new comment"
+        )
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse("home"), {"tag": "python"})
+
+    def test_home_invalidated_new_tag(self):
+        self.client.get(reverse("home"), {"tag": "python"})
+
+        self.article.tags.add("python")
+
+        response = self.client.get(reverse("home"), {"tag": "python"})
+        self.assertEqual(list(response.context["page"]), [self.article])
+
+    def test_query_string(self):
+        self.client.get(reverse("home"))
+
+        response = self.client.get(reverse("home"), {"tag": "python"})
+        self.assertEqual(list(response.context["page"]), [])
+
+    def test_authenticated_not_cached(self):
+        self.client.get(reverse("home"))
+
+        self.client.force_login(self.other_user)
+
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "Your Feed")
+
+    def test_article_detail_invalidated_comment(self):
+        url = self.article.get_absolute_url()
+
+        self.client.get(url)
+
+        Comment.objects.create(
+            article=self.article, author=self.other_user, content="new comment"
+        )
+
+        self.assertContains(self.client.get(url), "new comment")
+
+    def test_article_detail_invalidated_favorite(self):
+        url = self.article.get_absolute_url()
+
+        self.client.get(url)
+
+        self.article.add_favorite(self.other_user)
+
+        self.assertContains(
+            self.client.get(url), '<span class="counter">(1)</span>', count=2
+        )
+
+    def test_stale_served_while_locked(self):
+        url = self.article.get_absolute_url()
+
+        self.client.get(url)
+
+        self.article.title = "new title"
+        self.article.save()
+
+        # another worker is regenerating the page
+        with patch("realworld.response_cache.cache.add", return_value=False):
+            response = self.client.get(url)
+
+        self.assertNotContains(response, "new title")
+        self.assertContains(self.client.get(url), "new title")
+
+    def test_article_detail_not_modified(self):
+        url = self.article.get_absolute_url()
+
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
 
 class TestCreateArticleView(TestCase):
     @classmethod
@@ -117,6 +736,14 @@ class TestCreateArticleView(TestCase):
         self.assertEqual(article.title, "First Post")
         self.assertEqual(set(article.tags.names()), {"python", "django", "html"})
 
+    def test_post_valid_fan_out(self):
+        follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+        self.author.add_follower(follower)
+
+        self.client.post(self.url, {"title": "First Post"})
+
+        self.assertTrue(TimelineEntry.objects.filter(user=follower).exists())
+
 
 class TestArticleDetailView(TestCase):
     password = "testpass"
@@ -155,6 +782,72 @@ class TestArticleDetailView(TestCase):
         self.assertEqual(response.context["article"], self.article)
         self.assertTrue(response.context["is_author"])
 
+    def test_get_is_following(self):
+        cache.clear()
+
+        follower = User.objects.create(email="tester2@gmail.com", name="tester2")
+        self.author.add_follower(follower)
+
+        self.client.force_login(follower)
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.context["is_following"])
+        self.assertContains(
+            response, f'hx-delete="{reverse("follow", args=[self.author.id])}"', count=2
+        )
+
+    def test_get_validators(self):
+        response = self.client.get(self.url)
+
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertNotIn("Last-Modified", response)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_MODIFIED)
+
+    def test_modified_since_favorite(self):
+        last_modified = http_date(time.time() + 60)
+
+        self.article.add_favorite(self.author)
+
+        # only the ETag validates the page
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_comment(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        Comment.objects.create(article=self.article, author=self.author, content="hi")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_favorite(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.article.add_favorite(self.author)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_modified_login(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.client.force_login(self.author)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+    def test_not_found(self):
+        response = self.client.get(reverse("article_detail", args=[0, "test"]))
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
 
 class TestFavoriteView(TestCase):
     password = "testpass"
@@ -193,6 +886,7 @@ class TestFavoriteView(TestCase):
         self.assertTrue(self.article.favorites.filter(pk=self.other_user.id).exists())
 
         self.assertTrue(response.context["is_favorite"])
+        self.assertEqual(response.context["num_favorites"], 1)
         self.assertTrue(response.context["is_detail"])
 
     def test_same_user(self):
@@ -219,7 +913,7 @@ class TestFavoriteView(TestCase):
     def test_remove_favorite(self):
         self.client.force_login(self.other_user)
 
-        self.article.favorites.add(self.other_user)
+        self.article.add_favorite(self.other_user)
 
         response = self.client.delete(self.url)
 
@@ -228,8 +922,27 @@ class TestFavoriteView(TestCase):
         self.assertFalse(self.article.favorites.filter(pk=self.other_user.id).exists())
 
         self.assertFalse(response.context["is_favorite"])
+        self.assertEqual(response.context["num_favorites"], 0)
         self.assertTrue(response.context["is_detail"])
 
+    def test_favorites_cache_updated(self):
+        cache.clear()
+
+        self.client.force_login(self.other_user)
+
+        detail_url = self.article.get_absolute_url()
+
+        self.assertFalse(self.client.get(detail_url).context["is_favorite"])
+
+        self.client.post(self.url)
+        self.assertTrue(self.client.get(detail_url).context["is_favorite"])
+
+        [article] = self.client.get(reverse("home")).context["page"]
+        self.assertTrue(article.is_favorite)
+
+        self.client.delete(self.url)
+        self.assertFalse(self.client.get(detail_url).context["is_favorite"])
+
 
 class TestTagsAutocomplete(TestCase):
     url = reverse_lazy("tags_autocomplete")
@@ -238,9 +951,13 @@ class TestTagsAutocomplete(TestCase):
     def setUpTestData(cls):
         Tag.objects.create(name="Python")
 
+    def setUp(self):
+        tag_index.invalidate()
+
     def test_with_tags(self):
         response = self.client.get(self.url, {"tags": "Python"})
         self.assertEqual(len(response.context["tags"]), 1)
+        self.assertIn("max-age", response.headers["Cache-Control"])
 
     def test_with_no_tags(self):
         response = self.client.get(self.url, {"tags": "Django"})
@@ -249,3 +966,289 @@ class TestTagsAutocomplete(TestCase):
     def test_empty_query_string(self):
         response = self.client.get(self.url)
         self.assertEqual(len(response.context["tags"]), 0)
+
+    def test_last_tag(self):
+        response = self.client.get(self.url, {"tags": "django pyt"})
+        self.assertEqual(response.context["tags"], ["Python"])
+
+    async def test_async_view(self):
+        factory = AsyncRequestFactory()
+
+        response = await views.async_tags_autocomplete(
+            factory.get(self.url, {"tags": "django pyt"})
+        )
+        self.assertContains(response, "Python")
+        self.assertIn("max-age", response.headers["Cache-Control"])
+
+        response = await views.async_tags_autocomplete(factory.post(self.url))
+        self.assertEqual(response.status_code, http.HTTPStatus.METHOD_NOT_ALLOWED)
+
+
+class TestTagIndex(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create(email="tester@gmail.com", name="tester")
+
+        article = Article.objects.create(title="test", author=author)
+        article.tags.add("pytest", "Python", "django")
+
+        other = Article.objects.create(title="other", author=author)
+        other.tags.add("python3", "Python")
+
+    def setUp(self):
+        tag_index.invalidate()
+
+    def test_search(self):
+        self.assertEqual(tag_index.search("py", 10), ["Python", "pytest", "python3"])
+
+    def test_search_case_insensitive(self):
+        self.assertEqual(tag_index.search("PYTH", 10), ["Python", "python3"])
+
+    def test_search_limit(self):
+        self.assertEqual(tag_index.search("py", 1), ["Python"])
+
+    def test_search_no_match(self):
+        self.assertEqual(tag_index.search("html", 10), [])
+
+    def test_search_no_queries(self):
+        tag_index.search("py", 10)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(tag_index.search("dj", 10), ["django"])
+
+    def test_tag_created(self):
+        tag_index.search("py", 10)
+
+        Tag.objects.create(name="pyramid")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                tag_index.search("py", 10), ["Python", "pytest", "python3", "pyramid"]
+            )
+
+    def test_tag_deleted(self):
+        tag_index.search("py", 10)
+
+        Tag.objects.get(name="pytest").delete()
+
+        self.assertEqual(tag_index.search("py", 10), ["Python", "python3"])
+
+    def test_changed_by_other_process(self):
+        other_index = TagIndex(timeout=60, check_interval=60)
+        other_index.load()
+
+        # created through another process
+        Tag.objects.create(name="pyramid")
+
+        with patch.object(autocomplete.cache, "get") as cache_get:
+            self.assertNotIn("pyramid", other_index.search("py", 10))
+        cache_get.assert_not_called()
+
+        other_index._next_check = 0
+
+        self.assertIn("pyramid", other_index.search("py", 10))
+
+
+class TestQueryBudgets(TestCase):
+    """Views run within their @query_budget (enforced by the test runner)
+    however many related rows are rendered."""
+
+    password = "testpass"
+
+    # articles, each with its own tag, and comments on the last of them
+    data_size = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.user = User.objects.create_user(
+            "tester2@gmail.com", name="tester2", password=cls.password
+        )
+        cls.author.add_follower(cls.user)
+
+        for i in range(cls.data_size):
+            article = Article.objects.create(
+                title=f"Python {i}", content="test", author=cls.author
+            )
+            article.tags.add("python", "django", f"tag{i}")
+            article.add_favorite(cls.user)
+            TimelineEntry.objects.fan_out(article)
+
+        cls.article = article
+
+        Comment.objects.bulk_create(
+            [
+                Comment(article=cls.article, author=cls.user, content=f"test {i}")
+                for i in range(cls.data_size)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+        tag_index.invalidate()
+
+    def test_read_views(self):
+        urls = [
+            reverse("home"),
+            reverse("home") + "?own",
+            reverse("home") + "?tag=python",
+            reverse("search"),
+            reverse("search") + "?search=python",
+            self.article.get_absolute_url(),
+            reverse("tags_autocomplete") + "?tags=pyt",
+        ]
+
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+
+        self.client.force_login(self.user)
+
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+
+    def test_write_views(self):
+        self.client.force_login(self.author)
+
+        self.client.post(
+            reverse("create_article"),
+            {"title": "test", "tags": "python django html css javascript"},
+        )
+
+        self.client.post(
+            reverse("edit_article", args=[self.article.id]),
+            {"title": "test", "tags": "python django rust"},
+        )
+
+        self.client.delete(reverse("delete_article", args=[self.article.id]))
+
+        self.assertFalse(Article.objects.filter(pk=self.article.id).exists())
+
+        self.client.force_login(self.user)
+
+        article = Article.objects.first()
+
+        self.client.delete(reverse("favorite", args=[article.id]))
+        self.client.post(reverse("favorite", args=[article.id]))
+
+    def test_budget_exceeded(self):
+        with patch.object(views.home, "query_budget", 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("home"))
+
+    @override_settings(INSTRUMENTATION_HEADERS=True)
+    def test_headers(self):
+        response = self.client.get(reverse("home"))
+        self.assertIn("X-Query-Count", response)
+        self.assertIn("sql;dur=", response["Server-Timing"])
+
+    def test_all_views_have_budgets(self):
+        modules = {
+            "realworld.articles.views",
+            "realworld.accounts.views",
+            "realworld.comments.views",
+        }
+
+        def _callbacks(patterns):
+            for pattern in patterns:
+                if hasattr(pattern, "url_patterns"):
+                    yield from _callbacks(pattern.url_patterns)
+                else:
+                    yield pattern.callback
+
+        for callback in _callbacks(get_resolver().url_patterns):
+            if callback.__module__ in modules:
+                self.assertTrue(
+                    hasattr(callback, "query_budget"),
+                    f"{callback.__module__}.{callback.__name__} has no budget",
+                )
+
+
+class TestQueryBudgetsLarger(TestQueryBudgets):
+    """The same budgets hold with ten pages of articles: query counts do not
+    grow with the data."""
+
+    data_size = 200
+
+
+class TestQueryPlans(TestCase):
+    """Queries run by the hot views are read from indexes: no query scans a
+    whole table, and pages of articles or comments are read in index order
+    rather than sorted (a temp B-tree).
+
+    Other queries may sort a few rows, e.g. the tags of a page of articles.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "generate_data",
+            users=20,
+            articles=200,
+            tags=10,
+            favorites=400,
+            follows=100,
+            comments=400,
+            seed=1,
+            stdout=io.StringIO(),
+        )
+
+        cls.user = User.objects.order_by("pk").first()
+        cls.article = Article.objects.order_by("-comments_count").first()
+        cls.tag = TagCount.objects.popular_tags()[0].name
+
+    def setUp(self):
+        cache.clear()
+        email_filter.invalidate()
+
+    def assertIndexed(self, url: str) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, http.HTTPStatus.OK)
+
+            # next page is read from the cursor position
+            if (page := (response.context or {}).get("page")) and page.has_next:
+                self.client.get(page.next_page_url)
+
+        # pages are fetched with one extra row, to find out if there is a next
+        page_limits = {
+            f"LIMIT {PAGE_SIZE + 1}",
+            f"LIMIT {settings.COMMENTS_PAGE_SIZE + 1}",
+        }
+
+        for query in context.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = [row[-1] for row in cursor.fetchall()]
+
+            is_page = query["sql"].endswith(tuple(page_limits))
+
+            for step in plan:
+                self.assertFalse(
+                    re.fullmatch(r"SCAN \S+", step)
+                    or (is_page and "TEMP B-TREE" in step),
+                    f"{url}: {query['sql']}\n{plan}",
+                )
+
+    def test_anonymous(self):
+        for url in self.get_urls():
+            with self.subTest(url=url):
+                self.assertIndexed(url)
+
+    def test_logged_in(self):
+        self.client.force_login(self.user)
+
+        for url in self.get_urls() + [reverse("home") + "?own"]:
+            with self.subTest(url=url):
+                self.assertIndexed(url)
+
+    def get_urls(self) -> list[str]:
+        return [
+            reverse("home"),
+            reverse("home") + f"?tag={self.tag}",
+            self.article.get_absolute_url(),
+            reverse("comments", args=[self.article.id]),
+            reverse("profile", args=[self.article.author_id]),
+            reverse("profile", args=[self.article.author_id]) + "?favorites",
+            # in the filter, so checked against the database
+            reverse("check_email") + f"?email={self.user.email.upper()}",
+        ]
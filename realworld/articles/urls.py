@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
@@ -5,7 +6,14 @@ from . import views
 urlpatterns = [
     path("", views.home, name="home"),
     path("new/", views.create_article, name="create_article"),
-    path("tags-autocomplete/", views.tags_autocomplete, name="tags_autocomplete"),
+    path("search/", views.search, name="search"),
+    path(
+        "tags-autocomplete/",
+        views.async_tags_autocomplete
+        if settings.ASYNC_VIEWS
+        else views.tags_autocomplete,
+        name="tags_autocomplete",
+    ),
     path(
         "article/<int:article_id>/<slug:slug>/",
         views.article_detail,
@@ -1,68 +1,193 @@
 from __future__ import annotations
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
-from django.shortcuts import get_object_or_404
+from django.db.models import Max
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    HttpResponseRedirect,
+)
+from django.shortcuts import get_object_or_404, render
 from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_http_methods
 from django_htmx.http import HttpResponseClientRedirect
+from realworld import toggles
 from realworld.comments.forms import CommentForm
-from realworld.comments.models import Comment
-from taggit.models import Tag
-
+from realworld.comments.views import paginate_comments
+from realworld.conditional import Validators, conditional_page, make_etag
+from realworld.instrumentation import query_budget
+from realworld.pagination import paginate
+from realworld.relationships import (
+    favorite_ids,
+    following_ids,
+    set_favorite,
+    set_favorites,
+)
+from realworld.replicas import read_from_replica
+from realworld.response_cache import (
+    add_cache_tags,
+    cache_anonymous,
+    tag_listing_key,
+)
+from taggit.utils import parse_tags
+
+from .autocomplete import tag_index
 from .forms import ArticleForm
-from .models import Article
+from .models import Article, TagCount, TimelineEntry
+from .search import search_articles
+
 
+def tags_query_budget(request: HttpRequest) -> int:
+    """Taggit adds tags one at a time, so article form budgets depend on the
+    number of tags submitted."""
+    return 15 + 10 * len(parse_tags(request.POST.get("tags", "")))
 
+
+@query_budget(8)
+@read_from_replica
 @require_http_methods(["GET"])
+@cache_anonymous
 def home(request: HttpRequest) -> HttpResponse:
 
-    articles = (
-        Article.objects.select_related("author")
-        .with_favorites(request.user)
-        .prefetch_related("tags")
-        .order_by("-created")
+    articles = Article.objects.select_related("author").defer(
+        "content", "content_html"
     )
 
+    field, pk_field = "created", "pk"
+
     if own_feed := request.user.is_authenticated and "own" in request.GET:
-        articles = articles.filter(author=request.user)
+        articles = articles.feed(request.user)
+        field, pk_field = "feed_created", "feed_article"
 
     if tag := request.GET.get("tag"):
-        articles = articles.filter(tags__name__in=[tag])
+        articles = articles.tagged(tag)
+        if not own_feed:
+            field, pk_field = "tag_created", "tag_article"
 
-    tags = Tag.objects.all()
+    page = paginate(request, articles, field, pk_field=pk_field)
+
+    set_favorites(request, page)
+
+    # "articles" for new or deleted articles, and each article listed for
+    # changes to its favorites, comments or tags
+    add_cache_tags(
+        request,
+        "articles",
+        *(f"article:{article.id}" for article in page),
+        *(f"user:{article.author_id}" for article in page),
+    )
+
+    if tag:
+        add_cache_tags(request, tag_listing_key(tag))
+
+    if request.htmx.target == "next-page":
+        return TemplateResponse(request, "articles/_articles.html", {"page": page})
+
+    add_cache_tags(request, "popular-tags")
 
     return TemplateResponse(
         request,
         "articles/home.html",
         {
-            "articles": articles,
+            "page": page,
             "own_feed": own_feed,
-            "tags": tags,
+            "tags": TagCount.objects.popular_tags(),
         },
     )
 
 
+@query_budget(6)
+@read_from_replica
 @require_http_methods(["GET"])
-def article_detail(request: HttpRequest, article_id: int, slug: str) -> HttpResponse:
+def search(request: HttpRequest) -> HttpResponse:
 
-    article = get_object_or_404(
-        Article.objects.select_related("author").with_favorites(request.user),
-        pk=article_id,
+    articles = Article.objects.select_related("author").defer(
+        "content", "content_html"
+    )
+
+    page = (
+        search_articles(request, articles, search)
+        if (search := request.GET.get("search", "").strip())
+        else paginate(request, articles)
+    )
+
+    set_favorites(request, page)
+
+    if request.htmx and not request.htmx.boosted:
+        return TemplateResponse(request, "articles/_articles.html", {"page": page})
+
+    return TemplateResponse(
+        request,
+        "articles/search.html",
+        {
+            "page": page,
+            "search": search,
+        },
     )
 
-    comments = (
-        Comment.objects.filter(article=article)
-        .select_related("author")
-        .order_by("-created")
+
+def article_validators(
+    request: HttpRequest, article_id: int, slug: str
+) -> Validators | None:
+    """ETag for article page, computed in a single query.
+
+    No Last-Modified: favorites, follows, author changes and deleted comments
+    change the page without changing any timestamp.
+    """
+
+    if not (
+        row := Article.objects.filter(pk=article_id)
+        .annotate(last_commented=Max("comment__updated"))
+        .values_list(
+            "updated",
+            "last_commented",
+            "comments_count",
+            "favorites_count",
+            "author",
+            "author__name",
+            "author__image",
+        )
+        .first()
+    ):
+        return None
+
+    author_id = row[4]
+
+    return (
+        make_etag(
+            request,
+            [
+                *row,
+                article_id in favorite_ids(request),
+                author_id in following_ids(request),
+            ],
+        ),
+        None,
     )
 
+
+@query_budget(8)
+@read_from_replica
+@require_http_methods(["GET"])
+@cache_anonymous
+@conditional_page(article_validators)
+def article_detail(request: HttpRequest, article_id: int, slug: str) -> HttpResponse:
+
+    article = get_object_or_404(Article.objects.select_related("author"), pk=article_id)
+
+    add_cache_tags(request, f"article:{article.id}", f"user:{article.author_id}")
+
     context = {
         "article": article,
-        "comments": comments,
-        "is_favorite": article.is_favorite,
-        "num_favorites": article.num_favorites,
+        "comments": paginate_comments(request, article.id),
+        "is_favorite": article.id in favorite_ids(request),
+        "is_following": article.author_id in following_ids(request),
+        "num_favorites": article.favorites_count,
     }
 
     if request.user.is_authenticated:
@@ -76,6 +201,7 @@ def article_detail(request: HttpRequest, article_id: int, slug: str) -> HttpResp
     return TemplateResponse(request, "articles/article.html", context)
 
 
+@query_budget(tags_query_budget)
 @require_http_methods(["GET", "POST"])
 @login_required
 def create_article(request: HttpRequest) -> HttpResponse:
@@ -96,11 +222,14 @@ def create_article(request: HttpRequest) -> HttpResponse:
         # save tags
         form.save_m2m()
 
+        TimelineEntry.objects.fan_out(article)
+
         return HttpResponseClientRedirect(article.get_absolute_url())
 
     return TemplateResponse(request, "articles/_article_form.html", {"form": form})
 
 
+@query_budget(tags_query_budget)
 @require_http_methods(["GET", "POST"])
 @login_required
 def edit_article(request: HttpRequest, article_id: int) -> HttpResponse:
@@ -132,6 +261,7 @@ def edit_article(request: HttpRequest, article_id: int) -> HttpResponse:
     )
 
 
+@query_budget(21)
 @require_http_methods(["DELETE"])
 @login_required
 def delete_article(request: HttpRequest, article_id: int) -> HttpResponse:
@@ -141,6 +271,7 @@ def delete_article(request: HttpRequest, article_id: int) -> HttpResponse:
     return HttpResponseRedirect(reverse("home"))
 
 
+@query_budget(12)
 @require_http_methods(["POST", "DELETE"])
 @login_required
 def favorite(request: HttpRequest, article_id: int) -> HttpResponse:
@@ -150,14 +281,22 @@ def favorite(request: HttpRequest, article_id: int) -> HttpResponse:
         pk=article_id,
     )
 
-    is_favorite: bool
+    is_favorite = request.method != "DELETE"
+
+    num_favorites: int
 
-    if request.method == "DELETE":
-        article.favorites.remove(request.user)
-        is_favorite = False
+    if settings.TOGGLE_BUFFER_ENABLED:
+        # optimistic: count is adjusted for this toggle only
+        was_favorite = article.id in favorite_ids(request)
+        toggles.enqueue(toggles.FAVORITE, request.user.id, article.id, is_favorite)
+        set_favorite(request, article.id, is_favorite)
+        num_favorites = max(article.favorites_count + is_favorite - was_favorite, 0)
     else:
-        article.favorites.add(request.user)
-        is_favorite = True
+        if is_favorite:
+            article.add_favorite(request.user)
+        else:
+            article.remove_favorite(request.user)
+        num_favorites = article.favorites_count
 
     return TemplateResponse(
         request,
@@ -165,7 +304,7 @@ def favorite(request: HttpRequest, article_id: int) -> HttpResponse:
         {
             "article": article,
             "is_favorite": is_favorite,
-            "num_favorites": article.favorites.count(),
+            "num_favorites": num_favorites,
             "is_action": True,
             "is_detail": False
             if request.htmx.target == f"favorite-{article.id}"
@@ -174,22 +313,49 @@ def favorite(request: HttpRequest, article_id: int) -> HttpResponse:
     )
 
 
+def tags_search(request: HttpRequest) -> str:
+    """Returns the latest item in tag string."""
+    try:
+        return request.GET["tags"].split()[-1].strip()
+    except (KeyError, IndexError):
+        return ""
+
+
+@query_budget(3)
+@read_from_replica
 @require_http_methods(["GET"])
+@cache_control(max_age=settings.TAGS_AUTOCOMPLETE_MAX_AGE)
 def tags_autocomplete(request: HttpRequest) -> HttpResponse:
 
-    # find the latest item in tag string
+    tags = (
+        tag_index.search(search, settings.TAGS_AUTOCOMPLETE_LIMIT)
+        if (search := tags_search(request))
+        else []
+    )
+
+    return TemplateResponse(request, "articles/_tags.html", {"tags": tags})
 
-    search: str = ""
 
-    try:
-        search = request.GET["tags"].split()[-1].strip()
-    except (KeyError, IndexError):
-        pass
+@query_budget(3)
+@read_from_replica
+async def async_tags_autocomplete(request: HttpRequest) -> HttpResponse:
+    """Native async tags_autocomplete() for ASGI (see ASYNC_VIEWS): lookups
+    run in the event loop, without a thread per request.
+
+    Django's view decorators are sync-only, so the method check and cache
+    headers are done here; the response is rendered here too, as a
+    TemplateResponse would be rendered in a thread.
+    """
+
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
 
     tags = (
-        Tag.objects.filter(name__istartswith=search).distinct()
-        if search
-        else Tag.objects.none()
+        await tag_index.asearch(search, settings.TAGS_AUTOCOMPLETE_LIMIT)
+        if (search := tags_search(request))
+        else []
     )
 
-    return TemplateResponse(request, "articles/_tags.html", {"tags": tags})
+    response = render(request, "articles/_tags.html", {"tags": tags})
+    patch_cache_control(response, max_age=settings.TAGS_AUTOCOMPLETE_MAX_AGE)
+    return response
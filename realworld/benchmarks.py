@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import math
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import django
+from django.conf import settings
+from django.http import HttpResponse
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Returns nearest-rank percentile of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def measure(
+    name: str,
+    request: Callable[[], HttpResponse],
+    num_requests: int,
+    setup: Callable[[], Any] | None = None,
+    teardown: Callable[[], Any] | None = None,
+) -> dict[str, Any]:
+    """Calls `request` num_requests times, after a warm-up call, and returns
+    latency percentiles (ms) and query counts as recorded by the
+    instrumentation middleware.
+
+    `setup` and `teardown` are called, untimed, before and after each request,
+    e.g. to undo a write.
+    """
+
+    latencies: list[float] = []
+    queries: list[int] = []
+
+    for counter in range(num_requests + 1):
+        if setup:
+            setup()
+
+        started = time.perf_counter()
+        response = request()
+        elapsed = time.perf_counter() - started
+
+        if teardown:
+            teardown()
+
+        # first request is a warm-up
+        if not counter:
+            continue
+
+        latencies.append(elapsed * 1000)
+
+        if response.status_code >= 400:
+            raise ValueError(f"{name} returned {response.status_code}")
+
+        queries.append(response.wsgi_request.metrics.num_queries)
+
+    return {
+        "name": name,
+        "requests": num_requests,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.mean(latencies),
+        "queries": statistics.mean(queries),
+        "max_queries": max(queries),
+    }
+
+
+def save(path: Path, results: list[dict[str, Any]], **metadata) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "revision": git_revision(),
+                "django": django.get_version(),
+                "debug": settings.DEBUG,
+                "database": settings.DATABASES["default"]["ENGINE"],
+                **metadata,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+def load(path: Path) -> dict[str, dict[str, Any]]:
+    """Returns results saved to path by name."""
+    return {
+        result["name"]: result for result in json.loads(path.read_text())["results"]
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_results(
+    results: list[dict[str, Any]], baseline: dict[str, dict[str, Any]] | None = None
+) -> list[str]:
+    """Returns results as table rows, with p95 and query count changes from
+    baseline if given."""
+
+    lines = [
+        f"{'view':<32} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}"
+        + (f" {'p95 diff':>9} {'queries diff':>13}" if baseline else "")
+    ]
+
+    for result in results:
+        line = (
+            f"{result['name']:<32} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+            f"{result['p99']:>8.2f} {result['queries']:>8.1f}"
+        )
+        if baseline and (previous := baseline.get(result["name"])):
+            line += (
+                f" {(result['p95'] - previous['p95']) / previous['p95']:>+9.1%}"
+                f" {result['queries'] - previous['queries']:>+13.1f}"
+            )
+        lines.append(line)
+
+    return lines
@@ -12,10 +12,22 @@ User = get_user_model()
 
 class Comment(models.Model):
 
-    article: Article = models.ForeignKey(Article, on_delete=models.CASCADE)
+    # covered by comment_article_created_idx
+    article: Article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, db_index=False
+    )
     author: User = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
     content: str = models.TextField()
 
     created: datetime = models.DateTimeField(auto_now_add=True)
     updated: datetime = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # ascending: scanned backwards for the (-created, -id) order of the
+        # article page
+        indexes = [
+            models.Index(
+                fields=["article", "created"], name="comment_article_created_idx"
+            ),
+        ]
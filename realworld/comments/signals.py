@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from realworld.articles.models import Article
+from realworld.response_cache import invalidate_cache_tags
+
+from .models import Comment
+
+
+@receiver(post_save, sender=Comment)
+def increment_comments_count(
+    sender, instance: Comment, created: bool, **kwargs
+) -> None:
+    if created:
+        Article.objects.filter(pk=instance.article_id).update(
+            comments_count=F("comments_count") + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance: Comment, **kwargs) -> None:
+    Article.objects.filter(pk=instance.article_id, comments_count__gt=0).update(
+        comments_count=F("comments_count") - 1
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_responses(sender, instance: Comment, **kwargs) -> None:
+    # comment counts are shown in article lists, which are tagged with each
+    # article listed
+    invalidate_cache_tags(f"article:{instance.article_id}")
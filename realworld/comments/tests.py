@@ -1,7 +1,7 @@
 import http
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from realworld.articles.models import Article
 
@@ -10,6 +10,72 @@ from .models import Comment
 User = get_user_model()
 
 
+class TestCommentsCount(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester@gmail.com", name="tester")
+        cls.article = Article.objects.create(title="test", author=cls.author)
+
+    def test_add_comment(self):
+        Comment.objects.create(article=self.article, author=self.author)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 1)
+
+    def test_edit_comment(self):
+        comment = Comment.objects.create(article=self.article, author=self.author)
+        comment.save()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 1)
+
+    def test_delete_comment(self):
+        Comment.objects.create(article=self.article, author=self.author).delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 0)
+
+
+@override_settings(COMMENTS_PAGE_SIZE=2)
+class TestCommentsView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester@gmail.com", name="tester")
+        cls.article = Article.objects.create(title="test", author=cls.author)
+        Comment.objects.bulk_create(
+            [
+                Comment(article=cls.article, author=cls.author, content=f"test {i}")
+                for i in range(3)
+            ]
+        )
+
+    def test_article_detail_first_page(self):
+        response = self.client.get(self.article.get_absolute_url())
+
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), 2)
+        self.assertTrue(comments.has_next)
+        self.assertTrue(
+            comments.next_page_url.startswith(
+                reverse("comments", args=[self.article.id])
+            )
+        )
+
+    def test_next_page(self):
+        response = self.client.get(self.article.get_absolute_url())
+
+        response = self.client.get(
+            response.context["comments"].next_page_url,
+            HTTP_HX_REQUEST="true",
+            HTTP_HX_TARGET="next-comments",
+        )
+
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertTemplateUsed(response, "comments/_comments.html")
+
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), 1)
+        self.assertFalse(comments.has_next)
+        self.assertContains(response, "test 0")
+
+
 class TestAddCommentView(TestCase):
 
     @classmethod
@@ -40,3 +106,55 @@ class TestAddCommentView(TestCase):
 
         self.assertEqual(comment.article, self.article)
         self.assertEqual(comment.author, self.author)
+
+
+class TestQueryBudgets(TestCase):
+    # comments on the article
+    data_size = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester@gmail.com", name="tester")
+        cls.article = Article.objects.create(title="test", author=cls.author)
+        Comment.objects.bulk_create(
+            [
+                Comment(article=cls.article, author=cls.author, content=f"test {i}")
+                for i in range(cls.data_size)
+            ]
+        )
+        cls.comment = Comment.objects.first()
+
+    def test_comments(self):
+        url = reverse("comments", args=[self.article.id])
+
+        self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+
+        self.client.force_login(self.author)
+
+        self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+
+    def test_add_comment(self):
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse("add_comment", args=[self.article.id]), {"content": "test"}
+        )
+
+    def test_edit_comment(self):
+        self.client.force_login(self.author)
+        url = reverse("edit_comment", args=[self.comment.id])
+        self.assertEqual(self.client.get(url).status_code, http.HTTPStatus.OK)
+        self.assertEqual(
+            self.client.post(url, {"content": "edited"}).status_code,
+            http.HTTPStatus.OK,
+        )
+
+    def test_delete_comment(self):
+        self.client.force_login(self.author)
+        self.client.delete(reverse("delete_comment", args=[self.comment.id]))
+        self.assertFalse(Comment.objects.filter(pk=self.comment.id).exists())
+
+
+class TestQueryBudgetsLarger(TestQueryBudgets):
+    """The same budgets hold with ten pages of comments."""
+
+    data_size = 200
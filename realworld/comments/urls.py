@@ -3,6 +3,11 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path(
+        "<int:article_id>/",
+        views.comments,
+        name="comments",
+    ),
     path(
         "add/<int:article_id>/",
         views.add_comment,
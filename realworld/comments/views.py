@@ -1,16 +1,48 @@
 from __future__ import annotations
 
+from django.conf import settings
 from realworld.articles.models import Article
 from django.contrib.auth.decorators import login_required
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
+from realworld.instrumentation import query_budget
+from realworld.pagination import Page, paginate
+from realworld.replicas import read_from_replica
+from realworld.response_cache import add_cache_tags, cache_anonymous
 
 from .forms import CommentForm
 from .models import Comment
 
 
+def paginate_comments(request: HttpRequest, article_id: int) -> Page:
+    """Returns next page of comments on article, newest first."""
+    return paginate(
+        request,
+        Comment.objects.filter(article=article_id).select_related("author"),
+        page_size=settings.COMMENTS_PAGE_SIZE,
+        path=reverse("comments", args=[article_id]),
+    )
+
+
+@query_budget(4)
+@read_from_replica
+@require_http_methods(["GET"])
+@cache_anonymous
+def comments(request: HttpRequest, article_id: int) -> HttpResponse:
+
+    add_cache_tags(request, f"article:{article_id}")
+
+    return TemplateResponse(
+        request,
+        "comments/_comments.html",
+        {"comments": paginate_comments(request, article_id)},
+    )
+
+
+@query_budget(6)
 @require_http_methods(["POST"])
 @login_required
 def add_comment(request: HttpRequest, article_id: int) -> HttpResponse:
@@ -39,6 +71,7 @@ def add_comment(request: HttpRequest, article_id: int) -> HttpResponse:
     )
 
 
+@query_budget(5)
 @require_http_methods(["GET", "POST"])
 @login_required
 def edit_comment(request: HttpRequest, comment_id: int) -> HttpResponse:
@@ -75,6 +108,7 @@ def edit_comment(request: HttpRequest, comment_id: int) -> HttpResponse:
     )
 
 
+@query_budget(6)
 @require_http_methods(["DELETE"])
 @login_required
 def delete_comment(request: HttpRequest, comment_id: int) -> HttpResponse:
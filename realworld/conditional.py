@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+Validators = Tuple[str, Optional[datetime]]
+
+
+def make_etag(request: HttpRequest, values: Iterable[Any]) -> str:
+    """Returns a weak ETag for the values as seen by the current user.
+
+    Pages embed a masked CSRF token, so are never byte-for-byte identical:
+    hence a weak rather than a strong ETag.
+    """
+    digest = hashlib.md5(
+        repr(
+            (
+                request.user.id,
+                request.headers.get("HX-Request", ""),
+                request.headers.get("HX-Target", ""),
+                *values,
+            )
+        ).encode()
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def conditional_page(validators: Callable[..., Validators | None]) -> Callable:
+    """Like Django's @condition, but the ETag and Last-Modified are returned
+    together by `validators` so both can come from a single query.
+
+    If `validators` returns None (e.g. the object does not exist) the view
+    handles the request as usual.
+    """
+
+    def _decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def _wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+
+            if request.method not in ("GET", "HEAD") or not (
+                result := validators(request, *args, **kwargs)
+            ):
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = result
+
+            timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+            if response := get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            ):
+                return response
+
+            response = view(request, *args, **kwargs)
+
+            if response.status_code == 200:
+                response.headers.setdefault("ETag", etag)
+                if timestamp:
+                    response.headers.setdefault("Last-Modified", http_date(timestamp))
+
+            return response
+
+        return _wrapper
+
+    return _decorator
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "realworld.core"
+
+    def ready(self) -> None:
+        from . import checks  # noqa
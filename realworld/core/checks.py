@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# caches that are not shared between worker processes
+LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+LOCAL_CACHE_ERROR = Error(
+    "The default cache is local to each process.",
+    hint="Use a cache shared by all worker processes, e.g. Redis.",
+    id="realworld.E001",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs) -> list[Error]:
+    """The response cache, cached sessions and cached users are invalidated
+    through the default cache: with more than one worker process, an
+    invalidation in one must be seen by all the others."""
+
+    if is_local_cache() and (
+        settings.ANONYMOUS_CACHE_ENABLED
+        or settings.SESSION_CACHE_ENABLED
+        or settings.USER_CACHE_ENABLED
+    ):
+        return [LOCAL_CACHE_ERROR]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache_deploy(app_configs, **kwargs) -> list[Error]:
+    """Relationships, previews and the versions of the tag and email indexes
+    are also invalidated through the default cache, whatever the settings."""
+    return [LOCAL_CACHE_ERROR] if is_local_cache() else []
+
+
+def is_local_cache() -> bool:
+    return settings.CACHES["default"]["BACKEND"] in LOCAL_CACHES
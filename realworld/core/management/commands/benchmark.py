@@ -0,0 +1,212 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from realworld import benchmarks
+from realworld.articles.models import Article, Favorite, TagCount
+from realworld.comments.models import Comment
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = """Calls every view through the test client and reports p50/p95/p99
+    latency (ms) and query counts. Results are saved as JSON, and can be
+    compared with an earlier run."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Number of requests per view",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="ID of user to log in as (default: the user following most "
+            "authors)",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host name of requests: must be in ALLOWED_HOSTS unless DEBUG",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Results file (default: benchmarks/<timestamp>.json)",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            help="Earlier results file to compare with",
+        )
+
+    def handle(self, *args, **options):
+        num_requests: int = options["requests"]
+
+        if (article := self.get_popular_article()) is None:
+            raise CommandError("No articles found: run generate_data first")
+
+        user = (
+            User.objects.get(pk=options["user"])
+            if options["user"]
+            else User.objects.annotate(num_following=Count("following"))
+            .order_by("-num_following")
+            .first()
+        )
+
+        anonymous = Client(SERVER_NAME=options["host"])
+
+        client = Client(SERVER_NAME=options["host"])
+        client.force_login(user)
+
+        results = [
+            benchmarks.measure(name, request, num_requests, setup, teardown)
+            for name, request, setup, teardown in [
+                *self.get_read_requests(anonymous, "anonymous", article),
+                *self.get_read_requests(client, "user", article),
+                *self.get_write_requests(client, user, article),
+            ]
+        ]
+
+        baseline = benchmarks.load(options["compare"]) if options["compare"] else None
+
+        for line in benchmarks.format_results(results, baseline):
+            self.stdout.write(line)
+
+        output = options["output"] or settings.BASE_DIR / "benchmarks" / (
+            timezone.now().strftime("%Y%m%d-%H%M%S") + ".json"
+        )
+
+        benchmarks.save(
+            output,
+            results,
+            counts={
+                "users": User.objects.count(),
+                "articles": Article.objects.count(),
+                "comments": Comment.objects.count(),
+                "favorites": Favorite.objects.count(),
+                "follows": User.followers.through.objects.count(),
+            },
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {output}"))
+
+    def get_popular_article(self) -> Article | None:
+        return Article.objects.order_by("-favorites_count").first()
+
+    def get_read_requests(self, client: Client, prefix: str, article: Article):
+        tag = TagCount.objects.popular_tags()[:1]
+        word = article.title.split()[0]
+
+        urls = {
+            "home": reverse("home"),
+            "home_tag": f"{reverse('home')}?tag={tag[0].name if tag else ''}",
+            "search": f"{reverse('search')}?search={word}",
+            "article_detail": article.get_absolute_url(),
+            "comments": reverse("comments", args=[article.id]),
+            "profile": reverse("profile", args=[article.author_id]),
+            "profile_favorites": f"{reverse('profile', args=[article.author_id])}"
+            "?favorites",
+            "tags_autocomplete": f"{reverse('tags_autocomplete')}?tags={word[:2]}",
+            "check_email": f"{reverse('check_email')}?email=tester@example.com",
+            "api_articles": reverse("api_articles"),
+            "api_article": reverse("api_article", args=[article.id]),
+        }
+
+        if prefix == "user":
+            urls["home_feed"] = f"{reverse('home')}?own"
+            urls["settings"] = reverse("settings")
+            urls["create_article_form"] = reverse("create_article")
+
+        return [
+            (f"{prefix}:{name}", lambda url=url: client.get(url), None, None)
+            for name, url in urls.items()
+        ]
+
+    def get_write_requests(self, client: Client, user: User, article: Article):
+        """Each write is undone before the next, so the data is unchanged by
+        the benchmark."""
+
+        other = Article.objects.exclude(author=user).order_by("-favorites_count")[0]
+
+        favorite_url = reverse("favorite", args=[other.id])
+        follow_url = reverse("follow", args=[other.author_id])
+
+        def _latest_comment_url() -> str:
+            comment = Comment.objects.filter(author=user).latest("pk")
+            return reverse("delete_comment", args=[comment.id])
+
+        def _add_comment():
+            return client.post(
+                reverse("add_comment", args=[article.id]), {"content": "benchmark"}
+            )
+
+        def _latest_article() -> Article:
+            return Article.objects.filter(author=user).latest("pk")
+
+        def _create_article():
+            return client.post(
+                reverse("create_article"),
+                {"title": "benchmark", "content": "benchmark", "tags": "benchmark"},
+            )
+
+        def _edit_article():
+            return client.post(
+                reverse("edit_article", args=[_latest_article().id]),
+                {"title": "benchmark", "content": "edited", "tags": "benchmark"},
+            )
+
+        def _delete_article():
+            return client.delete(
+                reverse("delete_article", args=[_latest_article().id])
+            )
+
+        return [
+            (
+                "user:favorite",
+                lambda: client.post(favorite_url),
+                None,
+                lambda: client.delete(favorite_url),
+            ),
+            (
+                "user:unfavorite",
+                lambda: client.delete(favorite_url),
+                lambda: client.post(favorite_url),
+                None,
+            ),
+            (
+                "user:follow",
+                lambda: client.post(follow_url),
+                None,
+                lambda: client.delete(follow_url),
+            ),
+            (
+                "user:unfollow",
+                lambda: client.delete(follow_url),
+                lambda: client.post(follow_url),
+                None,
+            ),
+            (
+                "user:add_comment",
+                _add_comment,
+                None,
+                lambda: client.delete(_latest_comment_url()),
+            ),
+            (
+                "user:delete_comment",
+                lambda: client.delete(_latest_comment_url()),
+                _add_comment,
+                None,
+            ),
+            ("user:create_article", _create_article, None, _delete_article),
+            ("user:edit_article", _edit_article, _create_article, _delete_article),
+            ("user:delete_article", _delete_article, _create_article, None),
+        ]
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+import types
+from typing import Callable
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import path
+from realworld import benchmarks
+from realworld.articles import views
+from realworld.articles.models import TagCount
+
+
+class Command(BaseCommand):
+    help = """Compares throughput (requests/s) and p95 latency (ms) of tags
+    autocomplete served by the WSGI handler from a pool of threads, and by the
+    ASGI handler with the sync and the native async view."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Number of requests in flight",
+        )
+
+    def handle(self, *args, **options):
+        num_requests: int = options["requests"]
+        concurrency: int = options["concurrency"]
+
+        tag = TagCount.objects.popular_tags()[:1]
+        url = f"/tags-autocomplete/?tags={tag[0].name[:2] if tag else ''}"
+
+        self.stdout.write(f"{'mode':<12} {'requests/s':>11} {'p95':>8}")
+
+        for mode, view, run in (
+            ("wsgi", views.tags_autocomplete, self.run_wsgi),
+            ("asgi-sync", views.tags_autocomplete, self.run_asgi),
+            ("asgi-async", views.async_tags_autocomplete, self.run_asgi),
+        ):
+            # AsyncClient only sends requests to "testserver"
+            with override_settings(
+                ROOT_URLCONF=self.urlconf(view), ALLOWED_HOSTS=["testserver"]
+            ):
+                result = run(url, num_requests, concurrency)
+
+            self.stdout.write(
+                f"{mode:<12} {result['throughput']:>11.1f} {result['p95']:>8.2f}"
+            )
+
+    def urlconf(self, view: Callable) -> types.ModuleType:
+        urlconf = types.ModuleType("benchmark_asgi_urls")
+        urlconf.urlpatterns = [path("tags-autocomplete/", view)]
+        return urlconf
+
+    def run_wsgi(self, url: str, num_requests: int, concurrency: int) -> dict:
+        latencies: list[float] = []
+        errors: list[Exception] = []
+
+        def _worker(num_requests: int) -> None:
+            client = Client()
+            try:
+                for _ in range(num_requests):
+                    started = time.perf_counter()
+                    self.check_response(url, client.get(url))
+                    latencies.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=_worker, args=(num_requests // concurrency,))
+            for _ in range(concurrency)
+        ]
+
+        started = time.perf_counter()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        return self.result(latencies, time.perf_counter() - started)
+
+    def run_asgi(self, url: str, num_requests: int, concurrency: int) -> dict:
+        latencies: list[float] = []
+
+        async def _run() -> float:
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def _request() -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    self.check_response(url, await client.get(url))
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(
+                *[_request() for _ in range(num_requests // concurrency * concurrency)]
+            )
+            return time.perf_counter() - started
+
+        return self.result(latencies, asyncio.run(_run()))
+
+    def check_response(self, url: str, response: HttpResponse) -> None:
+        if response.status_code >= 400:
+            raise CommandError(f"{url} returned {response.status_code}")
+
+    def result(self, latencies: list[float], elapsed: float) -> dict[str, float]:
+        return {
+            "throughput": len(latencies) / elapsed,
+            "p95": benchmarks.percentile(latencies, 95),
+        }
@@ -0,0 +1,250 @@
+import contextlib
+import itertools
+import logging
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import Client
+from django.urls import reverse
+from realworld import benchmarks
+from realworld.articles.models import Article
+
+User = get_user_model()
+
+# journal mode is stored in the database file, so must be reset explicitly
+PROFILES = {
+    "default": {
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {"init_command": "PRAGMA journal_mode = DELETE;"},
+    },
+    "production": {
+        "CONN_MAX_AGE": None,
+        "OPTIONS": settings.SQLITE_PRODUCTION_OPTIONS,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = """Runs reader and writer threads against a copy of the database,
+    with the default and production SQLite profiles, and reports throughput,
+    p95 latency (ms) and errors (e.g. "database is locked") of each."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds per profile",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host name of requests: must be in ALLOWED_HOSTS unless DEBUG",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Database must be SQLite")
+
+        num_readers: int = options["readers"]
+        num_writers: int = options["writers"]
+
+        users = list(User.objects.order_by("pk")[: num_readers + num_writers])
+
+        if len(users) < num_readers + num_writers:
+            raise CommandError("Not enough users: run generate_data first")
+
+        article = Article.objects.order_by("-favorites_count").first()
+
+        if article is None:
+            raise CommandError("No articles found: run generate_data first")
+
+        read_urls = [
+            reverse("home"),
+            article.get_absolute_url(),
+            reverse("comments", args=[article.id]),
+            reverse("profile", args=[article.author_id]),
+        ]
+
+        writers = users[num_readers:]
+
+        # each writer toggles favorites of its own share of the most popular
+        # articles, none written by a writer, so no two writers touch the same
+        # rows and the only contention is for the database lock
+        article_ids = list(
+            Article.objects.exclude(author__in=writers)
+            .order_by("-favorites_count")
+            .values_list("pk", flat=True)[: 10 * num_writers]
+        )
+
+        if len(article_ids) < num_writers:
+            raise CommandError("Not enough articles: run generate_data first")
+
+        write_urls = [
+            [
+                reverse("favorite", args=[article_id])
+                for article_id in article_ids[i::num_writers]
+            ]
+            for i in range(num_writers)
+        ]
+
+        results = {}
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / "benchmark.sqlite3"
+
+            for name, profile in PROFILES.items():
+                self.copy_database(path)
+
+                # failed requests are counted, rather than logged
+                with self.use_database(path, profile), self.quiet("django.request"):
+                    results[name] = self.run(
+                        users[:num_readers],
+                        read_urls,
+                        writers,
+                        write_urls,
+                        options["host"],
+                        options["duration"],
+                    )
+
+        self.stdout.write(
+            f"{'profile':<12} {'reads/s':>9} {'writes/s':>9} {'read p95':>9} "
+            f"{'write p95':>10} {'errors':>7}"
+        )
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<12} {result['reads_per_second']:>9.1f} "
+                f"{result['writes_per_second']:>9.1f} {result['read_p95']:>9.2f} "
+                f"{result['write_p95']:>10.2f} {result['errors']:>7}"
+            )
+
+        default, production = results["default"], results["production"]
+
+        for kind in ("reads", "writes"):
+            if before := default[f"{kind}_per_second"]:
+                gain = production[f"{kind}_per_second"] / before
+                self.stdout.write(f"{kind} throughput: {gain:.2f}x")
+
+    def copy_database(self, path: Path) -> None:
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+
+    @contextlib.contextmanager
+    def use_database(self, path: Path, profile: dict[str, Any]) -> Iterator:
+        """Points new connections (one per worker thread) at the copy."""
+
+        settings_dict = connection.settings_dict
+        saved = {key: settings_dict[key] for key in ("NAME", *profile)}
+
+        settings_dict.update(NAME=str(path), **profile)
+        try:
+            yield
+        finally:
+            settings_dict.update(saved)
+
+    @contextlib.contextmanager
+    def quiet(self, name: str) -> Iterator:
+        logger = logging.getLogger(name)
+        level = logger.level
+        logger.setLevel(logging.CRITICAL)
+        try:
+            yield
+        finally:
+            logger.setLevel(level)
+
+    def run(
+        self,
+        readers: list[User],
+        read_urls: list[str],
+        writers: list[User],
+        write_urls: list[list[str]],
+        host: str,
+        duration: float,
+    ) -> dict[str, Any]:
+
+        read_latencies: list[float] = []
+        write_latencies: list[float] = []
+        errors: list[Exception] = []
+
+        start = threading.Barrier(len(readers) + len(writers) + 1)
+
+        def _worker(user: User, requests: list, latencies: list[float]) -> None:
+            client = Client(SERVER_NAME=host)
+            try:
+                client.force_login(user)
+            except Exception:
+                start.abort()
+                raise
+            try:
+                start.wait()
+
+                deadline = time.perf_counter() + duration
+
+                for method, url in itertools.cycle(requests):
+                    if time.perf_counter() > deadline:
+                        break
+
+                    started = time.perf_counter()
+                    try:
+                        response = getattr(client, method)(url)
+                        if response.status_code >= 400:
+                            raise ValueError(f"{url} returned {response.status_code}")
+                    except Exception as e:
+                        errors.append(e)
+                    else:
+                        latencies.append((time.perf_counter() - started) * 1000)
+
+                    # as the WSGI handler does at the end of each request:
+                    # the test client leaves connections open
+                    close_old_connections()
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(
+                target=_worker,
+                args=(user, [("get", url) for url in read_urls], read_latencies),
+            )
+            for user in readers
+        ] + [
+            threading.Thread(
+                target=_worker,
+                args=(
+                    user,
+                    [(method, url) for url in urls for method in ("post", "delete")],
+                    write_latencies,
+                ),
+            )
+            for user, urls in zip(writers, write_urls)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        start.wait()
+
+        for thread in threads:
+            thread.join()
+
+        return {
+            "reads_per_second": len(read_latencies) / duration,
+            "writes_per_second": len(write_latencies) / duration,
+            "read_p95": benchmarks.percentile(read_latencies, 95),
+            "write_p95": benchmarks.percentile(write_latencies, 95),
+            "errors": len(errors),
+        }
@@ -0,0 +1,52 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = """Copies the default database to each of DATABASE_REPLICAS, using
+    the SQLite backup API. Each copy is written in a single transaction, so
+    readers of a replica see either the old or the new copy."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Copy again every interval seconds until interrupted",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No DATABASE_REPLICAS configured")
+
+        if connections["default"].vendor != "sqlite":
+            raise CommandError("Database must be SQLite")
+
+        while True:
+            started = time.perf_counter()
+
+            for alias in settings.DATABASE_REPLICAS:
+                self.copy(alias)
+
+            self.stdout.write(
+                f"{len(settings.DATABASE_REPLICAS)} replicas synced in "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+
+            if not options["interval"]:
+                break
+
+            time.sleep(options["interval"])
+
+    def copy(self, alias: str) -> None:
+        source = connections["default"]
+        source.ensure_connection()
+
+        target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
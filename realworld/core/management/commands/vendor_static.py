@@ -0,0 +1,48 @@
+import base64
+import hashlib
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from realworld.vendor import ASSETS
+
+
+class Command(BaseCommand):
+    help = """Downloads the third-party assets in realworld.vendor.ASSETS into
+    the first of STATICFILES_DIRS, checking each against its Subresource
+    Integrity hash if it has one. Run collectstatic afterwards."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Download assets already vendored",
+        )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+
+        num_downloaded = 0
+
+        for path, asset in ASSETS.items():
+            target = static_dir / path
+
+            if target.exists() and not options["force"]:
+                continue
+
+            with urllib.request.urlopen(asset.url) as response:
+                content = response.read()
+
+            if asset.integrity and asset.integrity != self.integrity(content):
+                raise CommandError(f"{asset.url} does not match its integrity hash")
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+
+            num_downloaded += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{num_downloaded} asset(s) vendored"))
+
+    def integrity(self, content: bytes) -> str:
+        return "sha384-" + base64.b64encode(hashlib.sha384(content).digest()).decode()
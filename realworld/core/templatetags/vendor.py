@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from django import template
+from realworld.vendor import asset_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendored(path: str) -> str:
+    """URL of a third-party asset: see realworld.vendor.ASSETS."""
+    return asset_url(path)
@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase, override_settings
+
+from .checks import check_shared_cache, check_shared_cache_deploy
+
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+SHARED_CACHE = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379",
+    }
+}
+
+
+@override_settings(
+    ANONYMOUS_CACHE_ENABLED=False,
+    SESSION_CACHE_ENABLED=False,
+    USER_CACHE_ENABLED=False,
+)
+class TestSharedCacheChecks(SimpleTestCase):
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_local_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=LOCAL_CACHE, ANONYMOUS_CACHE_ENABLED=True)
+    def test_local_cache_response_cache_enabled(self):
+        self.assertEqual(
+            [error.id for error in check_shared_cache(None)], ["realworld.E001"]
+        )
+
+    @override_settings(CACHES=LOCAL_CACHE, USER_CACHE_ENABLED=True)
+    def test_local_cache_user_cache_enabled(self):
+        self.assertEqual(
+            [error.id for error in check_shared_cache(None)], ["realworld.E001"]
+        )
+
+    @override_settings(CACHES=SHARED_CACHE, ANONYMOUS_CACHE_ENABLED=True)
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_local_cache_deploy(self):
+        self.assertEqual(
+            [error.id for error in check_shared_cache_deploy(None)],
+            ["realworld.E001"],
+        )
+
+    @override_settings(CACHES=SHARED_CACHE)
+    def test_shared_cache_deploy(self):
+        self.assertEqual(check_shared_cache_deploy(None), [])
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries: int | Callable[[HttpRequest], int]) -> Callable:
+    """Declares the maximum number of SQL queries a view may run per request,
+    including session and user lookups. Must be the outermost decorator.
+
+    The budget must not depend on the amount of data in the database. If it
+    depends on the request itself, e.g. the number of tags submitted, pass a
+    function of the request.
+    """
+
+    def _decorator(view: Callable) -> Callable:
+        view.query_budget = max_queries
+        return view
+
+    return _decorator
+
+
+class Metrics:
+    def __init__(self):
+        self.num_queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def record_query(self, execute: Callable, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.num_queries += 1
+            self.sql_time += time.perf_counter() - started
+
+
+class InstrumentationMiddleware:
+    """Records number of queries, SQL time and template render time of each
+    request. These are logged, and added as Server-Timing and X-Query-Count
+    headers if INSTRUMENTATION_HEADERS is set.
+
+    Requests running more queries than the budget declared by the view's
+    @query_budget are logged as warnings, or raise QueryBudgetExceeded if
+    QUERY_BUDGETS_ENFORCED is set (as it is when running tests).
+    """
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        request.metrics = metrics = Metrics()
+
+        started = time.perf_counter()
+
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.record_query))
+            response = self.get_response(request)
+
+        elapsed = time.perf_counter() - started
+
+        view_name = (
+            request.resolver_match.view_name if request.resolver_match else None
+        )
+
+        logger.debug(
+            "%s %s view=%s queries=%d sql=%.1fms template=%.1fms total=%.1fms",
+            request.method,
+            request.path,
+            view_name,
+            metrics.num_queries,
+            metrics.sql_time * 1000,
+            metrics.template_time * 1000,
+            elapsed * 1000,
+        )
+
+        if settings.INSTRUMENTATION_HEADERS:
+            response["X-Query-Count"] = metrics.num_queries
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"sql;dur={metrics.sql_time * 1000:.1f}",
+                    f"template;dur={metrics.template_time * 1000:.1f}",
+                    f"total;dur={elapsed * 1000:.1f}",
+                ]
+            )
+
+        if (budget := self.get_budget(request)) is not None and (
+            metrics.num_queries > budget
+        ):
+            message = (
+                f"{view_name} ran {metrics.num_queries} queries, "
+                f"budget is {budget}"
+            )
+            if settings.QUERY_BUDGETS_ENFORCED:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def get_budget(self, request: HttpRequest) -> int | None:
+        if request.resolver_match is None:
+            return None
+        budget = getattr(request.resolver_match.func, "query_budget", None)
+        return budget(request) if callable(budget) else budget
+
+    def process_template_response(
+        self, request: HttpRequest, response: SimpleTemplateResponse
+    ) -> SimpleTemplateResponse:
+        # template responses are rendered right after this hook
+        started = time.perf_counter()
+
+        def _rendered(response: SimpleTemplateResponse) -> None:
+            request.metrics.template_time += time.perf_counter() - started
+
+        response.add_post_render_callback(_rendered)
+        return response
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from django.db import models
+from django.http import Http404, HttpRequest
+
+CURSOR_PARAM = "cursor"
+
+PAGE_SIZE = 20
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# primary keys are 64-bit integers: larger values cannot be queried
+MAX_PK = 2**63 - 1
+
+
+def encode_cursor(value: datetime, pk: int) -> str:
+    delta = value - EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f"{micros}_{pk}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        micros, pk = cursor.split("_")
+        # datetimes outside years 1 to 9999 raise OverflowError
+        value, pk = EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (ValueError, OverflowError):
+        raise Http404("Invalid cursor")
+
+    if not 0 <= pk <= MAX_PK:
+        raise Http404("Invalid cursor")
+
+    return value, pk
+
+
+class Page:
+    """A single page of a keyset-paginated queryset.
+
+    Only the next cursor is tracked: there is no page count or total, so
+    fetching a page never requires a COUNT(*) or an OFFSET scan.
+    """
+
+    def __init__(
+        self,
+        request: HttpRequest,
+        object_list: list[models.Model],
+        next_cursor: str | None,
+        path: str | None = None,
+    ):
+        self.request = request
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.path = path or request.path
+
+    def __iter__(self) -> Iterator[models.Model]:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self) -> bool:
+        return CURSOR_PARAM not in self.request.GET
+
+    @property
+    def next_page_url(self) -> str:
+        params = self.request.GET.copy()
+        params[CURSOR_PARAM] = self.next_cursor
+        return f"{self.path}?{params.urlencode()}"
+
+
+def paginate(
+    request: HttpRequest,
+    queryset: models.QuerySet,
+    field: str = "created",
+    page_size: int = PAGE_SIZE,
+    path: str | None = None,
+    pk_field: str = "pk",
+) -> Page:
+    """Returns the page of `queryset` following the cursor in the request,
+    ordered by `(-field, -pk_field)`. `field` must be a datetime attribute of
+    each row (a model field or an annotation). `pk_field` may be an
+    annotation equal to the primary key, so the ordering can be read from an
+    index of a joined table.
+
+    Next page is fetched from `path` if given, otherwise the request path.
+    """
+
+    queryset = after_cursor(request, queryset, field, pk_field)
+
+    # fetch one extra row to find out if there is a next page
+    object_list = list(queryset[: page_size + 1])
+
+    next_cursor: str | None = None
+
+    if len(object_list) > page_size:
+        object_list = object_list[:page_size]
+        last = object_list[-1]
+        next_cursor = encode_cursor(getattr(last, field), getattr(last, pk_field))
+
+    return Page(request, object_list, next_cursor, path)
+
+
+def after_cursor(
+    request: HttpRequest,
+    queryset: models.QuerySet,
+    field: str = "created",
+    pk_field: str = "pk",
+) -> models.QuerySet:
+    """Returns `queryset` ordered as paginate() orders it, from the cursor in
+    the request: slicing it gives the rows of the requested page."""
+
+    queryset = queryset.order_by(f"-{field}", f"-{pk_field}")
+
+    if cursor := request.GET.get(CURSOR_PARAM):
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            models.Q(**{f"{field}__lt": value})
+            | models.Q(**{field: value, f"{pk_field}__lt": pk})
+        )
+
+    return queryset
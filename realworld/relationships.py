@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpRequest
+from realworld.articles.models import Article, Favorite
+
+
+def favorites_key(user_id: int) -> str:
+    return f"user-favorites:{user_id}"
+
+
+def following_key(user_id: int) -> str:
+    return f"user-following:{user_id}"
+
+
+def favorite_ids(request: HttpRequest) -> frozenset[int]:
+    """Returns ids of articles favorited by current user.
+
+    Loaded at most once per request, and cached until the user adds or
+    removes a favorite.
+    """
+    if not hasattr(request, "_favorite_ids"):
+        request._favorite_ids = (
+            _get_or_load(
+                favorites_key(request.user.id),
+                lambda: Favorite.objects.filter(
+                    user=request.user.id
+                ).values_list("article", flat=True),
+            )
+            if request.user.is_authenticated
+            else frozenset()
+        )
+    return request._favorite_ids
+
+
+def following_ids(request: HttpRequest) -> frozenset[int]:
+    """Returns ids of users followed by current user.
+
+    Loaded at most once per request, and cached until the user follows or
+    unfollows someone.
+    """
+    if not hasattr(request, "_following_ids"):
+        request._following_ids = (
+            _get_or_load(
+                following_key(request.user.id),
+                lambda: get_user_model()
+                .followers.through.objects.filter(to_user=request.user.id)
+                .values_list("from_user", flat=True),
+            )
+            if request.user.is_authenticated
+            else frozenset()
+        )
+    return request._following_ids
+
+
+def set_favorites(request: HttpRequest, articles: Iterable[Article]) -> None:
+    """Sets `is_favorite` on each article for the current user."""
+    favorites = favorite_ids(request)
+    for article in articles:
+        article.is_favorite = article.id in favorites
+
+
+def set_favorite(request: HttpRequest, article_id: int, is_favorite: bool) -> None:
+    """Updates cached favorites of current user ahead of the database, when
+    toggles are buffered."""
+    favorites = favorite_ids(request)
+    request._favorite_ids = (
+        favorites | {article_id} if is_favorite else favorites - {article_id}
+    )
+    cache.set(
+        favorites_key(request.user.id),
+        request._favorite_ids,
+        settings.RELATIONSHIPS_CACHE_TIMEOUT,
+    )
+
+
+def set_following(request: HttpRequest, user_id: int, is_following: bool) -> None:
+    """Updates cached following of current user ahead of the database, when
+    toggles are buffered."""
+    following = following_ids(request)
+    request._following_ids = (
+        following | {user_id} if is_following else following - {user_id}
+    )
+    cache.set(
+        following_key(request.user.id),
+        request._following_ids,
+        settings.RELATIONSHIPS_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_favorites(*user_ids: int) -> None:
+    cache.delete_many([favorites_key(user_id) for user_id in user_ids])
+
+
+def invalidate_following(*user_ids: int) -> None:
+    cache.delete_many([following_key(user_id) for user_id in user_ids])
+
+
+def _get_or_load(key: str, load: Callable[[], Iterable[int]]) -> frozenset[int]:
+    if (ids := cache.get(key)) is None:
+        ids = frozenset(load())
+        cache.set(key, ids, settings.RELATIONSHIPS_CACHE_TIMEOUT)
+    return ids
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import contextlib
+import random
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+from django.conf import settings
+from django.db import models
+from django.http import HttpRequest, HttpResponse
+
+# set while the sticky cookie is live: the user's reads go to primary
+STICKY_COOKIE = "use_primary"
+
+_replica: ContextVar[str | None] = ContextVar("replica", default=None)
+
+
+def read_from_replica(view: Callable) -> Callable:
+    """Marks a read-only view as safe to read from a replica. Must be applied
+    outside all other decorators except @query_budget."""
+    view.read_from_replica = True
+    return view
+
+
+@contextlib.contextmanager
+def use_replica(alias: str | None) -> Iterator[None]:
+    """Reads inside the block go to replica alias, or to primary if None."""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """Sends reads to the replica set by use_replica(), if any, and all writes
+    to primary (the default database).
+
+    Sessions are always read from primary, as a replica may not have a new
+    session yet.
+    """
+
+    def db_for_read(self, model: type[models.Model], **hints) -> str | None:
+        if model._meta.app_label == "sessions":
+            return None
+        return _replica.get()
+
+    def db_for_write(self, model: type[models.Model], **hints) -> str:
+        # instances read from a replica would otherwise be saved to it
+        return "default"
+
+    def allow_relation(self, obj1: models.Model, obj2: models.Model, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        # replicas are copies of primary: see the sync_replicas command
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """Views marked @read_from_replica read from a random replica in
+    DATABASE_REPLICAS, for the whole request including template rendering.
+
+    A successful write sets a cookie sending the user's reads to primary for
+    REPLICA_STICKINESS seconds, so they see their own writes before the
+    replicas do.
+    """
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with contextlib.ExitStack() as stack:
+            request.replica_context = stack
+            response = self.get_response(request)
+
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKINESS,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable, view_args, view_kwargs
+    ) -> None:
+        if (
+            settings.DATABASE_REPLICAS
+            and getattr(view_func, "read_from_replica", False)
+            and STICKY_COOKIE not in request.COOKIES
+        ):
+            request.replica_context.enter_context(
+                use_replica(random.choice(settings.DATABASE_REPLICAS))
+            )
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import time
+import uuid
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from realworld.replicas import use_replica
+
+# seconds a worker may hold the regeneration lock for a page
+LOCK_TIMEOUT = 10
+
+# polling while another worker regenerates a page with no stale copy
+LOCK_WAIT_INTERVAL = 0.05
+LOCK_WAIT_ATTEMPTS = 20
+
+# expired entries are kept this long to be served while being regenerated
+STALE_TIMEOUT = 60 * 60
+
+
+def add_cache_tags(request: HttpRequest, *tags: str) -> None:
+    """Declares objects the response depends on. Cached responses are
+    invalidated when any of these tags is invalidated."""
+    request.cache_tags = getattr(request, "cache_tags", set()) | set(tags)
+
+
+def tag_listing_key(name: str) -> str:
+    """Cache tag of the listing of articles tagged with name."""
+    # tag names may contain any characters
+    return f"tag:{hashlib.md5(name.encode()).hexdigest()}"
+
+
+def invalidate_cache_tags(*tags: str) -> None:
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def cache_anonymous(view: Callable) -> Callable:
+    """Caches GET responses for anonymous users on path, query string and
+    htmx headers.
+
+    Only one worker at a time regenerates an expired or invalidated page:
+    others serve the stale copy, or wait briefly for the new one if there is
+    none.
+    """
+
+    @functools.wraps(view)
+    def _wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+
+        if (
+            not settings.ANONYMOUS_CACHE_ENABLED
+            or request.method != "GET"
+            or request.user.is_authenticated
+        ):
+            return view(request, *args, **kwargs)
+
+        key = _cache_key(request)
+
+        entry = cache.get(key)
+
+        if entry and _is_fresh(entry):
+            return _to_response(request, entry)
+
+        lock_key = f"{key}:lock"
+
+        if not (locked := cache.add(lock_key, True, LOCK_TIMEOUT)):
+            if entry:
+                return _to_response(request, entry)
+
+            for _ in range(LOCK_WAIT_ATTEMPTS):
+                time.sleep(LOCK_WAIT_INTERVAL)
+                if (entry := cache.get(key)) and _is_fresh(entry):
+                    return _to_response(request, entry)
+
+        try:
+            # a replica may not have the write that invalidated the page yet,
+            # and would be cached until ANONYMOUS_CACHE_TIMEOUT
+            with use_replica(None):
+                response = view(request, *args, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+            if response.status_code == 200:
+                _store(key, request, response)
+            return response
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+    return _wrapper
+
+
+def _cache_key(request: HttpRequest) -> str:
+    digest = hashlib.md5(
+        "|".join(
+            [
+                request.get_full_path(),
+                request.headers.get("HX-Request", ""),
+                request.headers.get("HX-Target", ""),
+            ]
+        ).encode()
+    ).hexdigest()
+    return f"response-cache:{digest}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"response-cache-tag:{tag}"
+
+
+def _get_versions(tags: set[str]) -> dict[str, str]:
+    versions = cache.get_many([_tag_key(tag) for tag in tags])
+    return {tag: versions[_tag_key(tag)] for tag in tags if _tag_key(tag) in versions}
+
+
+def _is_fresh(entry: dict[str, Any]) -> bool:
+    return (
+        entry["expires"] > time.time()
+        and _get_versions(set(entry["tags"])) == entry["tags"]
+    )
+
+
+def _store(key: str, request: HttpRequest, response: HttpResponse) -> None:
+    tags: set[str] = getattr(request, "cache_tags", set())
+
+    versions = _get_versions(tags)
+
+    # evicted or never invalidated tags: new version, so any older entry
+    # depending on them is treated as stale
+    if missing := {tag: uuid.uuid4().hex for tag in tags - versions.keys()}:
+        cache.set_many(
+            {_tag_key(tag): version for tag, version in missing.items()}, None
+        )
+        versions.update(missing)
+
+    cache.set(
+        key,
+        {
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "etag": response.get("ETag"),
+            "last_modified": response.get("Last-Modified"),
+            "tags": versions,
+            "expires": time.time() + settings.ANONYMOUS_CACHE_TIMEOUT,
+        },
+        settings.ANONYMOUS_CACHE_TIMEOUT + STALE_TIMEOUT,
+    )
+
+
+def _to_response(request: HttpRequest, entry: dict[str, Any]) -> HttpResponse:
+    response = HttpResponse(entry["content"], content_type=entry["content_type"])
+
+    if entry["etag"]:
+        response["ETag"] = entry["etag"]
+
+    if entry["last_modified"]:
+        response["Last-Modified"] = entry["last_modified"]
+
+    # revalidation of a cached page is answered without hitting the database
+    return get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=parse_http_date_safe(entry["last_modified"] or ""),
+        response=response,
+    )
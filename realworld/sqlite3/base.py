@@ -0,0 +1,46 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ("DEFERRED", "EXCLUSIVE", "IMMEDIATE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend taking two extra OPTIONS, as the built-in backend does
+    from Django 5.1:
+
+    - init_command: SQL run on every new connection, e.g. PRAGMAs.
+    - transaction_mode: how atomic() begins a transaction. With IMMEDIATE the
+      write lock is taken up front, so a transaction waits for busy_timeout
+      rather than failing with "database is locked" when it goes on to write
+      after reading.
+    """
+
+    init_command: str | None = None
+    transaction_mode: str | None = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+
+        self.init_command = params.pop("init_command", None)
+        self.transaction_mode = params.pop("transaction_mode", None)
+
+        if self.transaction_mode and (
+            self.transaction_mode.upper() not in TRANSACTION_MODES
+        ):
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}"
+            )
+
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if self.init_command:
+            conn.executescript(self.init_command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,105 @@
+import io
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase, TransactionTestCase
+from realworld.articles.models import Article, TagCount
+from realworld.benchmarks import load, percentile
+from realworld.comments.models import Comment
+from taggit.models import Tag
+
+User = get_user_model()
+
+
+class TestBenchmarks(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0)
+
+    def test_generate_data_and_benchmark(self):
+        call_command(
+            "generate_data",
+            users=10,
+            articles=20,
+            tags=5,
+            favorites=50,
+            follows=20,
+            comments=40,
+            seed=1,
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertEqual(Comment.objects.count(), 40)
+
+        for article in Article.objects.annotate(
+            num_favorites=Count("favorites", distinct=True),
+            num_comments=Count("comment", distinct=True),
+        ):
+            self.assertEqual(article.favorites_count, article.num_favorites)
+            self.assertEqual(article.comments_count, article.num_comments)
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            output = Path(tempdir) / "results.json"
+
+            call_command(
+                "benchmark",
+                requests=2,
+                host="testserver",
+                output=output,
+                stdout=io.StringIO(),
+            )
+
+            results = load(output)
+
+        self.assertEqual(results["user:favorite"]["requests"], 2)
+        self.assertEqual(Article.objects.count(), 20)
+        self.assertEqual(Comment.objects.count(), 40)
+
+
+class TestThreadedBenchmarks(TransactionTestCase):
+    """Requests run in other threads, with their own connections: these do
+    not see data in a test transaction, and the SQLite backup API waits for
+    it to end."""
+
+    def test_benchmark_concurrency(self):
+        call_command(
+            "generate_data",
+            users=4,
+            articles=20,
+            tags=5,
+            favorites=20,
+            follows=5,
+            comments=20,
+            seed=1,
+            stdout=io.StringIO(),
+        )
+
+        stdout = io.StringIO()
+
+        call_command(
+            "benchmark_concurrency",
+            readers=2,
+            writers=1,
+            duration=0.2,
+            host="testserver",
+            stdout=stdout,
+        )
+
+        self.assertIn("production", stdout.getvalue())
+        self.assertEqual(Article.objects.count(), 20)
+
+    def test_benchmark_asgi(self):
+        TagCount.objects.create(tag=Tag.objects.create(name="python"), num_articles=1)
+
+        stdout = io.StringIO()
+        call_command("benchmark_asgi", requests=4, concurrency=2, stdout=stdout)
+
+        self.assertIn("asgi-async", stdout.getvalue())
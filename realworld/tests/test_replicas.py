@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from realworld import replicas
+from realworld.articles.models import Article
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["default"])
+class TestReplicas(TestCase):
+    """The default database stands in for the replica: tests check which
+    requests are routed to it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.user = User.objects.create(email="tester2@gmail.com", name="tester2")
+        cls.article = Article.objects.create(title="test", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        patcher = patch("realworld.replicas.use_replica", wraps=replicas.use_replica)
+        self.use_replica = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_router(self):
+        router = replicas.ReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Article))
+
+        with replicas.use_replica("replica"):
+            self.assertEqual(router.db_for_read(Article), "replica")
+            self.assertIsNone(router.db_for_read(Session))
+            self.assertEqual(router.db_for_write(Article), "default")
+
+            with replicas.use_replica(None):
+                self.assertIsNone(router.db_for_read(Article))
+
+    def test_read_view(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("home"))
+        self.use_replica.assert_called_once_with("default")
+
+    def test_other_view(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("create_article"))
+        self.use_replica.assert_not_called()
+
+    def test_sticky_after_write(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(reverse("favorite", args=[self.article.id]))
+        self.assertIn(replicas.STICKY_COOKIE, response.cookies)
+
+        self.client.get(reverse("home"))
+        self.use_replica.assert_not_called()
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(reverse("favorite", args=[self.article.id]))
+        self.assertNotIn(replicas.STICKY_COOKIE, response.cookies)
+
+        self.client.get(reverse("home"))
+        self.use_replica.assert_not_called()
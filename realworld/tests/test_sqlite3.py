@@ -0,0 +1,58 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase
+from realworld.sqlite3.base import DatabaseWrapper
+
+
+class TestSQLiteBackend(TestCase):
+    def make_connection(self, path: Path, **options) -> DatabaseWrapper:
+        return DatabaseWrapper(
+            {**connection.settings_dict, "NAME": str(path), "OPTIONS": options},
+            "sqlite_test",
+        )
+
+    def test_options(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / "test.sqlite3"
+
+            db = self.make_connection(
+                path,
+                init_command="PRAGMA journal_mode = WAL; PRAGMA busy_timeout = 100;",
+                transaction_mode="IMMEDIATE",
+            )
+
+            try:
+                with db.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEqual(cursor.fetchone()[0], "wal")
+                    cursor.execute("PRAGMA busy_timeout")
+                    self.assertEqual(cursor.fetchone()[0], 100)
+
+                # as atomic() does: write lock is taken before any write
+                db.set_autocommit(
+                    False, force_begin_transaction_with_broken_autocommit=True
+                )
+
+                other = sqlite3.connect(path, timeout=0)
+                try:
+                    with self.assertRaises(sqlite3.OperationalError):
+                        other.execute("BEGIN IMMEDIATE")
+                finally:
+                    other.close()
+
+                db.rollback()
+                db.set_autocommit(True)
+            finally:
+                db.close()
+
+    def test_invalid_transaction_mode(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            db = self.make_connection(
+                Path(tempdir) / "test.sqlite3", transaction_mode="WHENEVER"
+            )
+            with self.assertRaises(ImproperlyConfigured):
+                db.ensure_connection()
@@ -0,0 +1,159 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from realworld import toggles
+from realworld.articles.models import Article, TimelineEntry
+
+User = get_user_model()
+
+
+class TestBufferedToggles(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(email="tester1@gmail.com", name="tester1")
+        cls.user = User.objects.create(email="tester2@gmail.com", name="tester2")
+        cls.article = Article.objects.create(title="test", author=cls.author)
+        cls.url = reverse("favorite", args=[cls.article.id])
+
+    def setUp(self):
+        cache.clear()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = Path(tmpdir.name) / "toggles.spool"
+        settings_override = override_settings(
+            TOGGLE_BUFFER_ENABLED=True,
+            TOGGLE_BUFFER_PATH=self.path,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_favorite_buffered(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(self.url)
+
+        self.assertTrue(response.context["is_favorite"])
+        self.assertEqual(response.context["num_favorites"], 1)
+        self.assertFalse(self.article.favorites.exists())
+
+        # optimistic state is shown until flushed
+        response = self.client.get(self.article.get_absolute_url())
+        self.assertTrue(response.context["is_favorite"])
+
+        self.assertEqual(toggles.flush(), 1)
+
+        self.assertTrue(self.article.favorites.filter(pk=self.user.id).exists())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.favorites_count, 1)
+
+    def test_coalesced(self):
+        self.client.force_login(self.user)
+
+        self.client.post(self.url)
+        self.client.delete(self.url)
+        self.client.post(self.url)
+
+        self.assertEqual(toggles.flush(), 1)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.favorites_count, 1)
+
+    def test_unfavorite(self):
+        self.article.add_favorite(self.user)
+
+        toggles.enqueue(toggles.FAVORITE, self.user.id, self.article.id, True)
+        toggles.enqueue(toggles.FAVORITE, self.user.id, self.article.id, False)
+        toggles.flush()
+
+        self.assertFalse(self.article.favorites.exists())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.favorites_count, 0)
+
+    def test_flush_idempotent(self):
+        toggles.apply_favorites({(self.user.id, self.article.id): True})
+        toggles.apply_favorites({(self.user.id, self.article.id): True})
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.favorites_count, 1)
+
+    def test_follow(self):
+        Article.objects.create(title="test 2", author=self.author)
+
+        toggles.enqueue(toggles.FOLLOW, self.user.id, self.author.id, True)
+        toggles.flush()
+
+        self.assertTrue(self.author.followers.filter(pk=self.user.id).exists())
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 1)
+        self.assertEqual(TimelineEntry.objects.filter(user=self.user).count(), 2)
+
+        toggles.enqueue(toggles.FOLLOW, self.user.id, self.author.id, False)
+        toggles.flush()
+
+        self.assertFalse(self.author.followers.exists())
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_unfollow_fan_out_resumed(self):
+        follower = User.objects.create(email="tester3@gmail.com", name="tester3")
+        self.author.add_follower(follower)
+        self.author.add_follower(self.user)
+
+        toggles.enqueue(toggles.FOLLOW, self.user.id, self.author.id, False)
+        toggles.flush()
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=follower, article=self.article).exists()
+        )
+
+    def test_flush_empty(self):
+        self.assertEqual(toggles.flush(), 0)
+
+    def test_article_deleted(self):
+        toggles.enqueue(toggles.FAVORITE, self.user.id, self.article.id, True)
+        self.article.delete()
+
+        toggles.flush()
+
+        self.assertEqual(list(self.path.parent.iterdir()), [])
+
+        # later toggles are not blocked
+        article = Article.objects.create(title="test 2", author=self.author)
+        toggles.enqueue(toggles.FAVORITE, self.user.id, article.id, True)
+
+        self.assertEqual(toggles.flush(), 1)
+        self.assertTrue(article.favorites.filter(pk=self.user.id).exists())
+
+    def test_user_deleted(self):
+        toggles.enqueue(toggles.FAVORITE, self.user.id, self.article.id, True)
+        toggles.enqueue(toggles.FOLLOW, self.user.id, self.author.id, True)
+        self.user.delete()
+
+        toggles.flush()
+
+        self.assertEqual(list(self.path.parent.iterdir()), [])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.favorites_count, 0)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.followers_count, 0)
+
+    def test_flush_failed(self):
+        toggles.enqueue(toggles.FAVORITE, self.user.id, self.article.id, True)
+
+        with patch.object(toggles, "apply_favorites", side_effect=IntegrityError):
+            with self.assertLogs("realworld.toggles", "ERROR"):
+                self.assertEqual(toggles.flush(), 0)
+
+        (failed,) = self.path.parent.glob("*.failed")
+
+        toggles.enqueue(toggles.FOLLOW, self.user.id, self.author.id, True)
+
+        self.assertEqual(toggles.flush(), 1)
+        self.assertTrue(self.author.followers.filter(pk=self.user.id).exists())
+        self.assertTrue(failed.exists())
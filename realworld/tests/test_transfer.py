@@ -0,0 +1,187 @@
+import io
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from realworld import transfer
+from realworld.articles.models import Article, Favorite, TagCount, TimelineEntry
+from realworld.comments.models import Comment
+from realworld.sqlite3.base import DatabaseWrapper
+
+User = get_user_model()
+
+
+class TestTransfer(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            "tester1@gmail.com", name="tester1", password="testpass"
+        )
+        self.user = User.objects.create(email="tester2@gmail.com", name="tester2")
+
+        self.article = Article.objects.create(
+            title="Python", content="*test*", author=self.author
+        )
+        self.article.tags.add("python", "django")
+        self.article.add_favorite(self.user)
+
+        Comment.objects.create(article=self.article, author=self.user, content="test")
+
+        self.author.add_follower(self.user)
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tempdir.name) / "data.ndjson"
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def export(self, **options) -> str:
+        call_command("export_ndjson", self.path, stdout=io.StringIO(), **options)
+        return self.path.read_text()
+
+    def import_data(self, **options) -> str:
+        stdout = io.StringIO()
+        call_command("import_ndjson", self.path, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def delete_all(self):
+        Article.objects.get().delete()
+        User.objects.all().delete()
+
+    def test_export_import(self):
+        created = self.article.created
+        favorited = Favorite.objects.get().created
+
+        self.export(batch_size=1)
+        self.delete_all()
+        self.import_data(batch_size=1)
+
+        article = Article.objects.get()
+        author = User.objects.get(email=self.author.email)
+        user = User.objects.get(email=self.user.email)
+
+        self.assertEqual(article.id, self.article.id)
+        self.assertEqual(article.author, author)
+        self.assertEqual(article.created, created)
+        self.assertEqual(article.as_markdown(), "<p><em>test</em></p>")
+        self.assertEqual(set(article.tags.names()), {"python", "django"})
+        self.assertEqual(article.favorites_count, 1)
+        self.assertEqual(article.comments_count, 1)
+        self.assertEqual(Favorite.objects.get(user=user).created, favorited)
+        self.assertTrue(author.check_password("testpass"))
+        self.assertEqual(author.followers_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(user=user, article=article))
+        self.assertEqual(TagCount.objects.get(tag__name="python").num_articles, 1)
+        self.assertFalse(Path(f"{self.path}.checkpoint").exists())
+
+    def test_import_again(self):
+        self.export()
+        output = self.import_data()
+
+        self.assertIn("1 article(s)", output.splitlines()[-1])
+        self.assertEqual(Article.objects.get().favorites_count, 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(TagCount.objects.get(tag__name="python").num_articles, 1)
+
+    def test_import_id_taken(self):
+        self.export()
+        self.delete_all()
+
+        # another article has since been given the exported article's id
+        Article.objects.create(
+            id=self.article.id,
+            title="other",
+            author=User.objects.create(email="tester3@gmail.com", name="tester3"),
+        )
+
+        with self.assertRaises(CommandError):
+            self.import_data()
+
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(Favorite.objects.count(), 0)
+
+    def test_resume_export(self):
+        expected = self.export()
+
+        # interrupted after the first user, part way through the next line
+        offset = expected.index("\n") + 1
+        self.path.write_text(expected[: offset + 10])
+
+        Path(f"{self.path}.checkpoint").write_text(
+            json.dumps({"offset": offset, "type": "user", "after": self.author.id})
+        )
+
+        self.assertEqual(self.export(resume=True), expected)
+
+    def test_resume_export_no_checkpoint(self):
+        with self.assertRaises(CommandError):
+            self.export(resume=True)
+
+    def test_resume_import(self):
+        lines = self.export().splitlines(keepends=True)
+
+        self.delete_all()
+
+        # interrupted after importing users
+        Path(f"{self.path}.checkpoint").write_text(
+            json.dumps({"offset": len("".join(lines[:2]).encode())})
+        )
+
+        self.import_data(resume=True)
+
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Article.objects.exists())
+
+    def test_invalid_record(self):
+        self.path.write_text('{"type": "unknown"}\n')
+
+        with self.assertRaises(CommandError):
+            self.import_data()
+
+
+class TestReadSnapshot(TestCase):
+    def test_write_lock_not_taken(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / "test.sqlite3"
+
+            # as the production profile: atomic() would BEGIN IMMEDIATE
+            db = DatabaseWrapper(
+                {
+                    **connection.settings_dict,
+                    "NAME": str(path),
+                    "OPTIONS": {
+                        "init_command": "PRAGMA journal_mode = WAL;",
+                        "transaction_mode": "IMMEDIATE",
+                    },
+                },
+                "sqlite_test",
+            )
+
+            other = sqlite3.connect(path, timeout=0)
+
+            try:
+                with db.cursor() as cursor:
+                    cursor.execute("CREATE TABLE test (id INTEGER PRIMARY KEY)")
+
+                with patch.object(transfer, "connection", db), transfer.read_snapshot():
+                    with db.cursor() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM test")
+                        self.assertEqual(cursor.fetchone()[0], 0)
+
+                        # "database is locked" if the write lock were held
+                        with other:
+                            other.execute("INSERT INTO test DEFAULT VALUES")
+
+                        cursor.execute("SELECT COUNT(*) FROM test")
+                        self.assertEqual(cursor.fetchone()[0], 0)
+
+                self.assertTrue(db.get_autocommit())
+                self.assertFalse(db.connection.in_transaction)
+            finally:
+                other.close()
+                db.close()
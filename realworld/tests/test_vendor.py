@@ -0,0 +1,121 @@
+import base64
+import hashlib
+import http
+import io
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from realworld import vendor
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class TestStaticPipeline(SimpleTestCase):
+    # references a font, as vendored stylesheets do
+    css = "".join(
+        f".icon-{i}:before {{ content: '\\f{i:03x}'; }}\n" for i in range(200)
+    ) + '@font-face { src: url("../fonts/icons.woff?v=1"); }\n'
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.static_dir = Path(self.tempdir.name) / "static"
+        self.static_root = Path(self.tempdir.name) / "staticfiles"
+
+        (self.static_dir / "vendor" / "fonts").mkdir(parents=True)
+        (self.static_dir / "vendor" / "css").mkdir()
+        (self.static_dir / "vendor" / "css" / "icons.css").write_text(self.css)
+        (self.static_dir / "vendor" / "fonts" / "icons.woff").write_bytes(b"woff")
+
+        vendor.is_vendored.cache_clear()
+
+    def tearDown(self):
+        vendor.is_vendored.cache_clear()
+        self.tempdir.cleanup()
+
+    def pipeline(self, **kwargs) -> override_settings:
+        return override_settings(
+            STATICFILES_DIRS=[self.static_dir],
+            STATIC_ROOT=self.static_root,
+            STATICFILES_FINDERS=[
+                "django.contrib.staticfiles.finders.FileSystemFinder"
+            ],
+            **kwargs,
+        )
+
+    def test_not_vendored(self):
+        self.assertEqual(
+            vendor.asset_url("vendor/htmx.min.js"), "https://unpkg.com/htmx.org@1.6.1"
+        )
+
+    def test_vendored(self):
+        (self.static_dir / "vendor" / "htmx.min.js").write_text("htmx")
+
+        with self.pipeline():
+            self.assertEqual(
+                Template("{% load vendor %}{% vendored 'vendor/htmx.min.js' %}").render(
+                    Context()
+                ),
+                "/static/vendor/htmx.min.js",
+            )
+
+    def test_vendor_static(self):
+        content = b"htmx"
+        asset = vendor.Asset(
+            "https://example.com/htmx.js",
+            "sha384-" + base64.b64encode(hashlib.sha384(content).digest()).decode(),
+        )
+
+        with self.pipeline(), patch.dict(
+            vendor.ASSETS, {"vendor/htmx.min.js": asset}, clear=True
+        ), patch("urllib.request.urlopen", return_value=io.BytesIO(content)):
+            call_command("vendor_static", stdout=io.StringIO())
+
+        self.assertEqual(
+            (self.static_dir / "vendor" / "htmx.min.js").read_bytes(), content
+        )
+
+    def test_vendor_static_integrity_mismatch(self):
+        asset = vendor.Asset("https://example.com/htmx.js", "sha384-invalid")
+
+        with self.pipeline(), patch.dict(
+            vendor.ASSETS, {"vendor/htmx.min.js": asset}, clear=True
+        ), patch("urllib.request.urlopen", return_value=io.BytesIO(b"htmx")):
+            self.assertRaises(
+                CommandError, call_command, "vendor_static", stdout=io.StringIO()
+            )
+
+        self.assertFalse((self.static_dir / "vendor" / "htmx.min.js").exists())
+
+    def test_collectstatic(self):
+        storage = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+
+        with self.pipeline(STATICFILES_STORAGE=storage):
+            call_command("collectstatic", interactive=False, verbosity=0)
+
+            url = static("vendor/css/icons.css")
+            self.assertRegex(url, r"^/static/vendor/css/icons\.[0-9a-f]{12}\.css$")
+
+            path = self.static_root / url.removeprefix("/static/")
+            self.assertIn(
+                static("vendor/fonts/icons.woff").removeprefix("/static/vendor"),
+                path.read_text(),
+            )
+
+            # precompressed siblings of the hashed file
+            for suffix in (".gz", ".br"):
+                self.assertLess(
+                    Path(f"{path}{suffix}").stat().st_size, path.stat().st_size / 4
+                )
+
+            response = WhiteNoiseMiddleware(lambda request: HttpResponse())(
+                RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+            )
+
+        self.assertEqual(response.status_code, http.HTTPStatus.OK)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("immutable", response["Cache-Control"])
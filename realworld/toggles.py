@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import fcntl
+import glob
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, models, transaction
+from realworld.articles.models import Article, Favorite, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+FAVORITE = "favorite"
+FOLLOW = "follow"
+
+# (kind, user_id, target_id): final state
+Toggles = dict[tuple[str, int, int], bool]
+
+
+def enqueue(kind: str, user_id: int, target_id: int, state: bool) -> None:
+    """Appends favorite or follow toggle to the spool file, to be applied by
+    flush().
+
+    The spool is locked while appending, and reopened if flush() has moved it
+    in the meantime, so no toggle is written to a file already flushed.
+    """
+    line = json.dumps([kind, user_id, target_id, state]) + "\n"
+
+    while True:
+        with open(settings.TOGGLE_BUFFER_PATH, "a") as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            if not _is_moved(fp):
+                fp.write(line)
+                fp.flush()
+                os.fsync(fp.fileno())
+                return
+
+
+def flush(batch_size: int = 1000) -> int:
+    """Applies spooled toggles, coalesced so only the last toggle for each
+    user and article or followed user is applied. Returns number of toggles
+    applied.
+
+    The spool is moved aside before it is read. Applying toggles is
+    idempotent, so moved files left over from an interrupted flush are simply
+    applied again on the next run. A file that fails to apply is moved aside
+    again, to a .failed file, so it does not block the files after it.
+    """
+    path = str(settings.TOGGLE_BUFFER_PATH)
+
+    if os.path.exists(path):
+        os.replace(path, f"{path}.{time.time_ns()}.flushing")
+
+    num_applied = 0
+
+    for filename in sorted(glob.glob(f"{glob.escape(path)}.*.flushing")):
+
+        with open(filename) as fp:
+            # wait for any writer still appending to the moved file
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            toggles = _coalesce(fp)
+
+        try:
+            for batch in _batches(toggles, batch_size):
+                apply_favorites(_of_kind(batch, FAVORITE))
+                apply_follows(_of_kind(batch, FOLLOW))
+        except DatabaseError:
+            logger.exception("Failed to apply toggles in %s", filename)
+            os.replace(filename, filename.removesuffix(".flushing") + ".failed")
+            continue
+
+        num_applied += len(toggles)
+
+        os.remove(filename)
+
+    return num_applied
+
+
+def apply_favorites(toggles: dict[tuple[int, int], bool]) -> int:
+    """Applies (user, article): is_favorite states in a single transaction.
+    Toggles of users or articles deleted since are dropped. Returns number of
+    favorites added or removed."""
+    if not toggles:
+        return 0
+
+    with transaction.atomic():
+        articles = Article.objects.only("pk", "author").in_bulk(
+            {article for _, article in toggles}
+        )
+
+        users = get_user_model().objects.filter(pk__in={user for user, _ in toggles})
+
+        toggles = _drop_deleted(toggles, users.values_list("pk", flat=True), articles)
+
+        if not toggles:
+            return 0
+
+        added, removed = _diff(
+            toggles,
+            Favorite.objects.filter(
+                user__in={user for user, _ in toggles},
+                article__in={article for _, article in toggles},
+            ).values_list("pk", "user", "article"),
+        )
+
+        Favorite.objects.bulk_create(
+            [Favorite(user_id=user, article_id=article) for user, article in added],
+            ignore_conflicts=True,
+        )
+
+        Favorite.objects.filter(pk__in=removed.values()).delete()
+
+        _update_counts(Article, "favorites_count", added, removed)
+
+        for action, pairs in (("post_add", added), ("post_remove", removed)):
+            for article, users in _group(pairs).items():
+                _send_m2m_changed(
+                    Favorite,
+                    articles[article],
+                    get_user_model(),
+                    action,
+                    users,
+                )
+
+    return len(added) + len(removed)
+
+
+def apply_follows(toggles: dict[tuple[int, int], bool]) -> int:
+    """Applies (follower, followed): is_following states in a single
+    transaction, including timeline backfill or prune. Toggles of users
+    deleted since are dropped. Returns number of follows added or removed."""
+    if not toggles:
+        return 0
+
+    User = get_user_model()
+    Follow = User.followers.through
+
+    with transaction.atomic():
+        users = User.objects.in_bulk({user for pair in toggles for user in pair})
+
+        toggles = _drop_deleted(toggles, users, users)
+
+        if not toggles:
+            return 0
+
+        added, removed = _diff(
+            toggles,
+            Follow.objects.filter(
+                to_user__in={user for user, _ in toggles},
+                from_user__in={followed for _, followed in toggles},
+            ).values_list("pk", "to_user", "from_user"),
+        )
+
+        Follow.objects.bulk_create(
+            [
+                Follow(to_user_id=user, from_user_id=followed)
+                for user, followed in added
+            ],
+            ignore_conflicts=True,
+        )
+
+        Follow.objects.filter(pk__in=removed.values()).delete()
+
+        _update_counts(User, "followers_count", added, removed)
+
+        for user, followed in added:
+            TimelineEntry.objects.backfill(users[user], users[followed])
+
+        for user, followed in removed:
+            TimelineEntry.objects.prune(users[user], users[followed])
+
+        # counts are read again: authors back down to the fan-out limit are
+        # fanned out to their remaining followers
+        unfollowed = _group(removed)
+
+        for author in User.objects.filter(pk__in=unfollowed).only("followers_count"):
+            TimelineEntry.objects.resume_fan_out(author, len(unfollowed[author.pk]))
+
+        for action, pairs in (("post_add", added), ("post_remove", removed)):
+            for followed, followers in _group(pairs).items():
+                _send_m2m_changed(Follow, users[followed], User, action, followers)
+
+    return len(added) + len(removed)
+
+
+def _is_moved(fp) -> bool:
+    try:
+        return os.stat(fp.name).st_ino != os.fstat(fp.fileno()).st_ino
+    except FileNotFoundError:
+        return True
+
+
+def _coalesce(lines: Iterator[str]) -> Toggles:
+    toggles: Toggles = {}
+    for line in lines:
+        try:
+            kind, user, target, state = json.loads(line)
+        except ValueError:
+            # partial line from a crashed writer
+            continue
+        toggles[(kind, user, target)] = state
+    return toggles
+
+
+def _batches(toggles: Toggles, batch_size: int) -> Iterator[Toggles]:
+    items = list(toggles.items())
+    for start in range(0, len(items), batch_size):
+        yield dict(items[start : start + batch_size])
+
+
+def _of_kind(toggles: Toggles, kind: str) -> dict[tuple[int, int], bool]:
+    return {
+        (user, target): state
+        for (toggle_kind, user, target), state in toggles.items()
+        if toggle_kind == kind
+    }
+
+
+def _drop_deleted(
+    toggles: dict[tuple[int, int], bool],
+    users: Iterable[int],
+    targets: Iterable[int],
+) -> dict[tuple[int, int], bool]:
+    users, targets = set(users), set(targets)
+    return {
+        (user, target): state
+        for (user, target), state in toggles.items()
+        if user in users and target in targets
+    }
+
+
+def _diff(
+    toggles: dict[tuple[int, int], bool], rows: Iterable[tuple[int, int, int]]
+) -> tuple[list[tuple[int, int]], dict[tuple[int, int], int]]:
+    """Returns pairs to be added, and through table ids of pairs to be
+    removed. `rows` may include pairs not toggled."""
+    existing = {(user, target): pk for pk, user, target in rows}
+
+    added = [
+        pair for pair, state in toggles.items() if state and pair not in existing
+    ]
+
+    removed = {
+        pair: existing[pair]
+        for pair, state in toggles.items()
+        if not state and pair in existing
+    }
+
+    return added, removed
+
+
+def _update_counts(
+    model: type[models.Model],
+    field: str,
+    added: Iterable[tuple[int, int]],
+    removed: Iterable[tuple[int, int]],
+) -> None:
+    deltas: dict[int, int] = defaultdict(int)
+
+    for _, target in added:
+        deltas[target] += 1
+
+    for _, target in removed:
+        deltas[target] -= 1
+
+    # one UPDATE per distinct delta rather than per row
+    by_delta: dict[int, list[int]] = defaultdict(list)
+
+    for target, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(target)
+
+    for delta, targets in by_delta.items():
+        model.objects.filter(pk__in=targets).update(
+            **{field: models.F(field) + delta}
+        )
+
+
+def _group(pairs: Iterable[tuple[int, int]]) -> dict[int, set[int]]:
+    grouped: dict[int, set[int]] = defaultdict(set)
+    for user, target in pairs:
+        grouped[target].add(user)
+    return grouped
+
+
+def _send_m2m_changed(
+    sender: type[models.Model],
+    instance: models.Model,
+    model: type[models.Model],
+    action: str,
+    pk_set: set[int],
+) -> None:
+    # bulk writes to the through table bypass the related manager, so send
+    # the signals add() or remove() would have sent
+    models.signals.m2m_changed.send(
+        sender=sender,
+        action=action,
+        instance=instance,
+        reverse=False,
+        model=model,
+        pk_set=pk_set,
+        using=instance._state.db,
+    )
@@ -0,0 +1,654 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils.dateparse import parse_datetime
+from realworld import toggles
+from realworld.accounts.email_filter import email_filter
+from realworld.articles.autocomplete import tag_index
+from realworld.articles.models import (
+    Article,
+    Favorite,
+    TagCount,
+    TagEntry,
+    TimelineEntry,
+)
+from realworld.comments.models import Comment
+from realworld.response_cache import invalidate_cache_tags
+from taggit.models import Tag, TaggedItem
+
+User = get_user_model()
+
+USER = "user"
+ARTICLE = "article"
+COMMENT = "comment"
+FAVORITE = "favorite"
+FOLLOW = "follow"
+
+# export order: records only refer to records earlier in the stream
+KINDS = (USER, ARTICLE, COMMENT, FAVORITE, FOLLOW)
+
+Record = dict[str, Any]
+
+
+class Throughput:
+    """Counts records and bytes transferred, for progress reports."""
+
+    def __init__(self, interval: float = 10):
+        self.interval = interval
+        self.started = self.reported = time.perf_counter()
+        self.counts: Counter[str] = Counter()
+        self.num_bytes = 0
+
+    def add(self, kind: str, num_records: int, num_bytes: int) -> None:
+        self.counts[kind] += num_records
+        self.num_bytes += num_bytes
+
+    def progress(self) -> str | None:
+        """Returns report if `interval` seconds have passed since the last."""
+        if (now := time.perf_counter()) - self.reported < self.interval:
+            return None
+        self.reported = now
+        return self.report()
+
+    def report(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        total = sum(self.counts.values())
+        megabytes = self.num_bytes / 1024 / 1024
+        counts = ", ".join(f"{count} {kind}(s)" for kind, count in self.counts.items())
+        return (
+            f"{counts or 'nothing'}: {total} records, {megabytes:.1f} MB in "
+            f"{elapsed:.1f}s ({total / elapsed:.0f} records/s, "
+            f"{megabytes / elapsed:.1f} MB/s)"
+        )
+
+
+def read_checkpoint(path: Path) -> Record | None:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path: Path, checkpoint: Record) -> None:
+    # atomic: an interrupted write leaves the previous checkpoint in place
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(checkpoint))
+    os.replace(tmp_path, path)
+
+
+def encode(record: Record) -> bytes:
+    # isoformat() keeps microseconds, unlike DjangoJSONEncoder
+    return (
+        json.dumps(record, default=datetime.isoformat, ensure_ascii=False) + "\n"
+    ).encode()
+
+
+@contextlib.contextmanager
+def read_snapshot() -> Iterator[None]:
+    """Queries in the block read one snapshot of the database.
+
+    Unlike atomic(), the transaction is always DEFERRED whatever the
+    connection's transaction_mode, so no write lock is held: in WAL mode
+    writers carry on while a long export reads.
+    """
+    if connection.in_atomic_block:
+        # already reading a snapshot
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("BEGIN DEFERRED")
+
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("ROLLBACK")
+
+
+def export_records(
+    kind: str, after: int = 0, batch_size: int = 1000
+) -> Iterator[tuple[int, list[Record]]]:
+    """Yields chunks of records of kind, with the primary key of the last row
+    in each chunk. Rows are read in primary key order starting after `after`,
+    one chunk per query, so memory use does not depend on table size."""
+
+    queryset, serialize = EXPORTERS[kind]
+
+    while rows := list(queryset().filter(pk__gt=after).order_by("pk")[:batch_size]):
+        after = rows[-1]["pk"]
+        yield after, serialize(rows)
+
+
+def read_chunks(
+    fp: IO[bytes], batch_size: int = 1000
+) -> Iterator[tuple[str, list[Record], int]]:
+    """Reads NDJSON from fp, yielding chunks of consecutive records of the same
+    kind, with the file offset after the last record of each chunk.
+
+    A final line without a newline, left by an interrupted export, is
+    ignored.
+    """
+    kind: str | None = None
+    records: list[Record] = []
+    offset = fp.tell()
+
+    for line in fp:
+        if not line.endswith(b"\n"):
+            break
+
+        if line.strip():
+            record = json.loads(line)
+
+            if record.get("type") not in IMPORTERS:
+                raise ValueError(f"Unknown record type at offset {offset}: {line!r}")
+
+            if records and (record["type"] != kind or len(records) >= batch_size):
+                yield kind, records, offset
+                records = []
+
+            kind = record["type"]
+            records.append(record)
+
+        offset += len(line)
+
+    if records:
+        yield kind, records, offset
+
+
+def import_records(kind: str, records: list[Record]) -> int:
+    """Imports records of a single kind in one transaction. Returns number of
+    records imported.
+
+    Records already imported, or referring to users or articles that do not
+    exist, are skipped, so importing the same file again is safe.
+    """
+    with transaction.atomic():
+        return IMPORTERS[kind](records)
+
+
+def finish_import() -> None:
+    """Resets primary key sequences after importing rows with explicit ids,
+    and reloads tag autocomplete and the email filter in all processes."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Article, Comment]):
+            cursor.execute(sql)
+
+    tag_index.invalidate()
+    email_filter.invalidate()
+
+
+def _serialize_users(rows: list[Record]) -> list[Record]:
+    return [
+        {
+            "type": USER,
+            "email": row["email"],
+            "name": row["name"],
+            "bio": row["bio"],
+            "image": row["image"],
+            "password": row["password"],
+            "date_joined": row["date_joined"],
+        }
+        for row in rows
+    ]
+
+
+def _serialize_articles(rows: list[Record]) -> list[Record]:
+    tags = defaultdict(list)
+
+    for article_id, name in (
+        TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id__in=[row["pk"] for row in rows],
+        )
+        .order_by("pk")
+        .values_list("object_id", "tag__name")
+    ):
+        tags[article_id].append(name)
+
+    return [
+        {
+            "type": ARTICLE,
+            "id": row["pk"],
+            "author": row["author__email"],
+            "title": row["title"],
+            "summary": row["summary"],
+            "content": row["content"],
+            "content_html": row["content_html"],
+            "content_hash": row["content_hash"],
+            "content_renderer": row["content_renderer"],
+            "tags": tags[row["pk"]],
+            "created": row["created"],
+            "updated": row["updated"],
+        }
+        for row in rows
+    ]
+
+
+def _serialize_comments(rows: list[Record]) -> list[Record]:
+    return [
+        {
+            "type": COMMENT,
+            "id": row["pk"],
+            "article": row["article"],
+            "author": row["author__email"],
+            "content": row["content"],
+            "created": row["created"],
+            "updated": row["updated"],
+        }
+        for row in rows
+    ]
+
+
+def _serialize_favorites(rows: list[Record]) -> list[Record]:
+    return [
+        {
+            "type": FAVORITE,
+            "user": row["user__email"],
+            "article": row["article"],
+            "created": row["created"],
+        }
+        for row in rows
+    ]
+
+
+def _serialize_follows(rows: list[Record]) -> list[Record]:
+    return [
+        {
+            "type": FOLLOW,
+            "user": row["to_user__email"],
+            "followed": row["from_user__email"],
+        }
+        for row in rows
+    ]
+
+
+EXPORTERS: dict[
+    str, tuple[Callable[[], models.QuerySet], Callable[[list[Record]], list[Record]]]
+] = {
+    USER: (
+        lambda: User.objects.values(
+            "pk", "email", "name", "bio", "image", "password", "date_joined"
+        ),
+        _serialize_users,
+    ),
+    ARTICLE: (
+        lambda: Article.objects.values(
+            "pk",
+            "author__email",
+            "title",
+            "summary",
+            "content",
+            "content_html",
+            "content_hash",
+            "content_renderer",
+            "created",
+            "updated",
+        ),
+        _serialize_articles,
+    ),
+    COMMENT: (
+        lambda: Comment.objects.values(
+            "pk", "article", "author__email", "content", "created", "updated"
+        ),
+        _serialize_comments,
+    ),
+    FAVORITE: (
+        lambda: Favorite.objects.values("pk", "user__email", "article", "created"),
+        _serialize_favorites,
+    ),
+    FOLLOW: (
+        lambda: User.followers.through.objects.values(
+            "pk", "to_user__email", "from_user__email"
+        ),
+        _serialize_follows,
+    ),
+}
+
+
+def _import_users(records: list[Record]) -> int:
+    by_email = {record["email"]: record for record in records}
+
+    existing = set(
+        User.objects.filter(email__in=by_email).values_list("email", flat=True)
+    )
+
+    return len(
+        User.objects.bulk_create(
+            [
+                User(
+                    email=email,
+                    name=record["name"],
+                    bio=record["bio"],
+                    image=record["image"],
+                    password=record["password"],
+                    date_joined=parse_datetime(record["date_joined"]),
+                )
+                for email, record in by_email.items()
+                if email not in existing
+            ]
+        )
+    )
+
+
+def _import_articles(records: list[Record]) -> int:
+    authors = _user_ids({record["author"] for record in records})
+
+    existing = _existing_ids(
+        Article,
+        records,
+        ("author__email", "created"),
+        lambda record: (record["author"], parse_datetime(record["created"])),
+    )
+
+    records = [
+        record
+        for record in records
+        if record["id"] not in existing and record["author"] in authors
+    ]
+
+    if not records:
+        return 0
+
+    articles = []
+
+    for record in records:
+        article = Article(
+            id=record["id"],
+            author_id=authors[record["author"]],
+            title=record["title"],
+            summary=record["summary"],
+            content=record["content"],
+            content_html=record["content_html"],
+            content_hash=record["content_hash"],
+            content_renderer=record["content_renderer"],
+        )
+        # HTML is only re-rendered if content or renderer has changed
+        article.render_content()
+        articles.append(article)
+
+    Article.objects.bulk_create(articles)
+
+    _set_timestamps(Article, articles, records)
+
+    _add_tags(articles, records)
+
+    _fan_out(articles)
+
+    invalidate_cache_tags(
+        "articles", *{f"user-articles:{article.author_id}" for article in articles}
+    )
+
+    return len(articles)
+
+
+def _import_comments(records: list[Record]) -> int:
+    authors = _user_ids({record["author"] for record in records})
+
+    articles = set(
+        Article.objects.filter(
+            pk__in={record["article"] for record in records}
+        ).values_list("pk", flat=True)
+    )
+
+    existing = _existing_ids(
+        Comment,
+        records,
+        ("article", "author__email", "created"),
+        lambda record: (
+            record["article"],
+            record["author"],
+            parse_datetime(record["created"]),
+        ),
+    )
+
+    records = [
+        record
+        for record in records
+        if record["id"] not in existing
+        and record["article"] in articles
+        and record["author"] in authors
+    ]
+
+    comments = Comment.objects.bulk_create(
+        [
+            Comment(
+                id=record["id"],
+                article_id=record["article"],
+                author_id=authors[record["author"]],
+                content=record["content"],
+            )
+            for record in records
+        ]
+    )
+
+    _set_timestamps(Comment, comments, records)
+
+    counts = Counter(comment.article_id for comment in comments)
+
+    _increment(Article, "comments_count", counts)
+
+    invalidate_cache_tags(*(f"article:{article_id}" for article_id in counts))
+
+    return len(comments)
+
+
+def _import_favorites(records: list[Record]) -> int:
+    users = _user_ids({record["user"] for record in records})
+
+    articles = set(
+        Article.objects.filter(
+            pk__in={record["article"] for record in records}
+        ).values_list("pk", flat=True)
+    )
+
+    # exports made before favorites were timestamped have no "created"
+    created = {
+        (users[record["user"]], record["article"]): record.get("created")
+        for record in records
+        if record["user"] in users and record["article"] in articles
+    }
+
+    num_applied = toggles.apply_favorites(dict.fromkeys(created, True))
+
+    favorites = [
+        favorite
+        for favorite in Favorite.objects.filter(
+            user__in={user for user, _ in created},
+            article__in={article for _, article in created},
+        )
+        if created.get((favorite.user_id, favorite.article_id))
+    ]
+
+    for favorite in favorites:
+        favorite.created = parse_datetime(
+            created[(favorite.user_id, favorite.article_id)]
+        )
+
+    Favorite.objects.bulk_update(favorites, ["created"])
+
+    return num_applied
+
+
+def _import_follows(records: list[Record]) -> int:
+    users = _user_ids(
+        {email for record in records for email in (record["user"], record["followed"])}
+    )
+
+    return toggles.apply_follows(
+        {
+            (users[record["user"]], users[record["followed"]]): True
+            for record in records
+            if record["user"] in users
+            and record["followed"] in users
+            and record["user"] != record["followed"]
+        }
+    )
+
+
+IMPORTERS: dict[str, Callable[[list[Record]], int]] = {
+    USER: _import_users,
+    ARTICLE: _import_articles,
+    COMMENT: _import_comments,
+    FAVORITE: _import_favorites,
+    FOLLOW: _import_follows,
+}
+
+
+def _existing_ids(
+    model: type[models.Model],
+    records: list[Record],
+    fields: tuple[str, ...],
+    natural_key: Callable[[Record], tuple],
+) -> set[int]:
+    """Returns ids of records already imported. Ids are preserved, so a row
+    with the same id but a different author or creation time is another
+    row: importing would attach comments and favorites to the wrong article,
+    so raises ValueError."""
+
+    existing = {
+        pk: tuple(values)
+        for pk, *values in model.objects.filter(
+            pk__in=[record["id"] for record in records]
+        ).values_list("pk", *fields)
+    }
+
+    for record in records:
+        if record["id"] in existing and existing[record["id"]] != natural_key(record):
+            raise ValueError(
+                f"{model._meta.verbose_name} {record['id']} already exists "
+                "and was not imported from this file"
+            )
+
+    return set(existing)
+
+
+def _user_ids(emails: set[str]) -> dict[str, int]:
+    return dict(User.objects.filter(email__in=emails).values_list("email", "pk"))
+
+
+def _set_timestamps(
+    model: type[models.Model], objs: list[models.Model], records: list[Record]
+) -> None:
+    # auto_now and auto_now_add ignore values given to bulk_create()
+    for obj, record in zip(objs, records):
+        obj.created = parse_datetime(record["created"])
+        obj.updated = parse_datetime(record["updated"])
+
+    model.objects.bulk_update(objs, ["created", "updated"])
+
+
+def _add_tags(articles: list[Article], records: list[Record]) -> None:
+    """Tags articles with a few queries per chunk, rather than the queries per
+    tag of article.tags.add()."""
+
+    names = {
+        article.id: set(record["tags"]) for article, record in zip(articles, records)
+    }
+
+    tag_ids = _get_or_create_tags(set().union(*names.values()))
+
+    content_type = ContentType.objects.get_for_model(Article)
+
+    items = TaggedItem.objects.bulk_create(
+        [
+            TaggedItem(
+                content_type=content_type, object_id=article_id, tag_id=tag_ids[name]
+            )
+            for article_id, article_names in names.items()
+            for name in article_names
+        ]
+    )
+
+    created = {article.id: article.created for article in articles}
+
+    TagEntry.objects.bulk_create(
+        [
+            TagEntry(
+                tag_id=item.tag_id,
+                article_id=item.object_id,
+                created=created[item.object_id],
+            )
+            for item in items
+        ]
+    )
+
+    # one UPDATE per distinct count rather than per tag
+    by_count: dict[int, set[int]] = defaultdict(set)
+
+    for tag_id, count in Counter(item.tag_id for item in items).items():
+        by_count[count].add(tag_id)
+
+    for count, tag_ids_with_count in by_count.items():
+        TagCount.objects.update_counts(tag_ids_with_count, count)
+
+
+def _get_or_create_tags(names: set[str]) -> dict[str, int]:
+    """Returns ids of tags by name, creating missing tags."""
+    if not names:
+        return {}
+
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+
+    if missing := names - tag_ids.keys():
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=Tag().slugify(name)) for name in missing],
+            ignore_conflicts=True,
+        )
+
+        tag_ids.update(Tag.objects.filter(name__in=missing).values_list("name", "pk"))
+
+        # slug taken by another tag: save() finds a unique slug
+        for name in missing - tag_ids.keys():
+            tag_ids[name] = Tag.objects.create(name=name).pk
+
+    return tag_ids
+
+
+def _fan_out(articles: list[Article]) -> None:
+    """Adds articles to the timelines of followers of their authors, as
+    TimelineEntry.objects.fan_out() does for a single article."""
+
+    followers = defaultdict(list)
+
+    for author_id, follower_id in User.followers.through.objects.filter(
+        from_user__in={article.author_id for article in articles},
+        from_user__followers_count__lte=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list("from_user", "to_user"):
+        followers[author_id].append(follower_id)
+
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=follower_id, article_id=article.id, created=article.created
+            )
+            for article in articles
+            for follower_id in followers[article.author_id]
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def _increment(model: type[models.Model], field: str, counts: Counter[int]) -> None:
+    # one UPDATE per distinct count rather than per row
+    by_count: dict[int, list[int]] = defaultdict(list)
+
+    for pk, count in counts.items():
+        by_count[count].append(pk)
+
+    for count, pks in by_count.items():
+        model.objects.filter(pk__in=pks).update(**{field: models.F(field) + count})
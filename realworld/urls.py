@@ -5,5 +5,6 @@ urlpatterns = [
     path("", include("realworld.articles.urls")),
     path("", include("realworld.accounts.urls")),
     path("comments/", include("realworld.comments.urls")),
+    path("api/", include("realworld.api.urls")),
     path("admin/", admin.site.urls),
 ]
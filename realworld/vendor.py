@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import functools
+from typing import NamedTuple
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+
+class Asset(NamedTuple):
+    url: str
+    integrity: str = ""
+
+
+# third-party assets, by path under STATICFILES_DIRS: copied there by the
+# vendor_static command so they are served, hashed and compressed with the
+# site's own static files. Templates refer to them with the {% vendored %}
+# tag.
+ASSETS = {
+    "vendor/htmx.min.js": Asset(
+        "https://unpkg.com/htmx.org@1.6.1",
+        "sha384-tvG/2mnCFmGQzYC1Oh3qxQ7CkQ9kMzYjWZSNtrRZygHPDDqottzEJsqS4oUVodhW",
+    ),
+    "vendor/alpine.min.js": Asset(
+        "https://unpkg.com/alpinejs@3.7.1/dist/cdn.min.js",
+        "sha384-KLv/Yaw8nAj6OXX6AvVFEt1FNRHrfBHziZ2JzPhgO9OilYrn6JLfCR4dZzaaQCA5",
+    ),
+    # fonts are referenced from the stylesheet as ../fonts/
+    "vendor/ionicons/css/ionicons.min.css": Asset(
+        "https://code.ionicframework.com/ionicons/2.0.1/css/ionicons.min.css"
+    ),
+    **{
+        f"vendor/ionicons/fonts/ionicons.{ext}": Asset(
+            f"https://code.ionicframework.com/ionicons/2.0.1/fonts/ionicons.{ext}"
+        )
+        for ext in ("eot", "svg", "ttf", "woff")
+    },
+}
+
+
+def asset_url(path: str) -> str:
+    """URL of a third-party asset in ASSETS: the static file if it has been
+    vendored, otherwise the original CDN URL."""
+    return static(path) if is_vendored(path) else ASSETS[path].url
+
+
+@functools.lru_cache
+def is_vendored(path: str) -> bool:
+    return finders.find(path) is not None